@@ -10,11 +10,15 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Runtime data (caches, logs, profiles) that must not be committed
+VAR_DIR = BASE_DIR / 'var'
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -43,12 +47,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'tasks.middleware.HTMLCompressionMiddleware',
+    'tasks.middleware.StaticAssetMiddleware',
+    'tasks.middleware.SlowQueryMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'tasks.middleware.WorkspaceMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'tasks.middleware.ProfilingMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -56,19 +66,31 @@ ROOT_URLCONF = 'taskmanager.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to tasks.metrics
+        'BACKEND': 'tasks.instrumentation.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compile each template once per process (tasks/warmup.py
+            # fills this cache at startup)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
+# Precompile templates, URLs and forms when the WSGI/ASGI app is loaded
+WARM_UP_ON_STARTUP = os.environ.get('TASKMANAGER_WARM_UP', '1') == '1'
+
 WSGI_APPLICATION = 'taskmanager.wsgi.application'
 
 
@@ -82,6 +104,160 @@ DATABASES = {
     }
 }
 
+# Workspace shards (tasks.shards)
+# The main database keeps the workspace registry, usernames and sessions
+# plus the default workspace; every other workspace gets its own SQLite
+# file in SHARD_DIR, so one team's bulk writes never lock another's.
+# `manage.py create_workspace`, `migrate_shards` and `move_workspace`
+# manage them.
+
+DATABASE_ROUTERS = ['tasks.shards.ShardRouter']
+SHARD_DIR = VAR_DIR / 'shards'
+# Open shard connections each worker thread keeps before closing the least recently used
+SHARD_MAX_OPEN_CONNECTIONS = int(os.environ.get('TASKMANAGER_SHARD_CONNECTIONS', 8))
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The 'sessions' cache is file based so every worker process on the host
+# sees the same entries (a per-process LocMemCache would keep serving a
+# session after it was logged out in another worker).
+
+# The instrumented backends count hits and misses for /metrics.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'tasks.instrumentation.InstrumentedLocMemCache',
+        'LOCATION': 'taskmanager-default',
+        'METRICS_NAME': 'default',
+    },
+    'sessions': {
+        'BACKEND': 'tasks.instrumentation.InstrumentedFileBasedCache',
+        'LOCATION': VAR_DIR / 'cache' / 'sessions',
+        'TIMEOUT': 60 * 60 * 24 * 14,
+        'METRICS_NAME': 'sessions',
+    },
+    # Calendar ranges; shared so a task change invalidates them in every worker
+    'calendar': {
+        'BACKEND': 'tasks.instrumentation.InstrumentedFileBasedCache',
+        'LOCATION': VAR_DIR / 'cache' / 'calendar',
+        'TIMEOUT': 60 * 60,
+        'METRICS_NAME': 'calendar',
+    },
+}
+
+
+# Sessions and messages
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/
+# https://docs.djangoproject.com/en/5.2/ref/contrib/messages/
+# Select with the TASKMANAGER_SESSION_MODE / TASKMANAGER_MESSAGE_MODE
+# environment variables; `manage.py session_benchmark` compares them.
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+MESSAGE_STORAGES = {
+    'session': 'django.contrib.messages.storage.session.SessionStorage',
+    'cookie': 'django.contrib.messages.storage.cookie.CookieStorage',
+    'fallback': 'django.contrib.messages.storage.fallback.FallbackStorage',
+}
+
+SESSION_MODE = os.environ.get('TASKMANAGER_SESSION_MODE', 'cached_db')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+SESSION_CACHE_ALIAS = 'sessions'
+# Only write the session back when it was modified during the request
+SESSION_SAVE_EVERY_REQUEST = False
+
+MESSAGE_MODE = os.environ.get('TASKMANAGER_MESSAGE_MODE', 'fallback')
+MESSAGE_STORAGE = MESSAGE_STORAGES[MESSAGE_MODE]
+
+
+# Request profiling (tasks.middleware.ProfilingMiddleware)
+# Staff can profile a request with an X-Profile header or ?_profile=1;
+# PROFILING_SAMPLE_RATE additionally profiles that fraction of all requests.
+
+PROFILING_DIR = VAR_DIR / 'profiles'
+PROFILING_SAMPLE_RATE = float(os.environ.get('TASKMANAGER_PROFILE_SAMPLE_RATE', '0'))
+PROFILING_MAX_PROFILES = 200
+
+
+# Slow-query log (tasks.slowqueries)
+# Queries slower than the threshold are logged with their plan; staff can
+# browse them grouped by SQL fingerprint at /slow-queries/.
+
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('TASKMANAGER_SLOW_QUERY_MS', '100'))
+SLOW_QUERY_LOG = VAR_DIR / 'logs' / 'slow_queries.log'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow_queries': {
+            # Opened on the first slow query; creates var/logs/ then
+            'class': 'tasks.slowqueries.LogFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'maxBytes': 5 * 1024 * 1024,
+            'backupCount': 3,
+            'formatter': 'message',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'tasks.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+
+# Metrics (tasks.metrics), exposed in Prometheus text format at /metrics
+# Each worker process writes to its own memory-mapped file in METRICS_DIR;
+# clear the directory when deploying a new release.
+
+METRICS_DIR = VAR_DIR / 'metrics'
+# Scrapers send `Authorization: Bearer <token>`; required whenever the app
+# runs behind a reverse proxy, where every client address is the proxy's
+METRICS_TOKEN = os.environ.get('TASKMANAGER_METRICS_TOKEN', '')
+# Without a token: clients allowed to scrape /metrics without a staff login.
+# Only safe when the application server is reached directly
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+
+# Email (outbox notifications are delivered by `manage.py send_outbox`)
+# https://docs.djangoproject.com/en/5.2/topics/email/
+
+EMAIL_BACKEND = os.environ.get(
+    'TASKMANAGER_EMAIL_BACKEND', 'django.core.mail.backends.filebased.EmailBackend'
+)
+EMAIL_FILE_PATH = VAR_DIR / 'mail'
+DEFAULT_FROM_EMAIL = 'TaskMaster <noreply@taskmaster.local>'
+# Seconds assignment/comment notifications wait so bursts share one digest
+OUTBOX_DIGEST_DELAY = 60
+
+
+# Archive tier (`manage.py archive_tasks`)
+
+# Done tasks older than this move to the archive tables
+ARCHIVE_AFTER_DAYS = int(os.environ.get('TASKMANAGER_ARCHIVE_AFTER_DAYS', 90))
+
+
+# Online backups (`manage.py backup_db`)
+# Snapshots of the main database and every shard, taken with SQLite's
+# online backup API while the site keeps serving writes.
+
+BACKUP_DIR = Path(os.environ.get('TASKMANAGER_BACKUP_DIR', VAR_DIR / 'backups'))
+# Snapshots kept per database; older ones are deleted after each run
+BACKUP_KEEP = int(os.environ.get('TASKMANAGER_BACKUP_KEEP', 7))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -118,6 +294,23 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Content-hashed names plus .gz/.br copies written by collectstatic
+    'staticfiles': {
+        'BACKEND': 'tasks.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Cache lifetime (seconds) of content-hashed static files
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
+
+# HTML responses smaller than this are sent uncompressed
+HTML_COMPRESSION_MIN_SIZE = 1024
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'taskmanager.settings')
 
 application = get_wsgi_application()
+
+from tasks.warmup import warm_up  # noqa: E402 (needs configured settings)
+
+warm_up()
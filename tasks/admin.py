@@ -1,31 +1,162 @@
-from django.contrib import admin
-from .models import Category, Project, Task, Comment
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+from django.utils.functional import cached_property
+from . import shards
+from .analytics import record_bulk_status_change
+from .saved_filters import mark_stale
+from .calendar_events import invalidate, task_user_ids
+from .models import ArchivedTask, Category, Project, Tag, Task, Comment, OutboxMessage, Workspace
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never runs COUNT(*) over a whole large table.
+
+    Unfiltered querysets are estimated from the highest primary key;
+    filtered ones are counted only up to ESTIMATE_LIMIT rows.
+    """
+    ESTIMATE_LIMIT = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = queryset.aggregate(top=Max('pk'))['top'] or 0
+            if estimate > self.ESTIMATE_LIMIT:
+                return estimate
+        return queryset.order_by().values('pk')[:self.ESTIMATE_LIMIT + 1].count()
+
+
+class BoundedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """Related-object sidebar filter listing at most MAX_CHOICES objects"""
+    MAX_CHOICES = 50
+
+    def field_choices(self, field, request, model_admin):
+        related = field.remote_field.model._default_manager.all()
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        if ordering:
+            related = related.order_by(*ordering)
+        choices = [(obj.pk, str(obj)) for obj in related[:self.MAX_CHOICES]]
+        # Keep the active selection visible even when it is not in the first page
+        if self.lookup_val and not any(str(pk) in self.lookup_val for pk, _ in choices):
+            choices += [(obj.pk, str(obj)) for obj in related.filter(pk__in=self.lookup_val)]
+        return choices
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'created_by', 'created_at']
+    list_select_related = ['created_by']
     search_fields = ['name', 'description']
     list_filter = ['created_at']
+    autocomplete_fields = ['created_by']
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'created_by', 'task_count', 'created_at']
+    list_select_related = ['created_by']
+    search_fields = ['name']
+    autocomplete_fields = ['created_by']
+    # Maintained by tasks.tags; `rebuild_tag_counts` recomputes them
+    readonly_fields = ['task_count', 'version']
+
+
+@admin.register(Workspace)
+class WorkspaceAdmin(admin.ModelAdmin):
+    list_display = ['slug', 'name', 'shard', 'created_at']
+    search_fields = ['slug', 'name']
+    # Shards change with `create_workspace` and `move_workspace` only
+    readonly_fields = ['shard']
+
+    def has_add_permission(self, request):
+        return False
 
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
     list_display = ['name', 'owner', 'created_at']
+    list_select_related = ['owner']
     search_fields = ['name', 'description']
     list_filter = ['created_at']
+    autocomplete_fields = ['owner']
+
+
+def set_status_action(status, label):
+    """Build an admin action updating the status of all selected tasks in one query"""
+
+    def action(modeladmin, request, queryset):
+        # Rows already in the status keep their completed_at (and archive timer) and version
+        queryset = queryset.exclude(status=status)
+        changes = {'status': status, 'updated_at': timezone.now(), 'version': F('version') + 1}
+        changes['completed_at'] = timezone.now() if status == 'done' else None
+        with transaction.atomic(using=shards.current()):
+            record_bulk_status_change(queryset, status)
+            user_ids = task_user_ids(queryset)
+            updated = queryset.update(**changes)
+            mark_stale(user_ids)
+            transaction.on_commit(lambda: invalidate(user_ids), using=shards.current())
+        modeladmin.message_user(request, f'{updated} task(s) marked as {label}.', messages.SUCCESS)
+
+    action.__name__ = f'mark_{status}'
+    action.short_description = f'Mark selected tasks as {label}'
+    return action
 
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ['title', 'status', 'priority', 'created_by', 'assigned_to', 'created_at']
-    search_fields = ['title', 'description']
-    list_filter = ['status', 'priority', 'created_at', 'category', 'project']
-    date_hierarchy = 'created_at'
+    list_select_related = ['created_by', 'assigned_to']
+    # '=' and '^' lookups are served by the primary key and title indexes
+    search_fields = ['=id', '^title']
+    list_filter = [
+        'status', 'priority', 'created_at',
+        ('category', BoundedRelatedFieldListFilter),
+        ('project', BoundedRelatedFieldListFilter),
+    ]
+    autocomplete_fields = ['created_by', 'assigned_to', 'category', 'project']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = [set_status_action(status, label) for status, label in Task.STATUS_CHOICES]
 
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     list_display = ['task', 'user', 'created_at']
-    search_fields = ['content']
+    list_select_related = ['task', 'user']
+    search_fields = ['=task__id', '=user__username']
     list_filter = ['created_at']
+    autocomplete_fields = ['task', 'user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'kind', 'recipient', 'created_at', 'sent_at', 'attempts']
+    list_select_related = ['recipient']
+    list_filter = ['kind', 'created_at']
+    search_fields = ['=recipient__username']
+    raw_id_fields = ['recipient', 'task']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(admin.ModelAdmin):
+    """Read-only: archived tasks change only through archive_tasks"""
+    list_display = ['title', 'status', 'created_by', 'project', 'completed_at', 'archived_at']
+    list_select_related = ['created_by', 'project']
+    search_fields = ['=id', '^title']
+    list_filter = ['archived_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
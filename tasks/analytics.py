@@ -0,0 +1,198 @@
+"""
+Per-project daily rollups.
+
+``Task.save`` and task deletes (``Task.delete``, or the pre_delete hook for
+cascades) call into this module so every status or project change is
+applied to ``ProjectDailyStats`` with a single upsert. Bulk paths that
+bypass the model (queryset updates, raw inserts from generate_data) call
+``record_bulk_status_change`` or are repaired with ``manage.py backfill_rollups``.
+"""
+
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import shards
+from .models import ArchivedTask, ProjectDailyStats, Task
+
+STATUS_FIELDS = [status for status, _ in Task.STATUS_CHOICES]
+DELTA_FIELDS = ['created', 'completed', *STATUS_FIELDS]
+
+
+def apply_deltas(deltas):
+    """Add {(project_id, date): Counter} to the rollups with one upsert statement"""
+    connection = shards.connection()
+    rows = [
+        (project_id, connection.ops.adapt_datefield_value(day), *(counts[f] for f in DELTA_FIELDS))
+        for (project_id, day), counts in deltas.items()
+        if project_id is not None and any(counts.values())
+    ]
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    columns = ['project_id', 'date', *DELTA_FIELDS]
+    sql = 'INSERT INTO {table} ({columns}) VALUES ({values}) ON CONFLICT ({key}) DO UPDATE SET {updates}'.format(
+        table=quote(ProjectDailyStats._meta.db_table),
+        columns=', '.join(quote(c) for c in columns),
+        values=', '.join(['%s'] * len(columns)),
+        key=f"{quote('project_id')}, {quote('date')}",
+        updates=', '.join(f'{quote(f)} = {quote(ProjectDailyStats._meta.db_table)}.{quote(f)} + excluded.{quote(f)}'
+                          for f in DELTA_FIELDS),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def record_transition(task, previous, created):
+    """Apply a task save; `previous` is its (project_id, status) when loaded"""
+    current = task.rollup_state()
+    if current is None or (not created and (previous is None or previous == current)):
+        return
+    deltas = defaultdict(Counter)
+    if created:
+        day = timezone.localdate(task.created_at)
+        deltas[task.project_id, day]['created'] += 1
+        if task.status in STATUS_FIELDS:
+            deltas[task.project_id, day][task.status] += 1
+        if task.status == 'done':
+            deltas[task.project_id, day]['completed'] += 1
+    else:
+        today = timezone.localdate()
+        old_project, old_status = previous
+        if old_status in STATUS_FIELDS:
+            deltas[old_project, today][old_status] -= 1
+        if task.status in STATUS_FIELDS:
+            deltas[task.project_id, today][task.status] += 1
+        if task.status == 'done' and old_status != 'done':
+            deltas[task.project_id, today]['completed'] += 1
+    apply_deltas(deltas)
+
+
+def record_delete(*tasks):
+    today = timezone.localdate()
+    deltas = defaultdict(Counter)
+    for task in tasks:
+        state = getattr(task, '_rollup_state', None) or task.rollup_state()
+        if state and state[1] in STATUS_FIELDS:
+            deltas[state[0], today][state[1]] -= 1
+    apply_deltas(deltas)
+
+
+def record_bulk_status_change(queryset, status):
+    """Rollup deltas for queryset.update(status=status); call before updating"""
+    today = timezone.localdate()
+    deltas = defaultdict(Counter)
+    changing = (
+        queryset.exclude(status=status).filter(project__isnull=False)
+        .order_by().values('project_id', 'status').annotate(n=Count('id'))
+    )
+    for row in changing:
+        counts = deltas[row['project_id'], today]
+        if row['status'] in STATUS_FIELDS:
+            counts[row['status']] -= row['n']
+        counts[status] += row['n']
+        if status == 'done':
+            counts['completed'] += row['n']
+    apply_deltas(deltas)
+
+
+def _backfill_deltas(tasks, deltas):
+    """Add the approximated history of the `tasks` rows to `deltas`"""
+    created = tasks.annotate(day=TruncDate('created_at')).values('project_id', 'day', 'status')
+    for row in created.annotate(n=Count('id')):
+        counts = deltas[row['project_id'], row['day']]
+        counts['created'] += row['n']
+        if row['status'] == 'done':
+            counts['todo'] += row['n']
+        elif row['status'] in STATUS_FIELDS:
+            counts[row['status']] += row['n']
+
+    completed = (
+        tasks.filter(status='done')
+        .annotate(day=TruncDate('completed_at'))
+        .values('project_id', 'day').annotate(n=Count('id'))
+    )
+    for row in completed:
+        if row['day'] is None:
+            continue  # handled below
+        counts = deltas[row['project_id'], row['day']]
+        counts['todo'] -= row['n']
+        counts['done'] += row['n']
+        counts['completed'] += row['n']
+
+    # Done tasks without completed_at count as completed on their creation day
+    undated = (
+        tasks.filter(status='done', completed_at__isnull=True)
+        .annotate(day=TruncDate('created_at')).values('project_id', 'day').annotate(n=Count('id'))
+    )
+    for row in undated:
+        counts = deltas[row['project_id'], row['day']]
+        counts['todo'] -= row['n']
+        counts['done'] += row['n']
+        counts['completed'] += row['n']
+
+
+def backfill(project_ids=None):
+    """
+    Rebuild rollups from Task and ArchivedTask rows with three grouped
+    queries per table; archived tasks still count as done.
+
+    History before the rollups existed is approximated: open tasks keep
+    their current status from their creation day, done tasks count as
+    'todo' from creation until their completed_at day.
+    """
+    stats = ProjectDailyStats.objects.all()
+    if project_ids is not None:
+        stats = stats.filter(project_id__in=project_ids)
+    deltas = defaultdict(Counter)
+    for model in (Task, ArchivedTask):
+        tasks = model.objects.filter(project__isnull=False).order_by()
+        if project_ids is not None:
+            tasks = tasks.filter(project_id__in=project_ids)
+        _backfill_deltas(tasks, deltas)
+
+    rows = [
+        ProjectDailyStats(project_id=project_id, date=day, **counts)
+        for (project_id, day), counts in deltas.items()
+        if any(counts.values())
+    ]
+    stats.delete()
+    ProjectDailyStats.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def project_series(project, days=365):
+    """Day-by-day burndown, throughput and status breakdown from the rollups"""
+    end = timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    stats = ProjectDailyStats.objects.filter(project=project)
+    # Running totals up to the window start: one indexed aggregate
+    base = stats.filter(date__lt=start).aggregate(**{f: Sum(f) for f in STATUS_FIELDS})
+    running = Counter({f: base[f] or 0 for f in STATUS_FIELDS})
+    rows = {row['date']: row for row in stats.filter(date__gte=start, date__lte=end).values('date', *DELTA_FIELDS)}
+
+    series = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        row = rows.get(day)
+        if row:
+            for field in STATUS_FIELDS:
+                running[field] += row[field]
+        series.append({
+            'date': day,
+            'created': row['created'] if row else 0,
+            'completed': row['completed'] if row else 0,
+            'open': sum(running[f] for f in STATUS_FIELDS if f != 'done'),
+            'done': running['done'],
+        })
+    return series, dict(running)
+
+
+def svg_points(values, width, height, top=None):
+    """Scale values to an SVG polyline 'x,y x,y ...' string"""
+    top = max(top or 0, max(values, default=0), 1)
+    step = width / max(len(values) - 1, 1)
+    return ' '.join(f'{i * step:.1f},{height - value * height / top:.1f}' for i, value in enumerate(values))
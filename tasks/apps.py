@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from . import metrics, outbox, workspaces
+
+        # Each workspace has its own outbox; a scrape adds them all up
+        metrics.register_gauge(
+            'taskmanager_outbox_pending',
+            'Notifications waiting in the outbox',
+            lambda: {(): sum(outbox.pending_count() for _ in workspaces.each())},
+        )
+        metrics.register_gauge(
+            'taskmanager_outbox_parked',
+            'Notifications that gave up after MAX_ATTEMPTS failed deliveries',
+            lambda: {(): sum(outbox.parked_count() for _ in workspaces.each())},
+        )
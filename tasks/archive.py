@@ -0,0 +1,115 @@
+"""
+Archive tier for long-done tasks.
+
+Tasks done for more than ARCHIVE_AFTER_DAYS move, with their comments, from
+tasks_task/tasks_comment into tasks_archivedtask/tasks_archivedcomment.
+Each batch is one transaction of set-based INSERT ... SELECT and DELETE
+statements, so the hot table and its indexes only hold live work. Project
+rollups are left alone: an archived task still counts as done, and
+`manage.py backfill_rollups` rebuilds them from both tables.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from . import saved_filters, shards, tags
+from .calendar_events import invalidate, task_user_ids
+from .dependencies import detach
+from .subtasks import path_for
+from .models import ArchivedComment, ArchivedTask, Comment, OutboxMessage, Task
+
+
+def _columns(model, exclude=()):
+    return [field.column for field in model._meta.concrete_fields if field.column not in exclude]
+
+
+def _move(cursor, source, target, columns, key, ids, extra=None):
+    """INSERT ... SELECT rows whose `key` is in `ids` from source into target, then delete them"""
+    quote = cursor.db.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    target_columns = [*columns, *(extra or {})]
+    cursor.execute(
+        'INSERT INTO {target} ({target_columns}) SELECT {columns} FROM {source} WHERE {key} IN ({ids})'.format(
+            target=quote(target._meta.db_table),
+            target_columns=', '.join(quote(c) for c in target_columns),
+            columns=', '.join([*(quote(c) for c in columns), *(['%s'] * len(extra or {}))]),
+            source=quote(source._meta.db_table),
+            key=quote(key),
+            ids=placeholders,
+        ),
+        [*(extra or {}).values(), *ids],
+    )
+    moved = cursor.rowcount
+    cursor.execute(
+        f'DELETE FROM {quote(source._meta.db_table)} WHERE {quote(key)} IN ({placeholders})', ids,
+    )
+    return moved
+
+
+def archivable(now=None, days=None):
+    """Done tasks whose completion (or last update, if unrecorded) is older than the cutoff"""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.ARCHIVE_AFTER_DAYS if days is None else days)
+    return Task.objects.filter(status='done').filter(
+        Q(completed_at__lt=cutoff) | Q(completed_at__isnull=True, updated_at__lt=cutoff)
+    ).exclude(
+        # Parents go after their subtasks, which may still be open
+        Exists(Task.objects.filter(parent=OuterRef('pk')))
+    )
+
+
+def archive_tasks(ids, now=None):
+    """Move the given tasks and their comments into the archive tables"""
+    ids = list(ids)
+    if not ids:
+        return {'tasks': 0, 'comments': 0}
+    with transaction.atomic(using=shards.current()), shards.connection().cursor() as cursor:
+        user_ids = task_user_ids(Task.objects.filter(pk__in=ids))
+        # Archived tasks neither block nor wait on anything, and drop out of tag
+        # counts and saved filter results
+        detach(ids)
+        tags.detach(ids)
+        saved_filters.detach(ids)
+        # Sent notifications stay as history without the task link
+        OutboxMessage.objects.filter(task_id__in=ids).update(task=None)
+        archived_at = cursor.db.ops.adapt_datetimefield_value(now or timezone.now())
+        tasks = _move(cursor, Task, ArchivedTask, _columns(Task), 'id', ids, {'archived_at': archived_at})
+        comments = _move(cursor, Comment, ArchivedComment, _columns(Comment), 'task_id', ids)
+        transaction.on_commit(lambda: invalidate(user_ids), using=shards.current())
+    return {'tasks': tasks, 'comments': comments}
+
+
+def archive_done(days=None, batch_size=500, now=None, stdout=None):
+    """Archive every archivable task, `batch_size` tasks per transaction, leaves first"""
+    totals = {'tasks': 0, 'comments': 0}
+    candidates = archivable(now, days).order_by('id').values_list('id', flat=True)
+    while True:
+        ids = list(candidates[:batch_size])
+        if not ids:
+            return totals
+        counts = archive_tasks(ids, now)
+        for key, count in counts.items():
+            totals[key] += count
+        if stdout is not None:
+            stdout.write(f"Archived {totals['tasks']} tasks so far")
+
+
+def restore_task(task_id):
+    """Move an archived task and its comments back into the live tables"""
+    with transaction.atomic(using=shards.current()), shards.connection().cursor() as cursor:
+        # Foreign keys are checked at commit, so table order does not matter
+        restored = _move(cursor, ArchivedTask, Task, _columns(Task), 'id', [task_id])
+        _move(cursor, ArchivedComment, Comment, _columns(Comment), 'task_id', [task_id])
+        if restored:
+            # Re-attach under the live parent, or become a root if it is gone
+            task = Task.objects.get(pk=task_id)
+            if task.parent_id and not Task.objects.filter(pk=task.parent_id).exists():
+                task.parent_id = None
+            Task.objects.filter(pk=task_id).update(parent_id=task.parent_id, path=path_for(task))
+            user_ids = task_user_ids(Task.objects.filter(pk=task_id))
+            saved_filters.mark_stale(user_ids)
+            transaction.on_commit(lambda: invalidate(user_ids), using=shards.current())
+    return bool(restored)
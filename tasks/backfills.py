@@ -0,0 +1,141 @@
+"""
+Resumable, batched data migrations.
+
+A Backfill transforms one model's rows in primary-key order, one short
+transaction per batch, and advances its BackfillState checkpoint in the
+same transaction. An interrupted run resumes after the last committed
+batch; a finished backfill does nothing until it is restarted. After each
+batch the runner pauses in proportion to the batch's own duration, so a
+backfill holds the write lock for at most `duty_cycle` of the time and
+other writers get in between batches.
+
+Migrations run backfills with RunBackfill, on historical models, and must
+set `atomic = False` so the batches commit one by one. `manage.py
+run_backfill` runs them online, reports their checkpoints and restarts
+them to repair a denormalized column that drifted.
+"""
+
+import time
+from datetime import timedelta
+
+from django.apps import apps as global_apps
+from django.db import migrations, transaction
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import shards
+
+
+class Backfill:
+    """A batched transformation of `model`'s rows; subclasses define apply()"""
+    name = None
+    model = None  # 'app_label.ModelName'
+    batch_size = 1000
+    # Share of wall-clock time spent in batches; pauses take the rest
+    duty_cycle = 0.5
+
+    def __init__(self, apps=global_apps, using=None):
+        self.apps = apps
+        self.using = using or shards.current()
+
+    def get_model(self, name=None):
+        return self.apps.get_model(name or self.model)
+
+    def get_queryset(self):
+        """Rows to transform; walked in primary-key order"""
+        return self.get_model()._default_manager.using(self.using)
+
+    def apply(self, batch):
+        """Transform the rows of the queryset `batch`"""
+        raise NotImplementedError('subclasses of Backfill must provide an apply() method')
+
+
+def checkpoint(backfill):
+    """The backfill's BackfillState, created on first use"""
+    states = backfill.get_model('tasks.BackfillState')._default_manager.using(backfill.using)
+    return states.get_or_create(name=backfill.name)[0]
+
+
+def progress(backfill, state, top, rows, keys, elapsed):
+    """Progress line; `rows` and `keys` are the rows done and key range covered in `elapsed` seconds"""
+    line = f'{backfill.name}: {state.rows} rows, key {state.last_pk}/{top} ({state.last_pk / top if top else 1:.0%})'
+    if keys and elapsed:
+        remaining = elapsed * max(top - state.last_pk, 0) / keys
+        line += f', {rows / elapsed:.0f} rows/s, ~{timedelta(seconds=round(remaining))} left'
+    return line
+
+
+def run(backfill, batch_size=None, duty_cycle=None, max_batches=None, restart=False, log=None):
+    """
+    Run `backfill` from its checkpoint until done, or for at most
+    `max_batches` batches; returns the checkpoint
+    """
+    batch_size = batch_size or backfill.batch_size
+    duty_cycle = duty_cycle or backfill.duty_cycle
+    state = checkpoint(backfill)
+    if restart:
+        state.last_pk, state.rows, state.started_at, state.finished_at = 0, 0, timezone.now(), None
+        state.save()
+    if state.finished_at is not None:
+        return state
+    queryset = backfill.get_queryset().order_by('pk')
+    # Keys are walked in order, so the key reached estimates progress
+    top = queryset.aggregate(top=Max('pk'))['top'] or 0
+    first_pk, first_rows = state.last_pk, state.rows
+    started = time.perf_counter()
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        batch_started = time.perf_counter()
+        with transaction.atomic(using=backfill.using):
+            keys = list(queryset.filter(pk__gt=state.last_pk).values_list('pk', flat=True)[:batch_size])
+            if not keys:
+                state.finished_at = timezone.now()
+                state.save()
+                break
+            backfill.apply(queryset.filter(pk__gte=keys[0], pk__lte=keys[-1]))
+            state.last_pk = keys[-1]
+            state.rows += len(keys)
+            state.save()
+        batches += 1
+        if log is not None:
+            log(progress(
+                backfill, state, top, state.rows - first_rows, state.last_pk - first_pk, time.perf_counter() - started,
+            ))
+        time.sleep((time.perf_counter() - batch_started) * (1 / duty_cycle - 1))
+    return state
+
+
+class RunBackfill(migrations.RunPython):
+    """Migration operation running a Backfill; use in a migration with atomic = False"""
+
+    def __init__(self, backfill_class, **kwargs):
+        self.backfill_class = backfill_class
+        super().__init__(self.forwards, migrations.RunPython.noop, **kwargs)
+
+    def forwards(self, apps, schema_editor):
+        run(self.backfill_class(apps, using=schema_editor.connection.alias))
+
+    def describe(self):
+        return f'Backfill {self.backfill_class.name}'
+
+
+class CommentCounts(Backfill):
+    """comment_count of every task, counted from its comments"""
+    name = 'task_comment_counts'
+    model = 'tasks.Task'
+    comment_model = 'tasks.Comment'
+
+    def apply(self, batch):
+        comments = self.get_model(self.comment_model)._default_manager.filter(task=OuterRef('pk'))
+        counts = comments.order_by().values('task').annotate(n=Count('pk')).values('n')
+        batch.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+class ArchivedCommentCounts(CommentCounts):
+    name = 'archived_task_comment_counts'
+    model = 'tasks.ArchivedTask'
+    comment_model = 'tasks.ArchivedComment'
+
+
+BACKFILLS = {backfill.name: backfill for backfill in (CommentCounts, ArchivedCommentCounts)}
@@ -0,0 +1,167 @@
+"""
+Online SQLite backups.
+
+copy() runs SQLite's backup API a few pages at a time and sleeps between
+steps. The source is only read-locked during a step, so writers keep
+committing while a multi-GB database is copied. A write from another
+connection makes SQLite restart the copy; each restart doubles the pause
+(up to MAX_PAUSE) and after MAX_RESTARTS the copy gives up with
+BackupError rather than locking writers out until it finishes.
+
+snapshot() writes a consistent copy of one database to BACKUP_DIR. It
+checks the copy with PRAGMA integrity_check, can gzip it in fixed-size
+chunks, and only renames it into place once it is complete. prune()
+keeps the newest BACKUP_KEEP snapshots of each database.
+"""
+
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .benchmarking import Stopwatch
+
+# 256 pages of 4 KiB: 1 MiB per step
+PAGES_PER_STEP = 256
+# Seconds between steps, when writers can take the lock
+STEP_PAUSE = 0.005
+# Longest pause between steps after back-off
+MAX_PAUSE = 1.0
+MAX_RESTARTS = 5
+# Bytes read and compressed at a time
+CHUNK_SIZE = 1024 * 1024
+
+
+class BackupError(Exception):
+    """The snapshot could not be taken or failed verification"""
+
+
+class _Restarted(Exception):
+    pass
+
+
+def copy(source, target, pages=PAGES_PER_STEP, pause=STEP_PAUSE, max_restarts=MAX_RESTARTS, log=None):
+    """
+    Copy the sqlite3 connection `source` into `target` in steps of `pages`
+    pages, sleeping `pause` seconds after each and twice as long after every
+    restart. Returns how often concurrent writes restarted the copy; raises
+    BackupError once they have restarted it `max_restarts` times
+    """
+    restarts = 0
+    remaining_before = None
+    delay = pause
+
+    def step(status, remaining, total):
+        nonlocal restarts, remaining_before, delay
+        if remaining_before is not None and remaining >= remaining_before:
+            restarts += 1
+            if log is not None:
+                log(f'Copy restarted by a concurrent write ({restarts}/{max_restarts})')
+            if restarts >= max_restarts:
+                raise _Restarted
+            delay = min(max(delay * 2, STEP_PAUSE), MAX_PAUSE)
+        remaining_before = remaining
+        time.sleep(delay)
+
+    try:
+        source.backup(target, pages=pages, progress=step)
+    except _Restarted:
+        # Never fall back to one big step: it would lock writers out until it finished
+        raise BackupError(f'Concurrent writes restarted the copy {restarts} times; try again later') from None
+    return restarts
+
+
+def file_name(alias, when):
+    return f'{alias}-{when:%Y%m%d-%H%M%S}.sqlite3'
+
+
+def verify(path, quick=False):
+    """Raise BackupError unless the database file at `path` passes SQLite's integrity check"""
+    db = sqlite3.connect(path)
+    try:
+        rows = [row for row, in db.execute('PRAGMA quick_check' if quick else 'PRAGMA integrity_check')]
+    except sqlite3.DatabaseError as error:
+        rows = [str(error)]
+    finally:
+        db.close()
+    if rows != ['ok']:
+        raise BackupError(f'{path.name} failed its integrity check: {"; ".join(rows[:5])}')
+
+
+def compress(path):
+    """Gzip `path` into `path`.gz chunk by chunk and remove the original; returns the new path"""
+    compressed = path.with_name(f'{path.name}.gz')
+    partial = path.with_name(f'{compressed.name}.partial')
+    with open(path, 'rb') as source, gzip.open(partial, 'wb', compresslevel=6) as target:
+        shutil.copyfileobj(source, target, CHUNK_SIZE)
+    os.replace(partial, compressed)
+    path.unlink()
+    return compressed
+
+
+def snapshot(alias, directory=None, compressed=False, quick=False, pages=PAGES_PER_STEP, pause=STEP_PAUSE, log=None):
+    """
+    Back up the database `alias` into `directory` (BACKUP_DIR). Returns the
+    snapshot path and a dict with its timings in seconds and sizes in bytes
+    """
+    directory = directory or settings.BACKUP_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / file_name(alias, timezone.now())
+    partial = path.with_name(f'{path.name}.partial')
+    connection = connections[alias]
+    if connection.in_atomic_block:
+        # The copy's read lock would wait for our own write transaction forever
+        raise BackupError(f'Cannot back up {alias} inside a transaction')
+    connection.ensure_connection()
+    stats = {}
+    try:
+        target = sqlite3.connect(partial)
+        try:
+            with Stopwatch() as timer:
+                stats['restarts'] = copy(connection.connection, target, pages, pause, log=log)
+        finally:
+            target.close()
+        stats['copy'] = timer.elapsed
+        stats['size'] = partial.stat().st_size
+        with Stopwatch() as timer:
+            verify(partial, quick)
+        stats['verify'] = timer.elapsed
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+    if compressed:
+        with Stopwatch() as timer:
+            path = compress(path)
+        stats['compress'] = timer.elapsed
+    stats['stored'] = path.stat().st_size
+    return path, stats
+
+
+def snapshots(alias, directory=None):
+    """Finished snapshots of `alias`, oldest first"""
+    directory = directory or settings.BACKUP_DIR
+    if not directory.exists():
+        return []
+    names = (f'{alias}-*.sqlite3', f'{alias}-*.sqlite3.gz')
+    return sorted(
+        (path for pattern in names for path in directory.glob(pattern)
+         if path.name.removeprefix(f'{alias}-')[:1].isdigit()),
+        key=lambda path: path.name,
+    )
+
+
+def prune(alias, keep=None, directory=None):
+    """
+    Delete all but the newest `keep` (BACKUP_KEEP) snapshots of `alias`; 0
+    keeps them all. Returns the deleted paths
+    """
+    keep = settings.BACKUP_KEEP if keep is None else keep
+    stale = snapshots(alias, directory)[:-keep] if keep else []
+    for path in stale:
+        path.unlink()
+    return stale
@@ -0,0 +1,112 @@
+"""
+Helpers shared by the benchmark management commands.
+
+Benchmarks run against a throwaway test database so they never touch
+the data in db.sqlite3.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def isolated_database(verbosity=0):
+    """Create a test database for the duration of the block"""
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an unsorted list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples):
+    """Summarize latency samples (in seconds) as milliseconds"""
+    count = len(samples)
+    return {
+        'count': count,
+        'mean_ms': round(sum(samples) / count * 1000, 3) if count else 0.0,
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3) if count else 0.0,
+    }
+
+
+def seed_dataset(users=5, tasks_per_user=50, comments_per_task=3):
+    """Bulk-create a small dataset and return the first (benchmark) user"""
+    from django.contrib.auth.models import User
+    from django.contrib.auth.hashers import make_password
+
+    from .dependencies import add_dependency
+    from .models import Category, Comment, Project, SavedFilter, Task
+
+    password = make_password('bench-pass-123')
+    owners = User.objects.bulk_create([
+        User(username=f'bench{index}', password=password) for index in range(users)
+    ])
+    categories = Category.objects.bulk_create([
+        Category(name=f'Category {user.username}', created_by=user) for user in owners
+    ])
+    projects = Project.objects.bulk_create([
+        Project(name=f'Project {user.username}', owner=user) for user in owners
+    ])
+    statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+    priorities = [choice for choice, _ in Task.PRIORITY_CHOICES]
+    tasks = Task.objects.bulk_create([
+        Task(
+            title=f'Task {index} of {user.username}',
+            description='Benchmark task ' * 10,
+            status=statuses[index % len(statuses)],
+            priority=priorities[index % len(priorities)],
+            created_by=user,
+            assigned_to=owners[(position + 1) % len(owners)],
+            category=category,
+            project=project,
+            comment_count=comments_per_task,
+        )
+        for position, (user, category, project) in enumerate(zip(owners, categories, projects))
+        for index in range(tasks_per_user)
+    ], batch_size=500)
+    Comment.objects.bulk_create([
+        Comment(task=task, user=task.created_by, content=f'Comment {index}')
+        for task in tasks
+        for index in range(comments_per_task)
+    ], batch_size=500)
+    # Left stale, so the first read computes their results
+    SavedFilter.objects.bulk_create([
+        SavedFilter(user=user, name='Urgent to do', params={'status': 'todo', 'priority': 'urgent'})
+        for user in owners
+    ])
+    # Each user's first task is blocked by their second
+    for offset in range(0, len(tasks) if tasks_per_user > 1 else 0, tasks_per_user):
+        add_dependency(tasks[offset], tasks[offset + 1])
+    return owners[0]
+
+
+class Stopwatch:
+    """Context manager recording the wall-clock duration of a block"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self.start
+        return False
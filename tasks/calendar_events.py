@@ -0,0 +1,85 @@
+"""
+Due-date calendar data.
+
+Events for a user and date range are cached as plain dicts in the shared
+'calendar' cache. Keys embed a per-user version which every task change
+bumps for its creator and assignee, so stale ranges are simply never read
+again and expire on their own. Keys also name the workspace shard, whose
+user ids overlap with every other shard's.
+"""
+
+import time
+from datetime import date, datetime
+
+from django.core.cache import caches
+from django.db.models import Q
+from django.utils import timezone
+
+from . import shards
+from .models import Task
+
+MAX_RANGE_DAYS = 42  # a six-week month grid
+EVENT_FIELDS = ['id', 'title', 'status', 'priority', 'due_date']
+
+
+def get_cache():
+    return caches['calendar']
+
+
+def parse_range(start, end):
+    """Validate ISO start/end dates (end exclusive); raise ValueError if invalid"""
+    start, end = date.fromisoformat(start), date.fromisoformat(end)
+    if not 0 < (end - start).days <= MAX_RANGE_DAYS:
+        raise ValueError(f'Range must span 1 to {MAX_RANGE_DAYS} days')
+    return start, end
+
+
+def version_key(user_id):
+    return f'calendar:{shards.current()}:version:{user_id}'
+
+
+def invalidate(user_ids):
+    """Start a new cache generation for each user"""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        version = time.time_ns()
+        get_cache().set_many({version_key(user_id): version for user_id in user_ids}, timeout=None)
+
+
+def task_user_ids(queryset):
+    """Every creator and assignee of the tasks in `queryset`"""
+    pairs = queryset.order_by().values_list('created_by_id', 'assigned_to_id').distinct()
+    return {user_id for pair in pairs for user_id in pair}
+
+
+def events(user, start, end):
+    """Tasks due in [start, end) that `user` created or is assigned to"""
+    start_at = timezone.make_aware(datetime.combine(start, datetime.min.time()))
+    end_at = timezone.make_aware(datetime.combine(end, datetime.min.time()))
+    rows = (
+        Task.objects.filter(Q(created_by=user) | Q(assigned_to=user))
+        .filter(due_date__gte=start_at, due_date__lt=end_at)
+        .order_by('due_date')
+        .values_list(*EVENT_FIELDS)
+    )
+    return [
+        {'id': pk, 'title': title, 'status': status, 'priority': priority,
+         'due': timezone.localtime(due_date).isoformat()}
+        for pk, title, status, priority, due_date in rows
+    ]
+
+
+def cached_events(user, start, end):
+    """events() through the per-user versioned cache"""
+    cache = get_cache()
+    version = cache.get(version_key(user.pk))
+    if version is None:
+        version = time.time_ns()
+        cache.add(version_key(user.pk), version, timeout=None)
+        version = cache.get(version_key(user.pk), version)
+    key = f'calendar:{shards.current()}:{user.pk}:{version}:{start.isoformat()}:{end.isoformat()}'
+    result = cache.get(key)
+    if result is None:
+        result = events(user, start, end)
+        cache.set(key, result)
+    return result
@@ -0,0 +1,219 @@
+"""
+Synthetic data generation for load testing.
+
+Rows are written with raw ``executemany`` inserts in large batches:
+no model instances are built, no signals fire and the password hash is
+computed once for every generated user. Primary keys are assigned up
+front so foreign keys never have to be read back from the database.
+"""
+
+import math
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .analytics import backfill
+from .models import Category, Comment, Project, Task
+from .subtasks import segment
+
+
+DEFAULT_STATUS_MIX = {'todo': 40, 'in_progress': 20, 'review': 10, 'done': 30}
+DEFAULT_PRIORITY_MIX = {'low': 25, 'medium': 45, 'high': 20, 'urgent': 10}
+
+
+def parse_mix(value, choices):
+    """Parse 'todo=40,done=60' into a {choice: weight} dict"""
+    valid = {choice for choice, _ in choices}
+    mix = {}
+    for part in value.split(','):
+        key, _, weight = part.partition('=')
+        key = key.strip()
+        if key not in valid:
+            raise ValueError(f'Unknown choice {key!r}, expected one of {sorted(valid)}')
+        mix[key] = float(weight)
+    return mix
+
+
+class DatasetGenerator:
+    """Generate users, categories, projects, tasks and comments"""
+
+    def __init__(self, users, tasks, comments, categories_per_user=3,
+                 projects_per_user=2, skew=1.1, status_mix=None,
+                 priority_mix=None, assigned_rate=0.7, due_date_rate=0.6,
+                 batch_size=10000, seed=None, password='loadtest-pass-123',
+                 stdout=None):
+        self.users = users
+        self.tasks = tasks
+        self.comments = comments
+        self.categories_per_user = categories_per_user
+        self.projects_per_user = projects_per_user
+        self.skew = skew
+        self.status_mix = status_mix or DEFAULT_STATUS_MIX
+        self.priority_mix = priority_mix or DEFAULT_PRIORITY_MIX
+        self.assigned_rate = assigned_rate
+        self.due_date_rate = due_date_rate
+        self.batch_size = batch_size
+        self.password = password
+        self.rng = random.Random(seed)
+        self.stdout = stdout
+        self.counts = {}
+
+    def run(self):
+        """Generate the whole dataset and return the number of rows per table"""
+        self.now = timezone.now()
+        # A pool of pre-adapted timestamps is much cheaper than adapting
+        # one datetime per row
+        self.timestamps = [
+            connection.ops.adapt_datetimefield_value(self.now - timedelta(minutes=minutes))
+            for minutes in range(0, 60 * 24 * 365, 60 * 24 * 365 // 2000)
+        ]
+        with fast_inserts():
+            self.user_ids = self.generate_users()
+            self.category_base = self.generate_per_user(Category, self.categories_per_user)
+            self.project_base = self.generate_per_user(Project, self.projects_per_user)
+            self.generate_tasks_and_comments()
+        if self.projects_per_user:
+            # Raw inserts bypass Task.save, so build the new projects' rollups
+            self.log('Backfilling project rollups')
+            backfill(range(self.project_base, self.project_base + self.users * self.projects_per_user))
+        return self.counts
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def next_id(self, model):
+        return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+    def insert(self, model, fields, rows):
+        """Insert tuples of values for `fields` with a single executemany"""
+        if not rows:
+            return
+        columns = [model._meta.get_field(name).column for name in fields]
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            connection.ops.quote_name(model._meta.db_table),
+            ', '.join(connection.ops.quote_name(column) for column in columns),
+            ', '.join(['%s'] * len(columns)),
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(rows)
+
+    def timestamp(self):
+        return self.rng.choice(self.timestamps)
+
+    def generate_users(self):
+        start = self.next_id(User)
+        password = make_password(self.password)
+        fields = ['id', 'password', 'is_superuser', 'username', 'first_name',
+                  'last_name', 'email', 'is_staff', 'is_active', 'date_joined']
+        for offset in range(0, self.users, self.batch_size):
+            ids = range(start + offset, start + min(offset + self.batch_size, self.users))
+            self.insert(User, fields, [
+                (pk, password, False, f'user{pk}', '', '', f'user{pk}@example.com',
+                 False, True, self.timestamp())
+                for pk in ids
+            ])
+        self.log(f'Created {self.users} users')
+        return list(range(start, start + self.users))
+
+    def generate_per_user(self, model, per_user):
+        """Create `per_user` rows per user in contiguous id blocks"""
+        start = self.next_id(model)
+        owner_field = 'created_by' if model is Category else 'owner'
+        fields = ['id', 'name', 'description', owner_field, 'created_at']
+        if model is Project:
+            fields.append('updated_at')
+        label = model.__name__
+        rows = []
+        for index, user_id in enumerate(self.user_ids):
+            for slot in range(per_user):
+                pk = start + index * per_user + slot
+                row = (pk, f'{label} {pk}', '', user_id, self.timestamp())
+                rows.append(row + (row[-1],) if model is Project else row)
+            if len(rows) >= self.batch_size:
+                self.insert(model, fields, rows)
+                rows = []
+        self.insert(model, fields, rows)
+        self.log(f'Created {len(self.user_ids) * per_user} {model._meta.verbose_name_plural}')
+        return start
+
+    def generate_tasks_and_comments(self):
+        rng = self.rng
+        task_start = self.next_id(Task)
+        comment_id = self.next_id(Comment)
+        # Zipf-like ownership: the user at rank r owns ~1/r**skew of the tasks
+        owner_weights = list(accumulate(1 / (rank ** self.skew) for rank in range(1, self.users + 1)))
+        statuses, status_weights = zip(*self.status_mix.items())
+        priorities, priority_weights = zip(*self.priority_mix.items())
+        fan_out = self.comments / self.tasks if self.tasks else 0
+        # floor(Exp(rate)) is geometric with mean 1 / (e**rate - 1)
+        fan_out_rate = math.log(1 + 1 / fan_out) if fan_out else 0
+        task_fields = ['id', 'title', 'description', 'status', 'priority', 'assigned_to',
+                       'created_by', 'category', 'project', 'due_date', 'completed_at',
+                       'created_at', 'updated_at', 'path', 'comment_count']
+        comment_fields = ['id', 'task', 'user', 'content', 'created_at', 'updated_at']
+        adapt = connection.ops.adapt_datetimefield_value
+        due_dates = [adapt(self.now + timedelta(hours=hours)) for hours in range(-24 * 30, 24 * 60, 6)]
+
+        for offset in range(0, self.tasks, self.batch_size):
+            size = min(self.batch_size, self.tasks - offset)
+            owners = rng.choices(range(self.users), cum_weights=owner_weights, k=size)
+            task_statuses = rng.choices(statuses, weights=status_weights, k=size)
+            task_priorities = rng.choices(priorities, weights=priority_weights, k=size)
+            task_rows, comment_rows = [], []
+            for index in range(size):
+                pk = task_start + offset + index
+                owner = owners[index]
+                status = task_statuses[index]
+                created = self.timestamp()
+                task_row = (
+                    pk, f'Task {pk}', 'Generated task for load testing',
+                    status, task_priorities[index],
+                    rng.choice(self.user_ids) if rng.random() < self.assigned_rate else None,
+                    self.user_ids[owner],
+                    self.category_base + owner * self.categories_per_user
+                    + rng.randrange(self.categories_per_user) if self.categories_per_user else None,
+                    self.project_base + owner * self.projects_per_user
+                    + rng.randrange(self.projects_per_user) if self.projects_per_user else None,
+                    rng.choice(due_dates) if rng.random() < self.due_date_rate else None,
+                    created if status == 'done' else None,
+                    created, created, segment(pk),
+                )
+                # Long-tailed comment fan-out with the requested mean
+                comment_count = int(rng.expovariate(fan_out_rate)) if fan_out else 0
+                task_rows.append((*task_row, comment_count))
+                for _ in range(comment_count):
+                    stamp = self.timestamp()
+                    comment_rows.append((
+                        comment_id, pk, rng.choice(self.user_ids), 'Generated comment', stamp, stamp,
+                    ))
+                    comment_id += 1
+            self.insert(Task, task_fields, task_rows)
+            self.insert(Comment, comment_fields, comment_rows)
+            self.log(f'Created {offset + size}/{self.tasks} tasks')
+
+
+class fast_inserts:
+    """Relax SQLite durability while bulk loading, restoring it afterwards"""
+
+    def __enter__(self):
+        self.enabled = connection.vendor == 'sqlite' and not connection.in_atomic_block
+        if self.enabled:
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA synchronous')
+                self.synchronous = cursor.fetchone()[0]
+                cursor.execute('PRAGMA synchronous = OFF')
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.enabled:
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA synchronous = {int(self.synchronous)}')
+        return False
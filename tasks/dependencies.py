@@ -0,0 +1,123 @@
+"""
+Task dependencies with a closure table.
+
+TaskDependency holds the direct "blocked by" edges; DependencyClosure holds
+every (ancestor, descendant) pair of the transitive relation with the
+number of distinct chains between them. Adding or removing an edge updates
+the closure with one set-based statement, so transitive lookups and cycle
+checks are single indexed queries however deep the chains get.
+"""
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from . import shards
+from .models import DependencyClosure, DependencyCycle, Task, TaskDependency
+
+CLOSURE = DependencyClosure._meta.db_table
+EDGES = TaskDependency._meta.db_table
+
+# Pairs (a, d) where a reaches the new edge's blocker and d is reachable from
+# its task, each side including the endpoint itself
+_PAIRS = f"""
+    anc(node, paths) AS (
+        SELECT ancestor_id, paths FROM {CLOSURE} WHERE descendant_id = %s
+        UNION ALL SELECT %s, 1
+    ),
+    des(node, paths) AS (
+        SELECT descendant_id, paths FROM {CLOSURE} WHERE ancestor_id = %s
+        UNION ALL SELECT %s, 1
+    )
+"""
+
+_LINK = f"""
+    WITH {_PAIRS}
+    INSERT INTO {CLOSURE} (ancestor_id, descendant_id, paths)
+    SELECT anc.node, des.node, anc.paths * des.paths FROM anc, des WHERE true
+    ON CONFLICT (ancestor_id, descendant_id) DO UPDATE SET paths = paths + excluded.paths
+"""
+
+_UNLINK = f"""
+    WITH {_PAIRS}
+    UPDATE {CLOSURE} SET paths = paths - (
+        SELECT SUM(anc.paths * des.paths) FROM anc, des
+        WHERE anc.node = {CLOSURE}.ancestor_id AND des.node = {CLOSURE}.descendant_id
+    )
+    WHERE ancestor_id IN (SELECT node FROM anc) AND descendant_id IN (SELECT node FROM des)
+"""
+
+_REBUILD = f"""
+    WITH RECURSIVE walk(ancestor_id, descendant_id) AS (
+        SELECT blocked_by_id, task_id FROM {EDGES}
+        UNION ALL
+        SELECT walk.ancestor_id, edge.task_id FROM walk JOIN {EDGES} edge ON edge.blocked_by_id = walk.descendant_id
+    )
+    INSERT INTO {CLOSURE} (ancestor_id, descendant_id, paths)
+    SELECT ancestor_id, descendant_id, COUNT(*) FROM walk GROUP BY ancestor_id, descendant_id
+"""
+
+
+def would_cycle(task_id, blocker_id):
+    """True if `task_id` already (transitively) blocks `blocker_id`"""
+    if task_id == blocker_id:
+        return True
+    return DependencyClosure.objects.filter(ancestor_id=task_id, descendant_id=blocker_id).exists()
+
+
+def add_dependency(task, blocker):
+    """Record that `task` is blocked by `blocker`; raise DependencyCycle if that loops"""
+    with transaction.atomic(using=shards.current()):
+        if would_cycle(task.pk, blocker.pk):
+            raise DependencyCycle(f'{blocker} already depends on {task}')
+        _, created = TaskDependency.objects.get_or_create(task=task, blocked_by=blocker)
+        if created:
+            with shards.connection().cursor() as cursor:
+                cursor.execute(_LINK, [blocker.pk, blocker.pk, task.pk, task.pk])
+    return created
+
+
+def remove_dependency(task_id, blocker_id):
+    """Drop one direct edge and the chains that ran through it"""
+    with transaction.atomic(using=shards.current()):
+        deleted, _ = TaskDependency.objects.filter(task_id=task_id, blocked_by_id=blocker_id).delete()
+        if deleted:
+            with shards.connection().cursor() as cursor:
+                cursor.execute(_UNLINK, [blocker_id, blocker_id, task_id, task_id])
+            DependencyClosure.objects.filter(paths=0).delete()
+    return bool(deleted)
+
+
+def detach(task_ids):
+    """Remove every edge touching these tasks, e.g. before deleting or archiving them"""
+    task_ids = list(task_ids)
+    edges = TaskDependency.objects.filter(task_id__in=task_ids) | TaskDependency.objects.filter(blocked_by_id__in=task_ids)
+    with transaction.atomic(using=shards.current()):
+        for task_id, blocker_id in edges.values_list('task_id', 'blocked_by_id'):
+            remove_dependency(task_id, blocker_id)
+
+
+def rebuild():
+    """Recompute the closure from the direct edges; returns the number of pairs"""
+    with transaction.atomic(using=shards.current()), shards.connection().cursor() as cursor:
+        DependencyClosure.objects.all().delete()
+        cursor.execute(_REBUILD)
+    return DependencyClosure.objects.count()
+
+
+def blockers(task):
+    """Every task that transitively blocks `task`"""
+    return Task.objects.filter(
+        Exists(DependencyClosure.objects.filter(ancestor=OuterRef('pk'), descendant=task))
+    )
+
+
+def blocking(task):
+    """Every task that `task` transitively blocks"""
+    return Task.objects.filter(
+        Exists(DependencyClosure.objects.filter(descendant=OuterRef('pk'), ancestor=task))
+    )
+
+
+def open_blockers():
+    """Subquery: an unfinished task transitively blocks the outer task"""
+    return DependencyClosure.objects.filter(descendant=OuterRef('pk')).exclude(ancestor__status='done')
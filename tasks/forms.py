@@ -1,10 +1,19 @@
 from django import forms
 from django.contrib.auth.models import User
+from . import tags
 from .models import Task, Category, Project, Comment
 
 
 class TaskForm(forms.ModelForm):
     """Form for creating and updating tasks"""
+    # Version the editor started from, checked by the compare-and-set save
+    version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+    # The editing user's own tags, kept outside the model fields and the version check
+    tags = forms.CharField(
+        required=False,
+        help_text='Comma-separated, e.g. "frontend, bug"',
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Add tags'})
+    )
     
     class Meta:
         model = Task
@@ -41,6 +50,42 @@ class TaskForm(forms.ModelForm):
             # Filter categories and projects to user's own
             self.fields['category'].queryset = Category.objects.filter(created_by=user)
             self.fields['project'].queryset = Project.objects.filter(owner=user)
+        
+        if self.instance.pk:
+            self.fields['version'].initial = self.instance.version
+            if user:
+                names = self.instance.tags.filter(created_by=user).values_list('name', flat=True)
+                self.fields['tags'].initial = ', '.join(names)
+    
+    def clean_tags(self):
+        names = tags.parse_names(self.cleaned_data['tags'])
+        too_long = [name for name in names if len(name) > tags.MAX_NAME_LENGTH]
+        if too_long:
+            raise forms.ValidationError(f'Tags are at most {tags.MAX_NAME_LENGTH} characters: {too_long[0]}')
+        return names
+    
+    def conflicts(self, current):
+        """Field-level diff between the submitted values and the stored task"""
+        diff = []
+        for name in self._meta.fields:
+            model_field = current._meta.get_field(name)
+            stored = model_field.value_from_object(current)
+            if not self.fields[name].has_changed(stored, self[name].data):
+                continue
+            diff.append({
+                'field': self.fields[name].label,
+                'yours': self._display(model_field, self.cleaned_data.get(name)),
+                'theirs': self._display(model_field, getattr(current, name)),
+            })
+        return diff
+    
+    @staticmethod
+    def _display(model_field, value):
+        if value is None or value == '':
+            return '—'
+        if model_field.choices:
+            return dict(model_field.flatchoices).get(value, value)
+        return str(value)
 
 
 class CategoryForm(forms.ModelForm):
@@ -0,0 +1,71 @@
+"""
+Template and cache backends that report to tasks.metrics.
+
+Configured in settings.TEMPLATES and settings.CACHES; behaviour is
+otherwise identical to the Django backends they extend.
+"""
+
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.template.backends.django import DjangoTemplates
+
+from . import metrics
+
+_MISSING = object()
+
+
+class TimedTemplate:
+    """Wrap a backend template and time each render"""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.observe(
+                'taskmanager_template_render_duration_seconds',
+                time.perf_counter() - start,
+                template=self.template.origin.template_name or 'string',
+            )
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend recording render time per template"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class InstrumentedCacheMixin:
+    """Count hits and misses of get(); the label is the METRICS_NAME param"""
+
+    def __init__(self, location, params):
+        super().__init__(location, params)
+        self.metrics_name = params.get('METRICS_NAME', 'default')
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        metrics.inc(
+            'taskmanager_cache_requests_total',
+            cache=self.metrics_name, result='miss' if value is _MISSING else 'hit',
+        )
+        return default if value is _MISSING else value
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedFileBasedCache(InstrumentedCacheMixin, FileBasedCache):
+    pass
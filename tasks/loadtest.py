@@ -0,0 +1,210 @@
+"""
+In-process load generator for the WSGI application.
+
+Simulated users call ``taskmanager.wsgi.application`` directly from a
+thread pool, so no server, network or external tool is involved. Each
+user gets a real authenticated session and a fixed CSRF token, then
+runs a weighted mix of scenarios until the time budget is spent.
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+from io import BytesIO
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.db import close_old_connections, connections
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+from importlib import import_module
+
+from .benchmarking import summarize
+from .models import Task
+
+
+DEFAULT_MIX = {'list': 40, 'detail': 30, 'search': 15, 'create': 5, 'comment': 10}
+
+# Upper bounds (ms) of the latency histogram buckets
+HISTOGRAM_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf')]
+
+
+def request_host():
+    """A host name the application accepts (localhost is allowed in DEBUG)"""
+    for host in settings.ALLOWED_HOSTS:
+        if host not in ('*', '') and not host.startswith('.'):
+            return host
+    return 'localhost'
+
+
+class SimulatedUser:
+    """A logged-in user holding a session cookie and CSRF token"""
+
+    def __init__(self, user, task_ids):
+        self.user = user
+        self.task_ids = task_ids
+        engine = import_module(settings.SESSION_ENGINE)
+        session = engine.SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        self.host = request_host()
+        self.csrf_token = get_random_string(32)
+        self.cookie = (
+            f'{settings.SESSION_COOKIE_NAME}={session.session_key}; '
+            f'{settings.CSRF_COOKIE_NAME}={self.csrf_token}'
+        )
+
+    def environ(self, method, path, query=None, data=None):
+        """Build a WSGI environ for a request made by this user"""
+        body = urlencode(data or {}).encode()
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': urlencode(query or {}),
+            'SERVER_NAME': self.host,
+            'HTTP_HOST': self.host,
+            'HTTP_COOKIE': self.cookie,
+            'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body),
+        }
+        if method == 'POST':
+            environ['HTTP_X_CSRFTOKEN'] = self.csrf_token
+        setup_testing_defaults(environ)
+        return environ
+
+
+def scenario_requests(name, user, rng):
+    """Return (method, path, query, data) for one request of a scenario"""
+    if name == 'list':
+        return 'GET', reverse('task_list'), None, None
+    if name == 'search':
+        return 'GET', reverse('task_list'), {'search': rng.choice(['Task', 'report', '1'])}, None
+    if name == 'detail':
+        return 'GET', reverse('task_detail', kwargs={'pk': rng.choice(user.task_ids)}), None, None
+    if name == 'comment':
+        pk = rng.choice(user.task_ids)
+        return 'POST', reverse('task_detail', kwargs={'pk': pk}), None, {'content': 'Load test comment'}
+    if name == 'create':
+        data = {'title': 'Load test task', 'status': 'todo', 'priority': 'medium'}
+        return 'POST', reverse('task_create'), None, data
+    raise ValueError(f'Unknown scenario: {name}')
+
+
+class LoadTest:
+    """Drive a WSGI application with concurrent simulated users"""
+
+    def __init__(self, application, users, mix=None, concurrency=8,
+                 duration=10.0, ramp_up=0.0, seed=None):
+        self.application = application
+        self.users = users
+        self.mix = mix or DEFAULT_MIX
+        self.concurrency = concurrency
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.statuses = defaultdict(int)
+        self.errors = defaultdict(int)
+
+    def call(self, environ):
+        """Run one request through the application and return its status"""
+        status_holder = []
+
+        def start_response(status, headers, exc_info=None):
+            status_holder.append(int(status.split()[0]))
+            return lambda data: None
+
+        result = self.application(environ, start_response)
+        try:
+            for _ in result:
+                pass
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return status_holder[0]
+
+    def worker(self, index, deadline):
+        rng = random.Random(None if self.seed is None else self.seed + index)
+        names, weights = zip(*self.mix.items())
+        # Stagger worker start times evenly across the ramp-up period
+        time.sleep(self.ramp_up * index / self.concurrency)
+        try:
+            while time.monotonic() < deadline:
+                user = self.users[rng.randrange(len(self.users))]
+                name = rng.choices(names, weights=weights)[0]
+                method, path, query, data = scenario_requests(name, user, rng)
+                start = time.perf_counter()
+                try:
+                    status = self.call(user.environ(method, path, query, data))
+                except Exception as e:
+                    status = None
+                    error = type(e).__name__
+                elapsed = time.perf_counter() - start
+                with self.lock:
+                    self.samples[name].append(elapsed)
+                    if status is None:
+                        self.errors[f'{name}: {error}'] += 1
+                    else:
+                        self.statuses[status] += 1
+                        if status >= 400:
+                            self.errors[f'{name}: HTTP {status}'] += 1
+        finally:
+            connections.close_all()
+
+    def run(self):
+        """Run the load test and return a report dict"""
+        close_old_connections()
+        started = time.monotonic()
+        deadline = started + self.ramp_up + self.duration
+        threads = [
+            threading.Thread(target=self.worker, args=(index, deadline), daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+        return self.report(elapsed)
+
+    def report(self, elapsed):
+        all_samples = [sample for samples in self.samples.values() for sample in samples]
+        total = len(all_samples)
+        histogram = [0] * len(HISTOGRAM_BUCKETS)
+        for sample in all_samples:
+            ms = sample * 1000
+            histogram[next(i for i, bound in enumerate(HISTOGRAM_BUCKETS) if ms <= bound)] += 1
+        error_count = sum(self.errors.values())
+        return {
+            'requests': total,
+            'elapsed_s': round(elapsed, 3),
+            'throughput_rps': round(total / elapsed, 1) if elapsed else 0.0,
+            'error_rate': round(error_count / total, 4) if total else 0.0,
+            'errors': dict(self.errors),
+            'statuses': dict(self.statuses),
+            'latency': summarize(all_samples),
+            'scenarios': {name: summarize(samples) for name, samples in self.samples.items()},
+            'histogram': dict(zip(
+                [f'<={bound}ms' if bound != float('inf') else '>2500ms' for bound in HISTOGRAM_BUCKETS],
+                histogram,
+            )),
+        }
+
+
+def simulated_users(users, tasks_per_user=100):
+    """Build SimulatedUsers for users that can see at least one task"""
+    simulated = []
+    for user in users:
+        task_ids = list(
+            Task.objects.filter(created_by=user).values_list('pk', flat=True)[:tasks_per_user]
+        )
+        if task_ids:
+            simulated.append(SimulatedUser(user, task_ids))
+    return simulated
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from tasks.workspaces import add_user, selected
+
+
+class Command(BaseCommand):
+    help = 'Create a user in a workspace; usernames are unique across workspaces'
+
+    def add_arguments(self, parser):
+        parser.add_argument('workspace', metavar='SLUG')
+        parser.add_argument('username')
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--email', default='')
+        parser.add_argument('--staff', action='store_true')
+
+    def handle(self, *args, **options):
+        workspace, = selected([options['workspace']])
+        add_user(workspace, options['username'], options['password'], email=options['email'], is_staff=options['staff'])
+        self.stdout.write(self.style.SUCCESS(f"Created {options['username']} in workspace {workspace.slug}"))
@@ -0,0 +1,45 @@
+from django.core.management.base import CommandError
+from django.conf import settings
+
+from tasks.archive import archive_done, restore_task
+from tasks.benchmarking import Stopwatch
+from tasks.workspaces import WorkspaceCommand
+
+
+class Command(WorkspaceCommand):
+    help = 'Move long-done tasks and their comments into the archive tables (or restore one)'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help=f'Archive tasks done for more than this many days (default {settings.ARCHIVE_AFTER_DAYS})',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--restore', type=int, metavar='TASK_ID',
+            help='Restore one archived task instead (of the default workspace unless --workspace is given)',
+        )
+
+    def handle(self, *args, **options):
+        if options['restore'] is not None and not options['workspaces']:
+            # Task ids are per shard
+            options['workspaces'] = ['default']
+        super().handle(*args, **options)
+
+    def handle_workspace(self, workspace, *args, **options):
+        if options['restore'] is not None:
+            if not restore_task(options['restore']):
+                raise CommandError(f"Task {options['restore']} is not archived")
+            self.stdout.write(self.style.SUCCESS(f"Restored task {options['restore']}"))
+            return
+
+        with Stopwatch() as timer:
+            counts = archive_done(
+                days=options['days'],
+                batch_size=options['batch_size'],
+                stdout=self.stdout if options['verbosity'] > 1 else None,
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {counts['tasks']} tasks and {counts['comments']} comments in {timer.elapsed:.1f}s"
+        ))
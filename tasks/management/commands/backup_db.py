@@ -0,0 +1,80 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import CommandError
+
+from tasks import backups
+from tasks.workspaces import WorkspaceCommand
+
+
+def _megabytes(size):
+    return size / 1024 / 1024
+
+
+class Command(WorkspaceCommand):
+    help = 'Snapshot the main database and every workspace shard without blocking writers'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--dir', type=Path, help='Where snapshots go (default: BACKUP_DIR)')
+        parser.add_argument('--gzip', action='store_true', help='Compress each snapshot')
+        parser.add_argument('--quick', action='store_true', help='Verify with quick_check instead of integrity_check')
+        parser.add_argument(
+            '--keep', type=int, default=settings.BACKUP_KEEP,
+            help='Snapshots kept per database; older ones are deleted (0 keeps all)',
+        )
+        parser.add_argument(
+            '--pages', type=int, default=backups.PAGES_PER_STEP,
+            help='Pages copied per step; the source is read-locked only during a step',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=backups.STEP_PAUSE, help='Seconds to sleep between steps',
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep taking snapshots every --interval seconds')
+        parser.add_argument('--interval', type=float, default=24 * 60 * 60, help='Seconds between runs')
+
+    def handle(self, *args, **options):
+        if options['pages'] < 1:
+            raise CommandError('--pages must be at least 1')
+        while True:
+            try:
+                super().handle(*args, **options)
+            except CommandError as error:
+                if not options['loop']:
+                    raise
+                # One failed run must not end the schedule
+                self.stderr.write(f'Backup run failed: {error}')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def handle_workspace(self, workspace, *args, **options):
+        alias = workspace.shard
+        try:
+            path, stats = backups.snapshot(
+                alias,
+                directory=options['dir'],
+                compressed=options['gzip'],
+                quick=options['quick'],
+                pages=options['pages'],
+                pause=options['pause'],
+                log=self.stdout.write if options['verbosity'] > 1 else None,
+            )
+        except backups.BackupError as error:
+            if not options['loop']:
+                raise CommandError(str(error))
+            # Log it and carry on with the other workspaces; the next run retries
+            self.stderr.write(f'{alias}: {error}')
+            return
+        size = _megabytes(stats['size'])
+        timings = [
+            f'copied {size:.1f} MB in {stats["copy"]:.1f}s ({size / max(stats["copy"], 1e-6):.0f} MB/s'
+            f', {stats["restarts"]} restart(s))',
+            f'verified in {stats["verify"]:.1f}s',
+        ]
+        if 'compress' in stats:
+            timings.append(f'gzipped to {_megabytes(stats["stored"]):.1f} MB in {stats["compress"]:.1f}s')
+        self.stdout.write(self.style.SUCCESS(f'{alias}: {path.name}, ' + ', '.join(timings)))
+        for stale in backups.prune(alias, options['keep'], options['dir']):
+            self.stdout.write(f'{alias}: deleted {stale.name}')
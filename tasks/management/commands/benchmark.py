@@ -0,0 +1,226 @@
+import json
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from tasks import calendar_events, urls as task_urls
+from tasks.benchmarking import Stopwatch, isolated_database, seed_dataset, summarize
+from tasks.models import Category, Project, SavedFilter, Task, TaskDependency
+from tasks.profiling import ProfileStore
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a dataset, request every URL in tasks/urls.py and record latency '
+        'percentiles, query counts and peak memory per view as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--tasks-per-user', type=int, default=50)
+        parser.add_argument('--comments-per-task', type=int, default=3)
+        parser.add_argument(
+            '--iterations', type=int, default=20,
+            help='Timed requests per view',
+        )
+        parser.add_argument(
+            '--output', default='benchmark.json',
+            help='File the JSON results are written to',
+        )
+        parser.add_argument(
+            '--compare', metavar='BASELINE',
+            help='Compare against a previous results file and fail on regressions',
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Allowed relative p95 latency increase before flagging (default 0.2)',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read baseline: {e}')
+
+        with isolated_database():
+            user = seed_dataset(
+                users=options['users'],
+                tasks_per_user=options['tasks_per_user'],
+                comments_per_task=options['comments_per_task'],
+            )
+            # Staff, so the diagnostics views are measured instead of redirecting to the login page
+            user.is_staff = True
+            user.save(update_fields=['is_staff'])
+            results, skipped = self.run_views(user, options['iterations'])
+
+        report = {
+            'dataset': {
+                'users': options['users'],
+                'tasks_per_user': options['tasks_per_user'],
+                'comments_per_task': options['comments_per_task'],
+            },
+            'iterations': options['iterations'],
+            'views': results,
+        }
+        Path(options['output']).write_text(json.dumps(report, indent=2))
+        self.print_results(results)
+        self.stdout.write(f"Results written to {options['output']}")
+        if skipped:
+            self.stdout.write(f'Skipped: {", ".join(f"{name} ({reason})" for name, reason in skipped.items())}')
+        for name, row in results.items():
+            if not is_success(row['status']):
+                self.stdout.write(self.style.WARNING(f'{name}: status {row["status"]}, not compared'))
+        errors = [name for name, row in results.items() if row['status'] >= 400]
+        if errors:
+            raise CommandError(f'Views failed: {", ".join(errors)}')
+
+        if baseline is not None:
+            regressions = compare_results(baseline['views'], results, options['threshold'])
+            for message in regressions:
+                self.stdout.write(self.style.ERROR(f'REGRESSION {message}'))
+            if regressions:
+                raise CommandError(f'{len(regressions)} regression(s) against {options["compare"]}')
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
+
+    def run_views(self, user, iterations):
+        """
+        Request every named tasks URL and collect its statistics; returns them
+        and {name: reason} for the views that were not timed
+        """
+        client = Client()
+        client.force_login(user)
+        targets = url_targets(user)
+        results = {}
+        skipped = {
+            pattern.name: 'nothing to request' for pattern in task_urls.urlpatterns
+            if pattern.name and pattern.name not in targets
+        }
+        query_count = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal query_count
+            query_count += 1
+            return execute(sql, params, many, context)
+
+        for name, url in targets.items():
+            # Warm-up request, not recorded
+            if self.request(client, user, url) == 405:
+                skipped[name] = 'POST only'
+                continue
+            samples, queries = [], []
+            with connection.execute_wrapper(count_queries):
+                for _ in range(iterations):
+                    query_count = 0
+                    with Stopwatch() as timer:
+                        status = client.get(url).status_code
+                    samples.append(timer.elapsed)
+                    queries.append(query_count)
+                    self.ensure_login(client, user)
+
+            # Memory is measured separately so tracing does not skew timings
+            tracemalloc.start()
+            self.request(client, user, url)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results[name] = {
+                'url': url,
+                'status': status,
+                'queries': max(queries),
+                'peak_memory_kb': round(peak / 1024, 1),
+                **summarize(samples),
+            }
+        return results, skipped
+
+    def request(self, client, user, url):
+        """GET a URL outside of any measurement"""
+        status = client.get(url).status_code
+        self.ensure_login(client, user)
+        return status
+
+    def ensure_login(self, client, user):
+        """Log back in when the view (e.g. logout) ended the session"""
+        if '_auth_user_id' not in client.session:
+            client.force_login(user)
+
+    def print_results(self, results):
+        self.stdout.write(
+            f"{'view':<20}{'status':>7}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'p99 ms':>10}{'queries':>9}{'peak KB':>10}"
+        )
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<20}{row['status']:>7}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}"
+                f"{row['p99_ms']:>10.2f}{row['queries']:>9}{row['peak_memory_kb']:>10.1f}"
+            )
+
+
+def url_targets(user):
+    """
+    Map every named URL in tasks/urls.py to a concrete path for `user`;
+    URLs without anything to point at (e.g. no recorded profile) are left out
+    """
+    objects = {
+        'task': Task.objects.filter(created_by=user).order_by('pk').first(),
+        'category': Category.objects.filter(created_by=user).order_by('pk').first(),
+        'project': Project.objects.filter(owner=user).order_by('pk').first(),
+        'saved': SavedFilter.objects.filter(user=user).order_by('pk').first(),
+    }
+    dependency = TaskDependency.objects.filter(task=objects['task']).order_by('pk').first()
+    profile = next(iter(ProfileStore().list()), None)
+    values = {
+        'status': Task.STATUS_CHOICES[0][0],
+        'blocker_pk': dependency and dependency.blocked_by_id,
+        'profile_id': profile and profile['id'],
+    }
+    targets = {}
+    for pattern in task_urls.urlpatterns:
+        if not pattern.name:
+            continue
+        kwargs = {}
+        for parameter in pattern.pattern.converters:
+            if parameter == 'pk':
+                obj = objects.get(pattern.name.split('_')[0])
+                kwargs['pk'] = obj and obj.pk
+            else:
+                kwargs[parameter] = values.get(parameter)
+        if None in kwargs.values():
+            continue
+        targets[pattern.name] = reverse(pattern.name, kwargs=kwargs)
+    # The feed answers 400 without a date range
+    start = timezone.localdate().replace(day=1)
+    end = start + timedelta(days=calendar_events.MAX_RANGE_DAYS)
+    targets['calendar_feed'] += '?' + urlencode({'start': start.isoformat(), 'end': end.isoformat()})
+    return targets
+
+
+def is_success(status):
+    return 200 <= status < 300
+
+
+def compare_results(baseline, current, threshold):
+    """Return human-readable regressions of `current` against `baseline`"""
+    regressions = []
+    for name, row in current.items():
+        previous = baseline.get(name)
+        # Error pages and redirects are not the view's real work
+        if previous is None or not is_success(row.get('status', 200)) or not is_success(previous.get('status', 200)):
+            continue
+        if row['queries'] > previous['queries']:
+            regressions.append(
+                f"{name}: queries {previous['queries']} -> {row['queries']}"
+            )
+        if row['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {previous['p95_ms']:.2f}ms -> {row['p95_ms']:.2f}ms"
+            )
+    return regressions
@@ -0,0 +1,35 @@
+from django.core.management.base import CommandError
+
+from tasks.models import SavedFilter
+from tasks.saved_filters import check, recompute
+from tasks.workspaces import WorkspaceCommand
+
+
+class Command(WorkspaceCommand):
+    help = 'Compare every saved filter\'s maintained results with a fresh evaluation'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--user', help='Only check this username\'s saved filters')
+        parser.add_argument('--fix', action='store_true', help='Recompute inconsistent filters')
+
+    def handle_workspace(self, workspace, *args, **options):
+        # Stale filters are recomputed on their next read anyway
+        saved = SavedFilter.objects.filter(stale=False).select_related('user').order_by('pk')
+        if options['user']:
+            saved = saved.filter(user__username=options['user'])
+        checked = inconsistent = 0
+        for saved_filter in saved.iterator():
+            checked += 1
+            problems = check(saved_filter)
+            if not problems:
+                continue
+            inconsistent += 1
+            self.stdout.write(f'{saved_filter.user.username}/{saved_filter.name}: {"; ".join(problems)}')
+            if options['fix']:
+                recompute(saved_filter)
+        if inconsistent and not options['fix']:
+            raise CommandError(f'{inconsistent} of {checked} saved filters are inconsistent; rerun with --fix')
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} saved filters, {inconsistent} {"recomputed" if options["fix"] else "inconsistent"}'
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.workspaces import add_user, create
+
+
+class Command(BaseCommand):
+    help = 'Create a workspace with its own migrated shard, optionally with an owner account'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug')
+        parser.add_argument('--name', help='Display name (default: the slug)')
+        parser.add_argument('--shard', help='Shard alias (default: the slug with - replaced by _)')
+        parser.add_argument('--owner', metavar='USERNAME', help='Create this staff user in the workspace')
+        parser.add_argument('--password', help='Password of --owner')
+
+    def handle(self, *args, **options):
+        if options['owner'] and not options['password']:
+            raise CommandError('--owner needs a --password')
+        workspace = create(
+            options['slug'], name=options['name'], shard=options['shard'], verbosity=max(options['verbosity'] - 1, 0),
+        )
+        if options['owner']:
+            add_user(workspace, options['owner'], options['password'], is_staff=True)
+        self.stdout.write(self.style.SUCCESS(f'Created workspace {workspace.slug} in shard {workspace.shard}'))
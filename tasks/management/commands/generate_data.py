@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.benchmarking import Stopwatch
+from tasks.datagen import DatasetGenerator, parse_mix
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate synthetic users, categories, projects, tasks and comments '
+        'for load testing. Rows are bulk inserted without model signals; '
+        'run any backfill commands afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--tasks', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=500000)
+        parser.add_argument('--categories-per-user', type=int, default=3)
+        parser.add_argument('--projects-per-user', type=int, default=2)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Zipf exponent of task ownership (0 = uniform)',
+        )
+        parser.add_argument(
+            '--status-mix', default=None,
+            help='Weighted status mix, e.g. todo=40,in_progress=20,review=10,done=30',
+        )
+        parser.add_argument(
+            '--priority-mix', default=None,
+            help='Weighted priority mix, e.g. low=25,medium=45,high=20,urgent=10',
+        )
+        parser.add_argument('--assigned-rate', type=float, default=0.7)
+        parser.add_argument('--due-date-rate', type=float, default=0.6)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 and (options['tasks'] or options['comments']):
+            raise CommandError('At least one user is needed to own tasks')
+        try:
+            status_mix = options['status_mix'] and parse_mix(options['status_mix'], Task.STATUS_CHOICES)
+            priority_mix = options['priority_mix'] and parse_mix(options['priority_mix'], Task.PRIORITY_CHOICES)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        generator = DatasetGenerator(
+            users=options['users'],
+            tasks=options['tasks'],
+            comments=options['comments'],
+            categories_per_user=options['categories_per_user'],
+            projects_per_user=options['projects_per_user'],
+            skew=options['skew'],
+            status_mix=status_mix,
+            priority_mix=priority_mix,
+            assigned_rate=options['assigned_rate'],
+            due_date_rate=options['due_date_rate'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            stdout=self.stdout if options['verbosity'] > 1 else None,
+        )
+        with Stopwatch() as timer:
+            counts = generator.run()
+
+        total = sum(counts.values())
+        for model, count in counts.items():
+            self.stdout.write(f'{model:<10}{count:>12}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Inserted {total} rows in {timer.elapsed:.1f}s '
+            f'({total / timer.elapsed * 60:,.0f} rows/minute)'
+        ))
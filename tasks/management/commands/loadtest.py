@@ -0,0 +1,81 @@
+import json
+from contextlib import nullcontext
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from tasks.benchmarking import isolated_database, seed_dataset
+from tasks.loadtest import DEFAULT_MIX, LoadTest, simulated_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive taskmanager.wsgi.application with concurrent logged-in users '
+        'and report throughput, latency histograms and error rates'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8, help='Worker threads')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds at full load')
+        parser.add_argument('--ramp-up', type=float, default=0.0, help='Seconds to start all workers')
+        parser.add_argument('--users', type=int, default=20, help='Simulated users')
+        parser.add_argument(
+            '--mix', default=','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items()),
+            help='Weighted scenario mix of list, detail, search, create and comment',
+        )
+        parser.add_argument(
+            '--seed-data', action='store_true',
+            help='Run against a throwaway database seeded with benchmark data',
+        )
+        parser.add_argument('--seed', type=int, default=None, help='Random seed')
+        parser.add_argument('--json', dest='json_output', help='Also write the report to this file')
+
+    def handle(self, *args, **options):
+        mix = {}
+        for part in options['mix'].split(','):
+            name, _, weight = part.partition('=')
+            if name not in DEFAULT_MIX:
+                raise CommandError(f'Unknown scenario {name!r}, expected one of {list(DEFAULT_MIX)}')
+            mix[name] = float(weight)
+
+        # Imported here so settings are configured before the handler loads
+        from taskmanager.wsgi import application
+
+        context = isolated_database() if options['seed_data'] else nullcontext()
+        with context:
+            if options['seed_data']:
+                seed_dataset(users=options['users'], tasks_per_user=50)
+            users = User.objects.annotate(n=Count('created_tasks')).filter(n__gt=0)
+            users = simulated_users(users.order_by('-n')[:options['users']])
+            if not users:
+                raise CommandError('No users own tasks; use --seed-data or run generate_data first')
+
+            report = LoadTest(
+                application, users, mix=mix,
+                concurrency=options['concurrency'],
+                duration=options['duration'],
+                ramp_up=options['ramp_up'],
+                seed=options['seed'],
+            ).run()
+
+        self.print_report(report)
+        if options['json_output']:
+            with open(options['json_output'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"{report['requests']} requests in {report['elapsed_s']}s: "
+            f"{report['throughput_rps']} req/s, error rate {report['error_rate']:.2%}"
+        )
+        self.stdout.write(f"{'scenario':<10}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, row in sorted(report['scenarios'].items()):
+            self.stdout.write(
+                f"{name:<10}{row['count']:>8}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+            )
+        peak = max(report['histogram'].values()) or 1
+        for bucket, count in report['histogram'].items():
+            self.stdout.write(f"{bucket:>10} {count:>7} {'#' * round(40 * count / peak)}")
+        for error, count in report['errors'].items():
+            self.stdout.write(self.style.ERROR(f'{count:>7} {error}'))
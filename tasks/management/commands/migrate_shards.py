@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from tasks import shards
+from tasks.benchmarking import Stopwatch
+from tasks.models import Workspace
+from tasks.workspaces import migrate
+
+
+class Command(BaseCommand):
+    help = 'Apply migrations to every workspace shard (run `migrate` for the main database first)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shard', action='append', dest='shards', help='Only this shard (repeatable)')
+
+    def handle(self, *args, **options):
+        # Registered shards plus any shard file not (yet or any more) in the registry
+        aliases = options['shards'] or sorted(
+            set(Workspace.objects.exclude(shard='default').values_list('shard', flat=True)) | set(shards.known())
+        )
+        with Stopwatch() as timer:
+            for alias in aliases:
+                self.stdout.write(f'Migrating shard {alias}')
+                migrate(alias, verbosity=max(options['verbosity'] - 1, 0))
+        self.stdout.write(self.style.SUCCESS(f'Migrated {len(aliases)} shards in {timer.elapsed:.1f}s'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.backups import BackupError
+from tasks.benchmarking import Stopwatch
+from tasks.workspaces import move, selected
+
+
+class Command(BaseCommand):
+    help = 'Move a workspace to a new shard while it stays online; writes pause only for the switch-over'
+
+    def add_arguments(self, parser):
+        parser.add_argument('workspace', metavar='SLUG')
+        parser.add_argument('shard', help='Alias of the new shard; must not exist yet')
+
+    def handle(self, *args, **options):
+        workspace, = selected([options['workspace']])
+        source = workspace.shard
+        log = self.stdout.write if options['verbosity'] > 1 else None
+        try:
+            with Stopwatch() as timer:
+                move(workspace, options['shard'], log=log)
+        except BackupError as error:
+            raise CommandError(str(error))
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved workspace {workspace.slug} from shard {source} to {workspace.shard} in {timer.elapsed:.1f}s'
+        ))
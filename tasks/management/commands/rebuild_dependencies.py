@@ -0,0 +1,14 @@
+from tasks.benchmarking import Stopwatch
+from tasks.dependencies import rebuild
+from tasks.workspaces import WorkspaceCommand
+
+
+class Command(WorkspaceCommand):
+    help = 'Recompute the task dependency closure table from the direct dependencies'
+
+    def handle_workspace(self, workspace, *args, **options):
+        with Stopwatch() as timer:
+            pairs = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {pairs} blocker pairs in {timer.elapsed:.2f}s'
+        ))
@@ -0,0 +1,14 @@
+from tasks.benchmarking import Stopwatch
+from tasks.tags import rebuild
+from tasks.workspaces import WorkspaceCommand
+
+
+class Command(WorkspaceCommand):
+    help = 'Recount every tag from its task postings, e.g. after bulk deletes'
+
+    def handle_workspace(self, workspace, *args, **options):
+        with Stopwatch() as timer:
+            tags = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Recounted {tags} tags in {timer.elapsed:.2f}s'
+        ))
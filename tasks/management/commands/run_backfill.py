@@ -0,0 +1,47 @@
+from django.core.management.base import CommandError
+
+from tasks.backfills import BACKFILLS, checkpoint, run
+from tasks.workspaces import WorkspaceCommand
+
+
+class Command(WorkspaceCommand):
+    help = 'Run resumable batched backfills from their checkpoints (default: all of them)'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('names', nargs='*', metavar='NAME', help=f'One of: {", ".join(BACKFILLS)}')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction')
+        parser.add_argument(
+            '--duty-cycle', type=float,
+            help='Share of the time spent writing, between 0 and 1; pauses between batches take the rest',
+        )
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches; rerun to resume')
+        parser.add_argument('--restart', action='store_true', help='Start over, e.g. to repair drifted values')
+        parser.add_argument('--status', action='store_true', help='Only show the checkpoints')
+
+    def handle_workspace(self, workspace, *args, **options):
+        unknown = set(options['names']) - set(BACKFILLS)
+        if unknown:
+            raise CommandError(f'Unknown backfill: {", ".join(sorted(unknown))}')
+        duty_cycle = options['duty_cycle']
+        if duty_cycle is not None and not 0 < duty_cycle <= 1:
+            raise CommandError('--duty-cycle must be in (0, 1]')
+        for name in options['names'] or BACKFILLS:
+            backfill = BACKFILLS[name]()
+            if options['status']:
+                state = checkpoint(backfill)
+                status = f'finished {state.finished_at:%Y-%m-%d %H:%M}' if state.finished_at else 'in progress'
+                self.stdout.write(f'{name}: {status}, {state.rows} rows, last key {state.last_pk}')
+                continue
+            state = run(
+                backfill,
+                batch_size=options['batch_size'],
+                duty_cycle=duty_cycle,
+                max_batches=options['max_batches'],
+                restart=options['restart'],
+                log=self.stdout.write if options['verbosity'] > 1 else None,
+            )
+            if state.finished_at is None:
+                self.stdout.write(f'{name}: paused after {state.rows} rows at key {state.last_pk}')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: done, {state.rows} rows'))
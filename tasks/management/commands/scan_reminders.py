@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from tasks.reminders import scan_reminders
+from tasks.workspaces import WorkspaceCommand
+
+
+class Command(WorkspaceCommand):
+    help = 'Enqueue due-soon and overdue task reminders found since the last run'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--window-hours', type=float, default=24,
+            help='Remind about tasks due within this many hours',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle_workspace(self, workspace, *args, **options):
+        counts = scan_reminders(
+            window=timedelta(hours=options['window_hours']),
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Enqueued {counts['due_soon']} due-soon and {counts['overdue']} overdue reminders"
+        ))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.outbox import deliver_pending
+from tasks.workspaces import each
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending outbox notifications (run a single worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--workspace', action='append', dest='workspaces', metavar='SLUG',
+            help='Only this workspace (repeatable); default is every workspace',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling instead of exiting when the outbox is empty',
+        )
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls')
+
+    def handle(self, *args, **options):
+        total_sent = total_skipped = total_failed = 0
+        while True:
+            sent = skipped = failed = 0
+            for _ in each(options['workspaces']):
+                batch_sent, batch_skipped, batch_failed = deliver_pending(batch_size=options['batch_size'])
+                sent += batch_sent
+                skipped += batch_skipped
+                failed += batch_failed
+            total_sent += sent
+            total_skipped += skipped
+            total_failed += failed
+            # Any non-empty batch may have more behind it
+            if sent or skipped or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {total_sent} message(s), {total_skipped} skipped (no email address), {total_failed} failed'
+        ))
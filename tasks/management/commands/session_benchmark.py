@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from tasks.benchmarking import Stopwatch, isolated_database
+from tasks.models import Comment, Task
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure requests/sec of the authenticated views under each '
+        'session engine and message storage mode'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=100,
+            help='Number of list/detail/comment/redirect cycles per mode',
+        )
+        parser.add_argument(
+            '--session-modes', nargs='+', default=list(settings.SESSION_ENGINES),
+            help='Session modes to compare (keys of SESSION_ENGINES)',
+        )
+        parser.add_argument(
+            '--message-modes', nargs='+', default=['session', 'fallback'],
+            help='Message storage modes to compare (keys of MESSAGE_STORAGES)',
+        )
+
+    def handle(self, *args, **options):
+        for mode in options['session_modes']:
+            if mode not in settings.SESSION_ENGINES:
+                raise CommandError(f'Unknown session mode: {mode}')
+        for mode in options['message_modes']:
+            if mode not in settings.MESSAGE_STORAGES:
+                raise CommandError(f'Unknown message mode: {mode}')
+
+        with isolated_database():
+            user = User.objects.create_user(username='bench', password='bench-pass-123')
+            task = Task.objects.create(title='Benchmark task', created_by=user)
+            for index in range(20):
+                Task.objects.create(title=f'Task {index}', created_by=user)
+
+            self.stdout.write(
+                f"{'session':<16}{'messages':<10}{'req/s':>10}{'session queries/req':>22}"
+            )
+            for session_mode in options['session_modes']:
+                for message_mode in options['message_modes']:
+                    rps, session_queries = self.run_mode(
+                        user, task, session_mode, message_mode, options['iterations']
+                    )
+                    self.stdout.write(
+                        f'{session_mode:<16}{message_mode:<10}{rps:>10.1f}{session_queries:>22.2f}'
+                    )
+
+    def run_mode(self, user, task, session_mode, message_mode, iterations):
+        """Return (requests per second, django_session queries per request)"""
+        for cache in caches.all(initialized_only=True):
+            cache.clear()
+        # Start every mode from the same page weight
+        Comment.objects.all().delete()
+        session_queries = 0
+
+        def count_session_queries(execute, sql, params, many, context):
+            nonlocal session_queries
+            if 'django_session' in sql:
+                session_queries += 1
+            return execute(sql, params, many, context)
+
+        with override_settings(
+            SESSION_ENGINE=settings.SESSION_ENGINES[session_mode],
+            MESSAGE_STORAGE=settings.MESSAGE_STORAGES[message_mode],
+        ):
+            client = Client()
+            client.force_login(user)
+            list_url = reverse('task_list')
+            detail_url = reverse('task_detail', kwargs={'pk': task.pk})
+            requests = 0
+
+            with connection.execute_wrapper(count_session_queries), Stopwatch() as timer:
+                for index in range(iterations):
+                    client.get(list_url)
+                    client.get(detail_url)
+                    # Redirect after POST stores a flash message ...
+                    client.post(detail_url, {'content': f'Comment {index}'})
+                    # ... which the next page view consumes
+                    client.get(detail_url)
+                    requests += 4
+
+        return requests / timer.elapsed, session_queries / requests
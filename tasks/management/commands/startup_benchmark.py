@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter: time loading the WSGI module (including the
+# warm-up hook) and the first and second request to each path.
+CHILD_SCRIPT = '''
+import json, sys, time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+start = time.perf_counter()
+from taskmanager.wsgi import application
+startup = time.perf_counter() - start
+
+from tasks.loadtest import request_host
+
+def get(path):
+    environ = {'PATH_INFO': path, 'HTTP_HOST': request_host(), 'wsgi.input': BytesIO()}
+    setup_testing_defaults(environ)
+    start = time.perf_counter()
+    result = application(environ, lambda status, headers, exc_info=None: None)
+    b''.join(result)
+    result.close()
+    return time.perf_counter() - start
+
+paths = sys.argv[1:]
+first = {path: get(path) for path in paths}
+second = {path: get(path) for path in paths}
+print(json.dumps({'startup': startup, 'first': first, 'second': second}))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure WSGI startup time and first-request latency in fresh '
+        'processes with and without the startup warm-up'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh processes per mode')
+        parser.add_argument(
+            '--paths', nargs='+', default=['/login/', '/register/'],
+            help='Anonymous paths requested after startup',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'warm-up':<9}{'startup ms':>12}"
+            + ''.join(f'{path + " 1st ms":>22}{"2nd ms":>9}' for path in options['paths'])
+        )
+        for warm in ('0', '1'):
+            runs = [self.run_child(warm, options['paths']) for _ in range(options['runs'])]
+            row = f"{'on' if warm == '1' else 'off':<9}{median(r['startup'] for r in runs) * 1000:>12.1f}"
+            for path in options['paths']:
+                row += f"{median(r['first'][path] for r in runs) * 1000:>22.1f}"
+                row += f"{median(r['second'][path] for r in runs) * 1000:>9.1f}"
+            self.stdout.write(row)
+
+    def run_child(self, warm, paths):
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'taskmanager.settings'),
+            TASKMANAGER_WARM_UP=warm,
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD_SCRIPT, *paths],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
@@ -0,0 +1,219 @@
+"""
+Process-safe metrics with a Prometheus text exposition.
+
+Every worker process writes its counters and histograms to its own
+memory-mapped file in METRICS_DIR, so updates never take a cross-process
+lock and cost a dict lookup plus an in-place float write. The /metrics
+endpoint sums the files of all processes on the host. Gauges that reflect
+current state (e.g. queue depth) are computed at scrape time by callbacks
+registered with ``register_gauge``.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'taskmanager_http_requests_total': (
+        'counter', 'HTTP requests by view, method and status code', None),
+    'taskmanager_http_request_duration_seconds': (
+        'histogram', 'Request latency by view',
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)),
+    'taskmanager_db_queries_per_request': (
+        'histogram', 'Database queries issued per request by view',
+        (1, 2, 5, 10, 20, 50, 100, 250)),
+    'taskmanager_db_query_duration_seconds_total': (
+        'counter', 'Time spent in database queries by view', None),
+    'taskmanager_template_render_duration_seconds': (
+        'histogram', 'Template render time by template',
+        (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)),
+    'taskmanager_cache_requests_total': (
+        'counter', 'Cache lookups by cache and result (hit or miss)', None),
+}
+
+_gauges = {}
+
+_HEADER = struct.Struct('<Q')
+_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+
+
+class MmapValues:
+    """Append-only key -> float store in a memory-mapped file"""
+
+    def __init__(self, path, initial_size=64 * 1024):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.file = open(self.path, 'a+b')
+        size = os.fstat(self.file.fileno()).st_size
+        if size < initial_size:
+            self.file.truncate(initial_size)
+            size = initial_size
+        self.map = mmap.mmap(self.file.fileno(), size)
+        self.used = _HEADER.unpack_from(self.map, 0)[0] or _HEADER.size
+        self.offsets = {key: offset for key, offset, _ in read_entries(self.map, self.used)}
+
+    def increment(self, key, amount=1.0):
+        with self.lock:
+            offset = self.offsets.get(key)
+            if offset is None:
+                offset = self.append(key)
+            value = _VALUE.unpack_from(self.map, offset)[0]
+            _VALUE.pack_into(self.map, offset, value + amount)
+
+    def append(self, key):
+        encoded = key.encode()
+        padded = len(encoded) + (-(_LENGTH.size + len(encoded)) % 8)
+        needed = _LENGTH.size + padded + _VALUE.size
+        if self.used + needed > len(self.map):
+            size = len(self.map)
+            while self.used + needed > size:
+                size *= 2
+            self.map.close()
+            self.file.truncate(size)
+            self.map = mmap.mmap(self.file.fileno(), size)
+        start = self.used
+        _LENGTH.pack_into(self.map, start, len(encoded))
+        self.map[start + _LENGTH.size:start + _LENGTH.size + len(encoded)] = encoded
+        offset = start + _LENGTH.size + padded
+        _VALUE.pack_into(self.map, offset, 0.0)
+        # Publish the entry only once it is complete
+        self.used = offset + _VALUE.size
+        _HEADER.pack_into(self.map, 0, self.used)
+        self.offsets[key] = offset
+        return offset
+
+
+def read_entries(buffer, used=None):
+    """Yield (key, value offset, value) for every entry in a store buffer"""
+    if used is None:
+        used = _HEADER.unpack_from(buffer, 0)[0]
+    position = _HEADER.size
+    while position + _LENGTH.size <= used:
+        length = _LENGTH.unpack_from(buffer, position)[0]
+        key = bytes(buffer[position + _LENGTH.size:position + _LENGTH.size + length]).decode()
+        offset = position + _LENGTH.size + length + (-(_LENGTH.size + length) % 8)
+        yield key, offset, _VALUE.unpack_from(buffer, offset)[0]
+        position = offset + _VALUE.size
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """The store of the current process (re-created after a fork)"""
+    key = (os.getpid(), settings.METRICS_DIR)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                Path(settings.METRICS_DIR).mkdir(parents=True, exist_ok=True)
+                store = MmapValues(Path(settings.METRICS_DIR) / f'{os.getpid()}.db')
+                _stores[key] = store
+    return store
+
+
+_keys = {}
+
+
+def _key(name, labels, suffix=''):
+    """Serialized store key, memoized since label sets repeat constantly"""
+    cache_key = (name, suffix, *labels.items())
+    key = _keys.get(cache_key)
+    if key is None:
+        key = _keys[cache_key] = json.dumps([name + suffix, sorted(labels.items())])
+    return key
+
+
+def inc(name, amount=1.0, **labels):
+    """Increment a counter"""
+    get_store().increment(_key(name, labels), amount)
+
+
+def observe(name, value, **labels):
+    """Record an observation in a histogram"""
+    buckets = METRICS[name][2]
+    store = get_store()
+    labels['le'] = bisect.bisect_left(buckets, value)
+    store.increment(_key(name, labels, '_bucket'))
+    del labels['le']
+    store.increment(_key(name, labels, '_sum'), value)
+    store.increment(_key(name, labels, '_count'))
+
+
+def register_gauge(name, help_text, callback):
+    """Expose `callback()` -> {labels tuple: value} as a gauge at scrape time"""
+    _gauges[name] = (help_text, callback)
+
+
+def collect(directory=None):
+    """Sum the values of every process store in the metrics directory"""
+    totals = defaultdict(float)
+    for path in Path(directory or settings.METRICS_DIR).glob('*.db'):
+        try:
+            data = path.read_bytes()
+        except OSError:
+            continue
+        if len(data) < _HEADER.size:
+            continue
+        for key, _, value in read_entries(data):
+            totals[key] += value
+    return totals
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def render_prometheus(totals=None):
+    """Render all metrics in the Prometheus text exposition format"""
+    totals = collect() if totals is None else totals
+    series = defaultdict(list)
+    for key, value in totals.items():
+        name, labels = json.loads(key)
+        series[name].append(([tuple(label) for label in labels], value))
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for labels, value in sorted(series[name]):
+                lines.append(f'{name}{_format_labels(labels)} {value:g}')
+            continue
+        # Histograms are stored per bucket; Prometheus wants cumulative counts
+        per_series = defaultdict(lambda: [0.0] * (len(buckets) + 1))
+        for labels, value in series[f'{name}_bucket']:
+            index = dict(labels)['le']
+            per_series[tuple(label for label in labels if label[0] != 'le')][index] += value
+        for labels, counts in sorted(per_series.items()):
+            cumulative = 0.0
+            for bound, count in zip([*map(str, buckets), '+Inf'], counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels([*labels, ("le", bound)])} {cumulative:g}')
+        for suffix in ('_sum', '_count'):
+            for labels, value in sorted(series[name + suffix]):
+                lines.append(f'{name}{suffix}{_format_labels(labels)} {value:g}')
+
+    for name, (help_text, callback) in sorted(_gauges.items()):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        for labels, value in sorted(callback().items()):
+            lines.append(f'{name}{_format_labels(labels)} {value:g}')
+    return '\n'.join(lines) + '\n'
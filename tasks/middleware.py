@@ -0,0 +1,236 @@
+import cProfile
+import mimetypes
+import os
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.http import FileResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils._os import safe_join
+from django.utils.http import http_date
+
+from . import metrics, shards
+from .profiling import MAX_RECORDED_QUERIES, ProfileStore
+from .slowqueries import SlowQueryLogger
+
+
+# Session key of the logged-in user's workspace; absent for the default workspace
+WORKSPACE_SESSION_KEY = '_workspace_id'
+
+# Precompressed variants in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+class StaticAssetMiddleware:
+    """
+    Serve collected static files from STATIC_ROOT.
+
+    Content-hashed names from the manifest are cached for a year and marked
+    immutable; a precompressed .br/.gz sibling is returned when the client
+    accepts it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = '/' + settings.STATIC_URL.lstrip('/')
+        self.root = settings.STATIC_ROOT
+        self._immutable = None
+
+    def __call__(self, request):
+        if self.root and request.path.startswith(self.prefix) and request.method in ('GET', 'HEAD'):
+            response = self.serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    @property
+    def immutable(self):
+        """Set of content-hashed names listed in the manifest"""
+        if self._immutable is None:
+            hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+            self._immutable = set(hashed_files.values())
+        return self._immutable
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        accepted = request.headers.get('Accept-Encoding', '')
+        served_path, encoding = path, None
+        for candidate, extension in ENCODINGS:
+            if candidate in accepted and os.path.isfile(path + extension):
+                served_path, encoding = path + extension, candidate
+                break
+
+        stat = os.stat(path)
+        response = FileResponse(open(served_path, 'rb'))
+        response['Content-Type'] = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Vary'] = 'Accept-Encoding'
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if name in self.immutable:
+            response['Cache-Control'] = f'public, max-age={settings.STATIC_MAX_AGE}, immutable'
+        else:
+            response['Cache-Control'] = 'public, max-age=60'
+        return response
+
+
+class HTMLCompressionMiddleware(GZipMiddleware):
+    """Gzip HTML responses larger than HTML_COMPRESSION_MIN_SIZE bytes"""
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or len(response.content) < settings.HTML_COMPRESSION_MIN_SIZE
+            or not response.get('Content-Type', '').startswith('text/html')
+        ):
+            return response
+        return super().process_response(request, response)
+
+
+class ProfilingMiddleware:
+    """
+    Profile selected requests with cProfile and record their SQL.
+
+    A request is profiled when a staff user sends an ``X-Profile`` header or
+    ``_profile`` query parameter, or at random with PROFILING_SAMPLE_RATE.
+    Profiles are listed at /profiles/ (staff only).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def should_profile(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff and (
+            'X-Profile' in request.headers or '_profile' in request.GET
+        ):
+            return True
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        queries = []
+
+        def record_query(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                if len(queries) < MAX_RECORDED_QUERIES:
+                    queries.append({
+                        'sql': sql,
+                        'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+                    })
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            # Central queries go to the main database, tenant queries to the workspace's shard
+            for alias in {DEFAULT_DB_ALIAS, shards.current()}:
+                stack.enter_context(connections[alias].execute_wrapper(record_query))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        profile_id = ProfileStore().save(profiler, {
+            'url_name': match.url_name if match and match.url_name else 'unresolved',
+            'path': request.get_full_path(),
+            'method': request.method,
+            'status': response.status_code,
+            'user': request.user.get_username() if request.user.is_authenticated else None,
+            'created': time.time(),
+            'duration_ms': round(duration * 1000, 3),
+            'query_count': len(queries),
+            'queries': queries,
+        })
+        response['X-Profile-Id'] = profile_id
+        return response
+
+
+class WorkspaceMiddleware:
+    """
+    Route the request's tenant queries to its workspace's shard (see
+    tasks.shards). Sessions of the default workspace, and anonymous ones,
+    cost no lookup; other workspaces read their shard from the registry
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from .models import Workspace
+
+        shard = DEFAULT_DB_ALIAS
+        workspace_id = request.session.get(WORKSPACE_SESSION_KEY)
+        if workspace_id is not None:
+            shard = Workspace.objects.filter(pk=workspace_id).values_list('shard', flat=True).first()
+            if shard is None:
+                # Workspace deleted while logged in
+                request.session.flush()
+                shard = DEFAULT_DB_ALIAS
+        with shards.use(shard):
+            return self.get_response(request)
+
+
+class SlowQueryMiddleware:
+    """Log the slow queries of every request (see tasks.slowqueries)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with connection.execute_wrapper(SlowQueryLogger(request)):
+            return self.get_response(request)
+
+
+class MetricsMiddleware:
+    """Record latency, status and database usage of every request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_count = 0
+        query_time = 0.0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal query_count, query_time
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                query_count += 1
+                query_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        status = 500
+        try:
+            with connection.execute_wrapper(count_query):
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            match = request.resolver_match
+            view = match.url_name or match.view_name if match else 'unresolved'
+            metrics.inc('taskmanager_http_requests_total', view=view, method=request.method, status=status)
+            metrics.observe('taskmanager_http_request_duration_seconds', time.perf_counter() - start, view=view)
+            metrics.observe('taskmanager_db_queries_per_request', query_count, view=view)
+            if query_time:
+                metrics.inc('taskmanager_db_query_duration_seconds_total', query_time, view=view)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_reminders_outbox'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='kind',
+            field=models.CharField(choices=[('due_soon', 'Due soon'), ('overdue', 'Overdue'), ('assigned', 'Assigned'), ('comment', 'Comment')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,53 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    """Existing tasks are all roots: their path is their own id segment"""
+    Task = apps.get_model('tasks', 'Task')
+    ArchivedTask = apps.get_model('tasks', 'ArchivedTask')
+    for model in (Task, ArchivedTask):
+        model.objects.using(schema_editor.connection.alias).update(path=models.functions.Concat(
+            models.functions.Substr(models.Value('0000000000'), 1, 10 - models.functions.Length(
+                models.functions.Cast('id', models.CharField())
+            )),
+            models.functions.Cast('id', models.CharField()),
+            models.Value('/'),
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_dependencies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='tasks.task'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=2200),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='parent_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='path',
+            field=models.CharField(default='', max_length=2200),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['path'], name='task_path_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_default_workspace(apps, schema_editor):
+    """Existing data becomes the default workspace, kept in the main database"""
+    Workspace = apps.get_model('tasks', 'Workspace')
+    Workspace.objects.using(schema_editor.connection.alias).get_or_create(
+        shard='default', defaults={'slug': 'default', 'name': 'Default'},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_saved_filters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Workspace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('shard', models.CharField(max_length=63, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['slug'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkspaceMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=150, unique=True)),
+                ('workspace', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='tasks.workspace')),
+            ],
+        ),
+        migrations.RunPython(
+            create_default_workspace, migrations.RunPython.noop, hints={'model_name': 'workspace'},
+        ),
+    ]
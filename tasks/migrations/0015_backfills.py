@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:47
+
+from django.db import migrations, models
+
+from tasks.backfills import ArchivedCommentCounts, CommentCounts, RunBackfill
+
+
+class Migration(migrations.Migration):
+    # Each backfill batch commits on its own
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0014_workspaces'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackfillState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('last_pk', models.BigIntegerField(default=0)),
+                ('rows', models.PositiveBigIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='comment_count',
+            field=models.PositiveIntegerField(db_default=0, default=0),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='comment_count',
+            field=models.PositiveIntegerField(db_default=0, default=0, editable=False),
+        ),
+        RunBackfill(CommentCounts),
+        RunBackfill(ArchivedCommentCounts),
+    ]
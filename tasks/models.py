@@ -1,7 +1,28 @@
-from django.db import models
+from contextvars import ContextVar
+
+from django.db import models, router, transaction
+from django.db.models.functions import Collate
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+# Tasks whose delete() already detached them; the pre_delete hook skips these
+_detached = ContextVar('detached_tasks', default=frozenset())
+
+
+class TaskConflict(Exception):
+    """A compare-and-set update found the task at a newer version"""
+    
+    def __init__(self, task_id, expected_version):
+        super().__init__(f"Task {task_id} changed since version {expected_version}")
+        self.task_id = task_id
+        self.expected_version = expected_version
+
+
+class DependencyCycle(Exception):
+    """Adding the dependency would make a task (transitively) block itself"""
+
 
 class Category(models.Model):
     """Category model for organizing tasks"""
@@ -41,6 +62,31 @@ class Project(models.Model):
         return self.name
 
 
+class Tag(models.Model):
+    """Per-user label; a task can carry any number of them"""
+    name = models.CharField(max_length=50)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='tags'
+    )
+    # Live tasks carrying the tag, kept incrementally by tasks.tags
+    task_count = models.PositiveIntegerField(default=0)
+    # Bumped whenever the tag's task set changes; cached posting lists
+    # built at an older version are rebuilt
+    version = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['created_by', 'name'], name='tag_user_name_unique'),
+        ]
+    
+    def __str__(self):
+        return self.name
+
+
 class Task(models.Model):
     """Main Task model with foreign key relationships"""
     STATUS_CHOICES = [
@@ -97,23 +143,205 @@ class Task(models.Model):
         null=True,
         blank=True
     )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        related_name='children',
+        null=True,
+        blank=True
+    )
+    tags = models.ManyToManyField(
+        Tag,
+        through='TaskTag',
+        related_name='tasks',
+        blank=True
+    )
+    # Materialized path of ancestor ids, maintained by tasks.subtasks
+    path = models.CharField(max_length=2200, editable=False)
     
     due_date = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped by every write; compare-and-set updates check it. The database
+    # default covers raw inserts such as generate_data's
+    version = models.PositiveIntegerField(default=1, db_default=1)
+    # Denormalized, kept by Comment.save and uncount_comment; the task_comment_counts
+    # backfill (`manage.py run_backfill`) recomputes it
+    comment_count = models.PositiveIntegerField(default=0, db_default=0, editable=False)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='task_created_idx'),
+            # Case-insensitive prefix searches (title__istartswith) use this
+            # index on SQLite instead of scanning the table
+            models.Index(Collate('title', 'nocase'), name='task_title_nocase_idx'),
+            # Due-date reminder scans: one index range per open status
+            models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+            # Board columns: (user, status) ranges come out in id order, so
+            # keyset pages on id read only the rows they return
+            models.Index(fields=['created_by', 'status'], name='task_creator_status_idx'),
+            models.Index(fields=['assigned_to', 'status'], name='task_assignee_status_idx'),
+            # Calendar ranges: one due_date range per side of the user OR
+            models.Index(fields=['created_by', 'due_date'], name='task_creator_due_idx'),
+            models.Index(fields=['assigned_to', 'due_date'], name='task_assignee_due_idx'),
+            # Subtrees are path ranges
+            models.Index(fields=['path'], name='task_path_idx'),
+            # Archive sweeps: done tasks by completion time
+            models.Index(fields=['status', 'completed_at'], name='task_status_completed_idx'),
+            # Reminder change scans: tasks edited since the previous run
+            models.Index(fields=['updated_at'], name='task_updated_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        task = super().from_db(db, field_names, values)
+        task._rollup_state = task.rollup_state()
+        task._loaded_user_ids = task.user_ids()
+        task._loaded_parent_id = task.__dict__.get('parent_id')
+        return task
+    
+    def rollup_state(self):
+        """(project_id, status) as counted in the project daily rollups"""
+        if 'project_id' not in self.__dict__ or 'status' not in self.__dict__:
+            return None  # deferred field: state unknown
+        return (self.project_id, self.status)
+    
+    def user_ids(self):
+        """Creator and assignee ids, whose cached calendars show this task"""
+        return {self.__dict__.get('created_by_id'), self.__dict__.get('assigned_to_id')} - {None}
+    
+    def invalidate_calendars(self):
+        """Drop cached calendar ranges of everyone who sees or saw this task"""
+        from .calendar_events import invalidate
+        
+        user_ids = self.user_ids() | getattr(self, '_loaded_user_ids', set())
+        transaction.on_commit(lambda: invalidate(user_ids), using=self.db_alias())
+    
+    def db_alias(self):
+        """Database the task is written to: its workspace's shard"""
+        return router.db_for_write(Task, instance=self)
+    
+    def reparented(self):
+        """True if parent changed since the task was loaded"""
+        if self._state.adding or 'parent_id' not in self.__dict__:
+            return False
+        return self.parent_id != getattr(self, '_loaded_parent_id', self.parent_id)
+    
+    def save(self, *args, **kwargs):
+        """Save and keep the path, project daily rollups, calendars and saved filters in step"""
+        from . import saved_filters, subtasks
+        from .analytics import record_transition
+        
+        adding = self._state.adding
+        reparented = self.reparented()
+        if reparented:
+            subtasks.check_parent(self, self.parent)
+        if not adding:
+            # Unconditional write: bump whatever version is stored, and keep
+            # the comment count other writers maintain
+            self.version = models.F('version') + 1
+            self.comment_count = models.F('comment_count')
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        with transaction.atomic(using=self.db_alias()):
+            super().save(*args, **kwargs)
+            if adding:
+                # The path ends with our own id, known only after the INSERT
+                self.path = subtasks.path_for(self)
+                Task.objects.filter(pk=self.pk).update(path=self.path)
+            else:
+                self.version, self.comment_count = Task.objects.filter(pk=self.pk).values_list(
+                    'version', 'comment_count',
+                ).get()
+            if reparented:
+                subtasks.repath(self, subtasks.stored_paths(self)[self.pk])
+            record_transition(self, None if adding else getattr(self, '_rollup_state', None), adding)
+            saved_filters.task_changed(self, self.user_ids() | getattr(self, '_loaded_user_ids', set()))
+            self.invalidate_calendars()
+        self._rollup_state = self.rollup_state()
+        self._loaded_user_ids = self.user_ids()
+        self._loaded_parent_id = self.parent_id
+    
+    def save_changes(self, fields, expected_version):
+        """
+        Compare-and-set: write only `fields` if the stored version is still
+        `expected_version`, otherwise raise TaskConflict
+        """
+        from . import saved_filters, subtasks
+        from .analytics import record_transition
+        
+        if 'parent' in fields and self.reparented():
+            subtasks.check_parent(self, self.parent)
+        now = timezone.now()
+        values = {self._meta.get_field(name).attname: getattr(self, self._meta.get_field(name).attname)
+                  for name in fields}
+        with transaction.atomic(using=self.db_alias()):
+            updated = Task.objects.filter(pk=self.pk, version=expected_version).update(
+                **values, updated_at=now, version=models.F('version') + 1,
+            )
+            if not updated:
+                raise TaskConflict(self.pk, expected_version)
+            self.version = expected_version + 1
+            self.updated_at = now
+            if 'parent' in fields and self.reparented():
+                subtasks.repath(self, subtasks.stored_paths(self)[self.pk])
+            record_transition(self, getattr(self, '_rollup_state', None), False)
+            saved_filters.task_changed(self, self.user_ids() | getattr(self, '_loaded_user_ids', set()))
+            self.invalidate_calendars()
+        self._rollup_state = self.rollup_state()
+        self._loaded_user_ids = self.user_ids()
+        self._loaded_parent_id = self.parent_id
+    
+    def delete(self, *args, **kwargs):
+        """Delete the task and its subtasks, keeping rollups, dependencies, tags and saved filters in step"""
+        from .subtasks import descendants
+        
+        with transaction.atomic(using=self.db_alias()):
+            subtree = [self, *descendants(self).only(
+                'id', 'project_id', 'status', 'created_by_id', 'assigned_to_id',
+            )]
+            # One batch for the whole subtree instead of one per cascaded row
+            detach_deleted(subtree)
+            token = _detached.set(_detached.get() | {task.pk for task in subtree})
+            try:
+                return super().delete(*args, **kwargs)
+            finally:
+                _detached.reset(token)
+    
     def mark_as_done(self):
-        """Mark task as completed"""
+        """Mark task as completed; raises TaskConflict if it changed since loaded"""
         self.status = 'done'
         self.completed_at = timezone.now()
-        self.save()
+        self.save_changes(['status', 'completed_at'], self.version)
+
+
+def detach_deleted(tasks):
+    """
+    Take tasks about to be deleted out of the rollups, the dependency
+    closure, tag counts, saved filter results and cached calendars
+    """
+    from . import saved_filters, tags
+    from .analytics import record_delete
+    from .dependencies import detach
+    
+    record_delete(*tasks)
+    detach([task.pk for task in tasks])
+    tags.detach([task.pk for task in tasks])
+    saved_filters.detach([task.pk for task in tasks])
+    for task in tasks:
+        task.invalidate_calendars()
+
+
+@receiver(pre_delete, sender=Task)
+def detach_cascaded_task(sender, instance, **kwargs):
+    """Cascades (project and user deletes, admin bulk deletes) bypass Task.delete"""
+    if instance.pk not in _detached.get():
+        detach_deleted([instance])
 
 
 class Comment(models.Model):
@@ -137,3 +365,375 @@ class Comment(models.Model):
     
     def __str__(self):
         return f"Comment by {self.user.username} on {self.task.title}"
+    
+    def save(self, *args, **kwargs):
+        """Save and keep Task.comment_count in step"""
+        adding = self._state.adding
+        with transaction.atomic(using=router.db_for_write(Comment, instance=self)):
+            previous = None if adding else Comment.objects.filter(pk=self.pk).values_list('task_id', flat=True).first()
+            super().save(*args, **kwargs)
+            if previous != self.task_id:
+                Task.objects.filter(pk=self.task_id).update(comment_count=models.F('comment_count') + 1)
+                if previous is not None:
+                    Task.objects.filter(pk=previous).update(comment_count=models.F('comment_count') - 1)
+
+
+@receiver(pre_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    """Keep Task.comment_count in step for every delete, cascades from users included"""
+    if instance.task_id not in _detached.get():
+        Task.objects.filter(pk=instance.task_id).update(comment_count=models.F('comment_count') - 1)
+
+
+class TaskTag(models.Model):
+    """
+    Posting of a task under a tag. The unique (tag, task) index is the
+    on-disk inverted index: each tag's task ids, in order.
+    """
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='postings',
+        db_index=False
+    )
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='postings'
+    )
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tag', 'task'], name='task_tag_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.task_id} tagged {self.tag_id}"
+
+
+class TaskDependency(models.Model):
+    """Direct 'task is blocked by blocked_by' edge"""
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='dependencies'
+    )
+    blocked_by = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='dependents'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'blocked_by'], name='task_dependency_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.task_id} blocked by {self.blocked_by_id}"
+
+
+class DependencyClosure(models.Model):
+    """
+    Transitive closure of TaskDependency: `ancestor` blocks `descendant`
+    through `paths` distinct chains. Maintained by tasks.dependencies.
+    """
+    ancestor = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    descendant = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    paths = models.PositiveIntegerField(default=1)
+    
+    class Meta:
+        constraints = [
+            # Also the index for "what does X block" lookups
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='dependency_closure_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['descendant', 'ancestor'], name='dependency_closure_desc_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.ancestor_id} blocks {self.descendant_id}"
+
+
+class ArchivedTask(models.Model):
+    """
+    Read-only copy of a task done for longer than the archive threshold.
+    Keeps the original id so links to task_detail keep working; columns
+    mirror Task so rows move with INSERT ... SELECT.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    priority = models.CharField(max_length=20, choices=Task.PRIORITY_CHOICES)
+    assigned_to = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_assigned_tasks'
+    )
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_created_tasks'
+    )
+    # Archived rows must not block deleting a category
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        related_name='archived_tasks',
+        null=True,
+        blank=True
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='archived_tasks',
+        null=True,
+        blank=True
+    )
+    # Plain columns: the parent may stay live or be archived separately
+    parent_id = models.BigIntegerField(null=True, blank=True)
+    path = models.CharField(max_length=2200)
+    due_date = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    version = models.PositiveIntegerField(default=1, db_default=1)
+    comment_count = models.PositiveIntegerField(default=0, db_default=0)
+    archived_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-completed_at']
+        indexes = [
+            models.Index(Collate('title', 'nocase'), name='archived_title_nocase_idx'),
+        ]
+    
+    def __str__(self):
+        return self.title
+
+
+class ArchivedComment(models.Model):
+    """Comment moved to the archive together with its task"""
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(
+        ArchivedTask,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments'
+    )
+    content = models.TextField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Archived comment by {self.user_id} on {self.task_id}"
+
+
+class ProjectDailyStats(models.Model):
+    """
+    Daily per-project rollup maintained incrementally from task transitions.
+    Status columns hold net changes for the day; their running sum is the
+    status breakdown at the end of that day.
+    """
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    date = models.DateField()
+    created = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    todo = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    review = models.IntegerField(default=0)
+    done = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['project', 'date']
+        verbose_name_plural = 'Project daily stats'
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'date'], name='project_daily_stats_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.project_id} on {self.date}"
+
+
+class OutboxMessage(models.Model):
+    """Notification waiting to be delivered by the outbox worker"""
+    KIND_CHOICES = [
+        ('due_soon', 'Due soon'),
+        ('overdue', 'Overdue'),
+        ('assigned', 'Assigned'),
+        ('comment', 'Comment'),
+    ]
+    
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='outbox_messages'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='outbox_messages',
+        null=True,
+        blank=True
+    )
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    # Enqueuing the same key twice is a no-op
+    dedupe_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(
+                fields=['available_at'],
+                condition=models.Q(sent_at__isnull=True),
+                name='outbox_pending_idx'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.recipient_id}: {self.subject}"
+
+
+class ScanState(models.Model):
+    """Persisted high-water mark of an incremental background scan"""
+    name = models.CharField(max_length=100, unique=True)
+    high_water = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} @ {self.high_water}"
+
+
+class SavedFilter(models.Model):
+    """A named task_list filter whose results tasks.saved_filters keeps up to date"""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='saved_filters'
+    )
+    name = models.CharField(max_length=100)
+    params = models.JSONField(default=dict)
+    # Matching tasks per status, adjusted with every change to the results
+    counts = models.JSONField(default=dict)
+    # Set when a write bypassed the incremental path; the next read recomputes
+    stale = models.BooleanField(default=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'name'], name='saved_filter_user_name_unique'),
+        ]
+    
+    def __str__(self):
+        return self.name
+    
+    def stats(self):
+        """Counts in the shape of task_list's statistics"""
+        stats = {status: self.counts.get(status, 0) for status, _ in Task.STATUS_CHOICES}
+        return {'total': sum(stats.values()), **stats}
+
+
+class SavedFilterResult(models.Model):
+    """A task matching a saved filter, with the status it is counted under"""
+    saved_filter = models.ForeignKey(
+        SavedFilter,
+        on_delete=models.CASCADE,
+        related_name='results',
+        db_index=False
+    )
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    status = models.CharField(max_length=20)
+    
+    class Meta:
+        constraints = [
+            # Also the index for reading one filter's results
+            models.UniqueConstraint(fields=['saved_filter', 'task'], name='saved_filter_result_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.task_id} in {self.saved_filter_id}"
+
+
+class Workspace(models.Model):
+    """
+    A team and everything it owns: users, categories, projects and tasks.
+    Stored in the main database; its tenant rows live in `shard` (see
+    tasks.shards), which holds no other workspace
+    """
+    slug = models.SlugField(max_length=50, unique=True)
+    name = models.CharField(max_length=100)
+    # Database alias of the shard; 'default' is the main database
+    shard = models.CharField(max_length=63, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['slug']
+    
+    def __str__(self):
+        return self.name
+
+
+class WorkspaceMember(models.Model):
+    """
+    Directory entry sending a username to its workspace at login. Users of
+    the default workspace have none; user ids are per shard, so members are
+    keyed by username
+    """
+    username = models.CharField(max_length=150, unique=True)
+    workspace = models.ForeignKey(
+        Workspace,
+        on_delete=models.CASCADE,
+        related_name='members'
+    )
+    
+    def __str__(self):
+        return f"{self.username} @ {self.workspace_id}"
+
+
+class BackfillState(models.Model):
+    """Checkpoint of a resumable data migration (see tasks.backfills)"""
+    name = models.CharField(max_length=100, unique=True)
+    # Primary key of the last row of the last committed batch
+    last_pk = models.BigIntegerField(default=0)
+    rows = models.PositiveBigIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.name} @ {self.last_pk}"
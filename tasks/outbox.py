@@ -0,0 +1,138 @@
+"""
+Transactional outbox for notifications.
+
+Writers only insert ``OutboxMessage`` rows (inside their own transaction),
+so no request ever waits on a mail server. ``manage.py send_outbox``
+delivers pending rows in batches, coalescing all messages for the same
+recipient into one digest email, and retries failures with exponential
+backoff. Run a single worker per database.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+MAX_ATTEMPTS = 5
+
+
+def enqueue(messages):
+    """Insert OutboxMessage instances, skipping already-enqueued dedupe keys"""
+    return OutboxMessage.objects.bulk_create(messages, ignore_conflicts=True)
+
+
+def digest_available_at():
+    """Hold activity notifications briefly so bursts end up in one digest"""
+    return timezone.now() + timedelta(seconds=settings.OUTBOX_DIGEST_DELAY)
+
+
+def notify_assignment(task, actor):
+    """Enqueue an 'assigned' notification unless users assign themselves"""
+    if task.assigned_to_id is None or task.assigned_to_id == actor.pk:
+        return []
+    return enqueue([OutboxMessage(
+        recipient_id=task.assigned_to_id, kind='assigned', task=task,
+        subject=f'Task assigned to you: {task.title}',
+        body=f'{actor.get_username()} assigned you the task "{task.title}".',
+        available_at=digest_available_at(),
+    )])
+
+
+def notify_comment(comment, actor):
+    """Enqueue 'comment' notifications for the task's creator and assignee"""
+    task = comment.task
+    recipients = {task.created_by_id, task.assigned_to_id} - {None, actor.pk}
+    available_at = digest_available_at()
+    return enqueue([
+        OutboxMessage(
+            recipient_id=recipient, kind='comment', task=task,
+            subject=f'New comment on {task.title}',
+            body=f'{actor.get_username()} commented on "{task.title}":\n\n{comment.content}',
+            available_at=available_at,
+        )
+        for recipient in sorted(recipients)
+    ])
+
+
+def pending(now=None):
+    """Messages due for a delivery attempt (served by outbox_pending_idx)"""
+    return OutboxMessage.objects.filter(
+        sent_at__isnull=True,
+        available_at__lte=now or timezone.now(),
+    )
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt: 1, 2, 4, 8... minutes"""
+    return timedelta(minutes=2 ** max(attempts - 1, 0))
+
+
+def build_email(recipient, messages, connection):
+    """One email for all of a recipient's messages"""
+    if len(messages) == 1:
+        subject, body = messages[0].subject, messages[0].body
+    else:
+        subject = f'{len(messages)} new TaskMaster notifications'
+        body = '\n\n'.join(f'* {message.subject}\n{message.body}' for message in messages)
+    return EmailMessage(
+        subject, body, settings.DEFAULT_FROM_EMAIL, [recipient.email],
+        connection=connection,
+    )
+
+
+def deliver_pending(batch_size=100, now=None):
+    """
+    Deliver one batch of pending messages; return (sent, skipped, failed)
+    message counts. Skipped messages (recipient without an email address)
+    are marked done, like sent ones
+    """
+    now = now or timezone.now()
+    batch = list(pending(now).select_related('recipient').order_by('available_at')[:batch_size])
+    if not batch:
+        return 0, 0, 0
+
+    digests = defaultdict(list)
+    for message in batch:
+        digests[message.recipient].append(message)
+
+    sent, skipped, failed = [], [], []
+    connection = get_connection()
+    with connection:
+        for recipient, messages in digests.items():
+            if not recipient.email:
+                skipped.extend(message.pk for message in messages)
+                continue
+            try:
+                build_email(recipient, messages, connection).send()
+            except Exception as e:
+                failed.extend((message, e) for message in messages)
+            else:
+                sent.extend(message.pk for message in messages)
+
+    OutboxMessage.objects.filter(pk__in=sent).update(sent_at=now, attempts=F('attempts') + 1, last_error='')
+    OutboxMessage.objects.filter(pk__in=skipped).update(sent_at=now, last_error='Recipient has no email address')
+    for message, error in failed:
+        attempts = message.attempts + 1
+        changes = {'attempts': attempts, 'last_error': f'{type(error).__name__}: {error}'}
+        if attempts >= MAX_ATTEMPTS:
+            # Give up: park the message far in the future for manual inspection
+            changes['available_at'] = now + timedelta(days=365)
+        else:
+            changes['available_at'] = now + retry_delay(attempts)
+        OutboxMessage.objects.filter(pk=message.pk).update(**changes)
+    return len(sent), len(skipped), len(failed)
+
+
+def pending_count():
+    """Unsent messages still being retried; parked ones are counted by parked_count()"""
+    return OutboxMessage.objects.filter(sent_at__isnull=True, attempts__lt=MAX_ATTEMPTS).count()
+
+
+def parked_count():
+    """Messages that used up MAX_ATTEMPTS and wait for manual inspection"""
+    return OutboxMessage.objects.filter(sent_at__isnull=True, attempts__gte=MAX_ATTEMPTS).count()
@@ -0,0 +1,79 @@
+"""
+On-disk store for per-request profiles.
+
+Each profile is a cProfile dump (``<id>.prof``) plus a JSON sidecar
+(``<id>.json``) with the request metadata and the SQL it executed.
+Ids start with a millisecond timestamp, so sorting by name sorts by age
+and retention simply deletes the oldest files.
+"""
+
+import io
+import json
+import pstats
+import re
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+PROFILE_ID_RE = re.compile(r'^\d{13}-[0-9a-f]{8}$')
+
+# Keep at most this many SQL statements per profile
+MAX_RECORDED_QUERIES = 500
+
+
+class ProfileStore:
+    """Write, list and prune request profiles in a directory"""
+
+    def __init__(self, directory=None, max_profiles=None):
+        self.directory = Path(directory or settings.PROFILING_DIR)
+        self.max_profiles = max_profiles or settings.PROFILING_MAX_PROFILES
+
+    def save(self, profiler, metadata):
+        """Store a finished cProfile.Profile and return its id"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = f'{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}'
+        profiler.dump_stats(self.directory / f'{profile_id}.prof')
+
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(25)
+        metadata = dict(metadata, id=profile_id, summary=summary.getvalue())
+        (self.directory / f'{profile_id}.json').write_text(json.dumps(metadata))
+        self.prune()
+        return profile_id
+
+    def prune(self):
+        """Delete the oldest profiles beyond the retention limit"""
+        sidecars = sorted(self.directory.glob('*.json'))
+        for sidecar in sidecars[:max(0, len(sidecars) - self.max_profiles)]:
+            sidecar.unlink(missing_ok=True)
+            sidecar.with_suffix('.prof').unlink(missing_ok=True)
+
+    def list(self):
+        """Metadata of all stored profiles, newest first"""
+        if not self.directory.exists():
+            return []
+        profiles = []
+        for sidecar in sorted(self.directory.glob('*.json'), reverse=True):
+            try:
+                profiles.append(json.loads(sidecar.read_text()))
+            except (OSError, ValueError):
+                continue  # pruned or half-written by another worker
+        return profiles
+
+    def get(self, profile_id):
+        """Metadata of one profile, or None"""
+        if not PROFILE_ID_RE.match(profile_id):
+            return None
+        try:
+            return json.loads((self.directory / f'{profile_id}.json').read_text())
+        except (OSError, ValueError):
+            return None
+
+    def path(self, profile_id):
+        """Path of the .prof dump, or None if it does not exist"""
+        if not PROFILE_ID_RE.match(profile_id):
+            return None
+        path = self.directory / f'{profile_id}.prof'
+        return path if path.exists() else None
@@ -0,0 +1,134 @@
+"""
+Due-date reminder scanner.
+
+Two incremental scans per kind find the tasks that need a reminder:
+
+* threshold scan: tasks whose due date crossed the threshold since the
+  previous run, walking the (status, due_date) index from a high-water
+  mark per open status
+
+  * ``due_soon``: due in [previous upper bound, now + window], not yet due
+  * ``overdue``:  due in [previous run time, now]
+
+* change scan: tasks created or edited since the previous run, read from
+  the updated_at index; open ones whose due date is already inside the
+  range are reminded, such as a new task due in an hour or a due date
+  moved into the past
+
+Each scan works in keyset-ordered batches, one short transaction per batch
+that also advances its mark, so the first overdue run over the whole
+history never holds the write lock for long and resumes where it stopped.
+Marks are inclusive; the outbox dedupe_key (kind, task, due date) drops
+reminders that were already enqueued.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import shards
+from .models import OutboxMessage, ScanState, Task
+from .outbox import enqueue
+
+OPEN_STATUSES = [status for status, _ in Task.STATUS_CHOICES if status != 'done']
+FIELDS = ('id', 'title', 'status', 'due_date', 'updated_at', 'assigned_to_id', 'created_by_id')
+# Change scans re-read this much before their mark, for transactions that
+# stamped updated_at before the previous scan and committed after it
+CHANGE_OVERLAP = timedelta(minutes=1)
+
+
+def batches(tasks, field, batch_size):
+    """Yield batches of task values in (field, id) keyset order"""
+    last = None
+    while True:
+        page = tasks
+        if last is not None:
+            page = page.filter(Q(**{f'{field}__gt': last[0]}) | Q(**{field: last[0], 'id__gt': last[1]}))
+        batch = list(page.order_by(field, 'id').values(*FIELDS)[:batch_size])
+        if not batch:
+            break
+        yield batch
+        last = (batch[-1][field], batch[-1]['id'])
+
+
+def reminder(kind, task):
+    recipient = task['assigned_to_id'] or task['created_by_id']
+    due = timezone.localtime(task['due_date']).strftime('%b %d, %Y %H:%M')
+    if kind == 'overdue':
+        subject = f"Task overdue: {task['title']}"
+        body = f"The task \"{task['title']}\" was due {due} and is not done yet."
+    else:
+        subject = f"Task due soon: {task['title']}"
+        body = f"The task \"{task['title']}\" is due {due}."
+    return OutboxMessage(
+        recipient_id=recipient, kind=kind, task_id=task['id'],
+        subject=subject, body=body,
+        dedupe_key=f"{kind}:{task['id']}:{task['due_date'].isoformat()}",
+    )
+
+
+def run_scan(kind, name, tasks, field, end, batch_size, wanted=None):
+    """
+    Enqueue `kind` reminders for `tasks` (those passing `wanted`, if given)
+    from the mark `name` onwards in `field` order, committing each batch with
+    the mark; the mark ends at `end`
+    """
+    state, _ = ScanState.objects.get_or_create(name=name)
+    if state.high_water is not None:
+        tasks = tasks.filter(**{f'{field}__gte': state.high_water})
+    count = 0
+    for batch in batches(tasks, field, batch_size):
+        messages = [reminder(kind, task) for task in batch if wanted is None or wanted(task)]
+        with transaction.atomic(using=shards.current()):
+            sent = set(OutboxMessage.objects.filter(
+                dedupe_key__in=[message.dedupe_key for message in messages],
+            ).values_list('dedupe_key', flat=True))
+            fresh = [message for message in messages if message.dedupe_key not in sent]
+            enqueue(fresh)
+            state.high_water = batch[-1][field]
+            state.save()
+        count += len(fresh)
+    state.high_water = end
+    state.save()
+    return count
+
+
+def scan_reminders(window=timedelta(hours=24), batch_size=500, now=None):
+    """Enqueue due-soon and overdue reminders; return the new reminders per kind"""
+    started = timezone.now()
+    now = now or started
+    # Due-date ranges; already-overdue tasks are left to the overdue scan
+    ranges = {
+        'due_soon': (now, now + window),
+        'overdue': (None, now),
+    }
+    counts = {}
+    for kind, (lower, upper) in ranges.items():
+        tasks = Task.objects.filter(due_date__lte=upper)
+        if lower is not None:
+            tasks = tasks.filter(due_date__gt=lower)
+        counts[kind] = 0
+        for status in OPEN_STATUSES:
+            counts[kind] += run_scan(
+                kind, f'reminders:{kind}:{status}', tasks.filter(status=status), 'due_date', upper, batch_size,
+            )
+
+        # Changed tasks are filtered here, so the scan reads the updated_at index only
+        def wanted(task, lower=lower, upper=upper):
+            due = task['due_date']
+            return (
+                task['status'] in OPEN_STATUSES and due is not None
+                and (lower is None or due > lower) and due <= upper
+            )
+
+        name = f'reminders:{kind}:changes'
+        if ScanState.objects.get_or_create(name=name)[0].high_water is None:
+            # First run: the threshold scans started from scratch and saw every task
+            ScanState.objects.filter(name=name).update(high_water=started)
+            continue
+        counts[kind] += run_scan(
+            kind, name, Task.objects.all(), 'updated_at', started - CHANGE_OVERLAP, batch_size, wanted,
+        )
+    return counts
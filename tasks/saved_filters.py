@@ -0,0 +1,173 @@
+"""
+Saved task_list filters with incrementally maintained results.
+
+A SavedFilter stores its parameters, one SavedFilterResult row per matching
+task and per-status counts. Every Task.save re-tests just that task
+against the saved filters of its creator and assignee (before and after)
+and patches their rows and counts in the same transaction, so opening a
+saved filter never re-evaluates its search. Writes that bypass Task.save
+mark the users' filters stale instead, and a stale filter is recomputed
+with one INSERT ... SELECT the next time it is read.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import shards
+from .models import SavedFilter, SavedFilterResult, Task
+
+FILTER_PARAMS = ['search', 'status', 'priority', 'category']
+# Task attributes matches() reads; a task loaded without them cannot be re-tested
+MATCH_FIELDS = {'title', 'description', 'status', 'priority', 'category_id', 'created_by_id', 'assigned_to_id'}
+
+# SQLite's LIKE, and so icontains, folds ASCII letters only
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def clean_params(data):
+    """The non-empty filter parameters of a task_list query string"""
+    params = {name: data.get(name, '') for name in FILTER_PARAMS if data.get(name, '')}
+    if not params.get('category', '0').isdigit():
+        del params['category']
+    return params
+
+
+def apply(queryset, params):
+    """Narrow `queryset` by task_list's search, status, priority and category filters"""
+    if params.get('search'):
+        queryset = queryset.filter(
+            Q(title__icontains=params['search']) |
+            Q(description__icontains=params['search'])
+        )
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+    if params.get('priority'):
+        queryset = queryset.filter(priority=params['priority'])
+    if params.get('category'):
+        queryset = queryset.filter(category_id=params['category'])
+    return queryset
+
+
+def query(user_id, params):
+    """Every task the saved filter matches for its user"""
+    return apply(Task.objects.filter(Q(created_by_id=user_id) | Q(assigned_to_id=user_id)), params)
+
+
+def matches(task, user_id, params):
+    """query() evaluated for a single in-memory task"""
+    if user_id not in (task.created_by_id, task.assigned_to_id):
+        return False
+    if params.get('status') and task.status != params['status']:
+        return False
+    if params.get('priority') and task.priority != params['priority']:
+        return False
+    if params.get('category') and str(task.category_id) != params['category']:
+        return False
+    if params.get('search'):
+        needle = params['search'].translate(_ASCII_LOWER)
+        return needle in task.title.translate(_ASCII_LOWER) or needle in task.description.translate(_ASCII_LOWER)
+    return True
+
+
+def recompute(saved_filter):
+    """Full re-evaluation: replace the filter's results and counts"""
+    sql, params = query(saved_filter.user_id, saved_filter.params).order_by().values('id', 'status').query.sql_with_params()
+    connection = shards.connection()
+    results = connection.ops.quote_name(SavedFilterResult._meta.db_table)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        saved_filter.results.all().delete()
+        cursor.execute(
+            f'INSERT INTO {results} (saved_filter_id, task_id, status) SELECT %s, id, status FROM ({sql})',
+            [saved_filter.pk, *params],
+        )
+        saved_filter.counts = dict(saved_filter.results.order_by().values_list('status').annotate(n=Count('id')))
+        saved_filter.stale = False
+        saved_filter.refreshed_at = timezone.now()
+        saved_filter.save(update_fields=['counts', 'stale', 'refreshed_at'])
+
+
+def fresh(saved_filter):
+    """The filter, recomputed first if a bulk write left it stale"""
+    if saved_filter.stale:
+        recompute(saved_filter)
+    return saved_filter
+
+
+def tasks(saved_filter):
+    """The cached matching tasks, read through the results index"""
+    return Task.objects.filter(pk__in=saved_filter.results.values('task'))
+
+
+def mark_stale(user_ids):
+    """Fallback for writes that bypass Task.save: recompute on next read"""
+    SavedFilter.objects.filter(user_id__in=user_ids, stale=False).update(stale=True)
+
+
+def _count(saved_filter, status, delta):
+    if status is not None:
+        saved_filter.counts[status] = saved_filter.counts.get(status, 0) + delta
+
+
+def task_changed(task, user_ids):
+    """
+    Re-test one saved task against the saved filters of `user_ids` and
+    patch the results that changed. Runs after the task's own write, so
+    concurrent patches of the same filter are serialized by its lock
+    """
+    if MATCH_FIELDS & task.get_deferred_fields():
+        mark_stale(user_ids)
+        return
+    filters = list(SavedFilter.objects.filter(user_id__in=user_ids, stale=False).only('id', 'user_id', 'params', 'counts'))
+    if not filters:
+        return
+    stored = dict(
+        SavedFilterResult.objects.filter(task_id=task.pk, saved_filter__in=filters)
+        .values_list('saved_filter_id', 'status')
+    )
+    changed = []
+    for saved_filter in filters:
+        before = stored.get(saved_filter.pk)
+        after = task.status if matches(task, saved_filter.user_id, saved_filter.params) else None
+        if before != after:
+            _count(saved_filter, before, -1)
+            _count(saved_filter, after, 1)
+            changed.append((saved_filter, after))
+    if changed:
+        SavedFilterResult.objects.filter(task_id=task.pk, saved_filter__in=[f for f, _ in changed]).delete()
+        SavedFilterResult.objects.bulk_create([
+            SavedFilterResult(saved_filter=saved_filter, task_id=task.pk, status=status)
+            for saved_filter, status in changed if status is not None
+        ])
+        SavedFilter.objects.bulk_update([f for f, _ in changed], ['counts'])
+
+
+def detach(task_ids):
+    """Remove these tasks from every saved filter's results, e.g. before deleting or archiving them"""
+    results = SavedFilterResult.objects.filter(task_id__in=list(task_ids))
+    with transaction.atomic(using=shards.current()):
+        removed = list(results.order_by().values_list('saved_filter_id', 'status').annotate(n=Count('id')))
+        if not removed:
+            return
+        filters = SavedFilter.objects.in_bulk({filter_id for filter_id, _, _ in removed})
+        for filter_id, status, n in removed:
+            _count(filters[filter_id], status, -n)
+        results.delete()
+        SavedFilter.objects.bulk_update(filters.values(), ['counts'])
+
+
+def check(saved_filter):
+    """Differences between the cached results and a fresh evaluation; empty if consistent"""
+    expected = set(query(saved_filter.user_id, saved_filter.params).values_list('id', 'status'))
+    cached = set(saved_filter.results.values_list('task_id', 'status'))
+    problems = []
+    if cached - expected:
+        problems.append(f'{len(cached - expected)} outdated results')
+    if expected - cached:
+        problems.append(f'{len(expected - cached)} missing results')
+    counts = {status: n for status, n in saved_filter.counts.items() if n}
+    if counts != dict(Counter(status for _, status in expected)):
+        problems.append(f'counts {counts} should be {dict(Counter(status for _, status in expected))}')
+    return problems
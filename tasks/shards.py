@@ -0,0 +1,135 @@
+"""
+Per-workspace SQLite shards.
+
+The main database (alias 'default') holds the workspace registry, the
+username directory and sessions, plus the tenant tables of the default
+workspace. Every other workspace has a shard of its own: a SQLite file in
+SHARD_DIR whose alias is the file name, with the full tenant schema.
+
+WorkspaceMiddleware activates a request's shard with use(); ShardRouter
+sends tenant models to it, and tenant code that opens transactions or raw
+cursors asks current() for the alias. Shard connections are configured on
+first use and each thread keeps at most SHARD_MAX_OPEN_CONNECTIONS of them
+open, closing the least recently used.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+ALIAS_PATTERN = re.compile(r'^[a-z][a-z0-9_]{0,62}$')
+# Models kept in the main database whichever shard is active
+CENTRAL_MODELS = {('tasks', 'workspace'), ('tasks', 'workspacemember'), ('sessions', 'session')}
+
+_active = ContextVar('active_shard', default=DEFAULT_DB_ALIAS)
+# Per thread: shard aliases with an open connection, least recently used first
+_open = threading.local()
+
+
+def current():
+    """Alias of the active shard"""
+    return _active.get()
+
+
+def connection():
+    """Connection to the active shard, for raw SQL"""
+    return connections[current()]
+
+
+def is_central(model):
+    return (model._meta.app_label, model._meta.model_name) in CENTRAL_MODELS
+
+
+def path(alias):
+    """SQLite file of a shard"""
+    if alias == DEFAULT_DB_ALIAS:
+        return connections.settings[DEFAULT_DB_ALIAS]['NAME']
+    return settings.SHARD_DIR / f'{alias}.sqlite3'
+
+
+def configure(alias):
+    """Register a shard's connection settings, derived from the main database's"""
+    if alias in connections.settings:
+        return alias
+    if not ALIAS_PATTERN.match(alias):
+        raise ValueError(f'Invalid shard alias: {alias!r}')
+    settings.SHARD_DIR.mkdir(parents=True, exist_ok=True)
+    shard_settings = {**connections.settings[DEFAULT_DB_ALIAS], 'NAME': path(alias)}
+    shard_settings['TEST'] = {**shard_settings['TEST'], 'NAME': None, 'MIRROR': None}
+    connections.settings[alias] = shard_settings
+    settings.DATABASES[alias] = shard_settings
+    return alias
+
+
+def _touch(alias):
+    """Mark `alias` as just used; close this thread's least recently used shard connections"""
+    opened = getattr(_open, 'aliases', None)
+    if opened is None:
+        opened = _open.aliases = OrderedDict()
+    opened[alias] = True
+    opened.move_to_end(alias)
+    while len(opened) > settings.SHARD_MAX_OPEN_CONNECTIONS:
+        stale, _ = opened.popitem(last=False)
+        connection = connections[stale]
+        if connection.in_atomic_block:
+            opened[stale] = True  # still in use further up the stack
+            break
+        connection.close()
+
+
+@contextmanager
+def use(alias):
+    """
+    Make `alias` the active shard for the block. Query instrumentation
+    installed on the main connection (metrics, slow-query log, profiler)
+    also sees the shard's queries while it is active
+    """
+    configure(alias)
+    if alias != DEFAULT_DB_ALIAS:
+        _touch(alias)
+    token = _active.set(alias)
+    shard = connections[alias]
+    inherited = [] if alias == DEFAULT_DB_ALIAS else list(connections[DEFAULT_DB_ALIAS].execute_wrappers)
+    shard.execute_wrappers.extend(inherited)
+    try:
+        yield alias
+    finally:
+        for wrapper in inherited:
+            shard.execute_wrappers.remove(wrapper)
+        _active.reset(token)
+
+
+def known():
+    """Aliases of every shard file in SHARD_DIR"""
+    if not settings.SHARD_DIR.exists():
+        return []
+    return sorted(
+        shard.stem for shard in settings.SHARD_DIR.glob('*.sqlite3') if ALIAS_PATTERN.match(shard.stem)
+    )
+
+
+class ShardRouter:
+    """Central models live in the main database; tenant models in the active shard"""
+
+    def db_for_read(self, model, **hints):
+        if is_central(model):
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return current()
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return obj1._state.db == obj2._state.db
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if (app_label, model_name) in CENTRAL_MODELS:
+            return db == DEFAULT_DB_ALIAS
+        return None
@@ -0,0 +1,189 @@
+"""
+Slow-query log.
+
+``tasks.middleware.SlowQueryMiddleware`` wraps every request's database calls with a
+``SlowQueryLogger``. Queries slower than SLOW_QUERY_THRESHOLD_MS are
+written as JSON lines to the rotating ``tasks.slow_queries`` log with
+their parameters, duration, originating view and a short stack summary.
+The query plan is captured once per normalized SQL fingerprint.
+"""
+
+import hashlib
+import json
+import logging
+import logging.handlers
+import re
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger('tasks.slow_queries')
+
+
+class LogFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that creates the log's directory on its first write"""
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+# Plans already captured in this process, keyed by fingerprint
+_plans = OrderedDict()
+_plans_lock = threading.Lock()
+MAX_CACHED_PLANS = 1000
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|\?')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """Replace literals and parameter lists so equivalent queries compare equal"""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()[:12]
+
+
+def stack_summary(limit=6):
+    """The innermost project frames (outside Django and site-packages)"""
+    base = str(settings.BASE_DIR)
+    frames = [
+        f'{Path(frame.filename).relative_to(base)}:{frame.lineno} in {frame.name}'
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base)
+        and 'site-packages' not in frame.filename
+        and not frame.filename.endswith('slowqueries.py')
+    ]
+    return frames[-limit:]
+
+
+def explain(sql, params, db=connection):
+    """Return the query plan of a SELECT on connection `db` as a list of lines, or None"""
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    prefix = db.ops.explain_query_prefix()
+    try:
+        with db.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            return [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+    except Exception as e:
+        return [f'EXPLAIN failed: {e}']
+
+
+def cached_plan(key, sql, params, db=connection):
+    with _plans_lock:
+        if key in _plans:
+            _plans.move_to_end(key)
+            return _plans[key]
+    plan = explain(sql, params, db)
+    with _plans_lock:
+        _plans[key] = plan
+        while len(_plans) > MAX_CACHED_PLANS:
+            _plans.popitem(last=False)
+    return plan
+
+
+class SlowQueryLogger:
+    """Execute wrapper logging queries slower than the threshold"""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        self.explaining = False
+
+    def view_name(self):
+        match = getattr(self.request, 'resolver_match', None)
+        if match is None:
+            return None
+        return match.view_name or match._func_path
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            if duration >= self.threshold and not many:
+                self.log(sql, params, duration, context['connection'])
+
+    def log(self, sql, params, duration, db=connection):
+        key = fingerprint(sql)
+        self.explaining = True
+        try:
+            # The query may have run on a workspace shard; explain it there
+            plan = cached_plan(key, sql, params, db)
+        finally:
+            self.explaining = False
+        logger.warning(json.dumps({
+            'fingerprint': key,
+            'time': time.time(),
+            'duration_ms': round(duration * 1000, 3),
+            'sql': sql,
+            'params': [repr(param)[:200] for param in params or ()],
+            'view': self.view_name(),
+            'path': getattr(self.request, 'path', None),
+            'stack': stack_summary(),
+            'plan': plan,
+        }))
+
+
+def read_log(path=None):
+    """Parse entries from the slow-query log and its rotated backups"""
+    path = Path(path or settings.SLOW_QUERY_LOG)
+    files = sorted(path.parent.glob(f'{path.name}.*'), reverse=True) + [path]
+    entries = []
+    for log_file in files:
+        try:
+            lines = log_file.read_text().splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries
+
+
+def slow_query_report(entries):
+    """Aggregate log entries by fingerprint, slowest total time first"""
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'sql': normalize_sql(entry['sql']),
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'views': set(),
+        })
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+        if entry.get('view'):
+            group['views'].add(entry['view'])
+        # Keep the most recent sample's details
+        group.update(
+            last_time=entry['time'], params=entry['params'],
+            stack=entry['stack'], plan=entry.get('plan'),
+        )
+    report = sorted(groups.values(), key=lambda g: g['total_ms'], reverse=True)
+    for group in report:
+        group['avg_ms'] = group['total_ms'] / group['count']
+        group['views'] = sorted(group['views'])
+    return report
@@ -0,0 +1,66 @@
+// Kanban board: each column fetches its own cards, moves POST one status change.
+(function () {
+    const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]').value;
+
+    function loadPage(column, url) {
+        const cards = column.querySelector('.board-cards');
+        return fetch(url, {credentials: 'same-origin'})
+            .then((response) => response.text())
+            .then((html) => {
+                cards.querySelectorAll('.board-loading, .board-more').forEach((el) => el.remove());
+                cards.insertAdjacentHTML('beforeend', html);
+            });
+    }
+
+    function adjustCount(column, delta) {
+        const badge = column.querySelector('.board-count');
+        badge.textContent = parseInt(badge.textContent, 10) + delta;
+    }
+
+    document.querySelectorAll('.board-column').forEach((column) => {
+        loadPage(column, column.dataset.url);
+
+        column.addEventListener('click', (event) => {
+            const more = event.target.closest('.board-more');
+            if (more) {
+                more.disabled = true;
+                loadPage(column, more.dataset.url);
+            }
+        });
+
+        column.addEventListener('dragover', (event) => event.preventDefault());
+
+        column.addEventListener('drop', (event) => {
+            event.preventDefault();
+            const card = document.querySelector(`.board-card[data-id="${event.dataTransfer.getData('text/plain')}"]`);
+            if (!card || card.dataset.status === column.dataset.status) {
+                return;
+            }
+            const source = card.closest('.board-column');
+            const body = new URLSearchParams({status: column.dataset.status});
+            fetch(card.dataset.moveUrl, {
+                method: 'POST',
+                credentials: 'same-origin',
+                headers: {'X-CSRFToken': csrfToken},
+                body: body,
+            }).then((response) => {
+                if (!response.ok) {
+                    throw new Error(`Move failed: ${response.status}`);
+                }
+                return response.text();
+            }).then((html) => {
+                card.remove();
+                column.querySelector('.board-cards').insertAdjacentHTML('afterbegin', html);
+                adjustCount(source, -1);
+                adjustCount(column, 1);
+            }).catch((error) => console.error(error));
+        });
+    });
+
+    document.addEventListener('dragstart', (event) => {
+        const card = event.target.closest('.board-card');
+        if (card) {
+            event.dataTransfer.setData('text/plain', card.dataset.id);
+        }
+    });
+})();
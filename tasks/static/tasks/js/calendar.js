@@ -0,0 +1,96 @@
+// Due-date calendar: fetches only the visible range as JSON and renders it.
+(function () {
+    const root = document.getElementById('calendar');
+    const title = document.getElementById('calendar-title');
+    const today = parseDate(root.dataset.today);
+    const weekdays = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'];
+    let mode = 'month';
+    let anchor = today;
+
+    function parseDate(value) {
+        const [year, month, day] = value.split('-').map(Number);
+        return new Date(year, month - 1, day);
+    }
+
+    function isoDate(day) {
+        const pad = (n) => String(n).padStart(2, '0');
+        return `${day.getFullYear()}-${pad(day.getMonth() + 1)}-${pad(day.getDate())}`;
+    }
+
+    function addDays(day, count) {
+        return new Date(day.getFullYear(), day.getMonth(), day.getDate() + count);
+    }
+
+    function monday(day) {
+        return addDays(day, -((day.getDay() + 6) % 7));
+    }
+
+    function visibleRange() {
+        if (mode === 'week') {
+            const start = monday(anchor);
+            return [start, addDays(start, 7)];
+        }
+        const start = monday(new Date(anchor.getFullYear(), anchor.getMonth(), 1));
+        return [start, addDays(start, 42)];
+    }
+
+    function render(start, end, events) {
+        const byDay = {};
+        events.forEach((event) => {
+            const key = event.due.slice(0, 10);
+            (byDay[key] = byDay[key] || []).push(event);
+        });
+        const cells = weekdays.map((name) => `<div class="calendar-head">${name}</div>`);
+        for (let day = start; day < end; day = addDays(day, 1)) {
+            const key = isoDate(day);
+            const outside = mode === 'month' && day.getMonth() !== anchor.getMonth() ? ' calendar-outside' : '';
+            const current = key === root.dataset.today ? ' calendar-today' : '';
+            const items = (byDay[key] || []).map((event) => {
+                const link = document.createElement('a');
+                link.href = root.dataset.taskUrl.replace('/0/', `/${event.id}/`);
+                link.className = `calendar-event badge-status status-${event.status}`;
+                link.textContent = event.title;
+                return link.outerHTML;
+            }).join('');
+            cells.push(`<div class="calendar-day${outside}${current}"><div class="small text-muted">${day.getDate()}</div>${items}</div>`);
+        }
+        root.innerHTML = cells.join('');
+        title.textContent = anchor.toLocaleDateString(undefined, {month: 'long', year: 'numeric'});
+    }
+
+    function load() {
+        const [start, end] = visibleRange();
+        const params = new URLSearchParams({start: isoDate(start), end: isoDate(end)});
+        fetch(`${root.dataset.url}?${params}`, {credentials: 'same-origin'})
+            .then((response) => response.json())
+            .then((data) => render(start, end, data.events))
+            .catch((error) => console.error(error));
+    }
+
+    document.querySelectorAll('[data-shift]').forEach((button) => {
+        button.addEventListener('click', () => {
+            const shift = Number(button.dataset.shift);
+            if (shift === 0) {
+                anchor = today;
+            } else if (mode === 'week') {
+                anchor = addDays(anchor, 7 * shift);
+            } else {
+                anchor = new Date(anchor.getFullYear(), anchor.getMonth() + shift, 1);
+            }
+            load();
+        });
+    });
+
+    document.querySelectorAll('[data-mode]').forEach((button) => {
+        button.addEventListener('click', () => {
+            mode = button.dataset.mode;
+            document.querySelectorAll('[data-mode]').forEach((other) => {
+                other.classList.toggle('btn-primary', other === button);
+                other.classList.toggle('btn-outline-primary', other !== button);
+            });
+            load();
+        });
+    });
+
+    load();
+})();
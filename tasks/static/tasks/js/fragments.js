@@ -0,0 +1,85 @@
+// Progressive enhancement: swap server-rendered fragments in place instead of
+// reloading the page. Without JavaScript every form still submits normally.
+(function () {
+    function fetchFragment(url, options = {}) {
+        return fetch(url, {
+            credentials: 'same-origin',
+            ...options,
+            headers: {'X-Fragment': '1'},
+        }).then((response) => {
+            if (!response.ok) {
+                throw new Error(`${url}: ${response.status}`);
+            }
+            return response.text();
+        });
+    }
+
+    function post(form) {
+        return fetchFragment(form.action || window.location.href, {method: 'POST', body: new FormData(form)});
+    }
+
+    // Task list: filter changes re-render only the grid and the stats block
+    const filters = document.querySelector('.task-filters');
+    const grid = document.getElementById('task-grid');
+    const stats = document.getElementById('task-stats');
+
+    function refreshStats(query) {
+        return fetchFragment(`${stats.dataset.url}?${query}`).then((html) => {
+            stats.innerHTML = html;
+        });
+    }
+
+    if (filters && grid && stats) {
+        filters.addEventListener('submit', (event) => {
+            event.preventDefault();
+            const query = new URLSearchParams(new FormData(filters)).toString();
+            Promise.all([
+                fetchFragment(`${grid.dataset.url}?${query}`).then((html) => {
+                    grid.innerHTML = html;
+                }),
+                refreshStats(query),
+            ]).then(() => {
+                window.history.replaceState(null, '', `?${query}`);
+            }).catch((error) => {
+                console.error(error);
+                filters.submit();
+            });
+        });
+        filters.addEventListener('change', (event) => {
+            if (event.target.name !== 'search') {
+                filters.requestSubmit();
+            }
+        });
+    }
+
+    document.addEventListener('submit', (event) => {
+        const form = event.target;
+
+        // Mark done: swap the card, then recount the stats
+        if (form.classList.contains('task-complete-form')) {
+            event.preventDefault();
+            post(form).then((html) => {
+                form.closest('.task-slot').outerHTML = html;
+                return stats ? refreshStats(window.location.search.slice(1)) : null;
+            }).catch((error) => {
+                console.error(error);
+                form.submit();
+            });
+        }
+
+        // New comment: swap the comment list and its count
+        if (form.classList.contains('comment-form')) {
+            event.preventDefault();
+            post(form).then((html) => {
+                const list = document.querySelector('.comment-list');
+                list.outerHTML = html;
+                document.querySelector('.comment-count').textContent =
+                    document.querySelector('.comment-list').dataset.count;
+                form.reset();
+            }).catch((error) => {
+                console.error(error);
+                form.submit();
+            });
+        }
+    });
+})();
@@ -0,0 +1,68 @@
+"""
+Static file storage with content-hashed names and precompressed variants.
+
+``collectstatic`` writes ``name.<hash>.ext`` plus ``.gz`` (and ``.br``
+when the optional ``brotli`` package is installed) next to every
+compressible file, so the static middleware never compresses at
+request time.
+"""
+
+import gzip
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.txt', '.html', '.json', '.map', '.xml'}
+
+# Files smaller than this gain nothing from compression
+MIN_COMPRESS_SIZE = 256
+
+
+def compressors():
+    """Return (extension, compress function) pairs that are available"""
+    available = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        available.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    return available
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes precompressed copies of each file"""
+
+    # Files collected after the manifest was written are hashed on demand
+    manifest_strict = False
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            # Nothing collected yet (development, tests): use the source name
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = []
+        for name, hashed_name, result in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(result, Exception):
+                processed.extend({name, hashed_name})
+            yield name, hashed_name, result
+        if not dry_run:
+            for name in processed:
+                self.compress(name)
+
+    def compress(self, name):
+        """Write compressed variants of `name` when they are smaller"""
+        path = Path(self.path(name))
+        if path.suffix not in COMPRESSIBLE_EXTENSIONS or not path.exists():
+            return
+        data = path.read_bytes()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        for extension, compress in compressors():
+            compressed = compress(data)
+            if len(compressed) < len(data):
+                Path(f'{path}{extension}').write_bytes(compressed)
@@ -0,0 +1,104 @@
+"""
+Subtask hierarchy stored as a materialized path.
+
+Every task's `path` is its ancestors' ids followed by its own, each as a
+fixed-width SEGMENT_WIDTH-digit segment ending in '/'. A subtree is then
+one index range, [path, path with its final '/' replaced by '0'), since
+'0' is the character right after '/': fetching, counting and re-rooting
+a subtree are single indexed statements.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db.models import Case, Count, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Concat, Length, Substr
+
+SEGMENT_WIDTH = 10
+
+
+def segment(pk):
+    return f'{pk:0{SEGMENT_WIDTH}d}/'
+
+
+def bounds(path):
+    """Half-open range of paths below `path`, including itself"""
+    return path, path[:-1] + '0'
+
+
+def depth(path):
+    return len(path) // (SEGMENT_WIDTH + 1) - 1
+
+
+def ancestor_ids(task):
+    """Ids of `task`'s ancestors, read straight from its path"""
+    return [int(part) for part in task.path.split('/')[:-2]]
+
+
+def path_for(task):
+    """The path `task` should have under its current parent"""
+    parent = task.parent if task.parent_id else None
+    return (parent.path or segment(parent.pk) if parent else '') + segment(task.pk)
+
+
+def descendants(task):
+    """Every task below `task`, depth-first"""
+    from .models import Task
+
+    low, high = bounds(task.path)
+    return Task.objects.filter(path__gt=low, path__lt=high).order_by('path')
+
+
+def stored_paths(*tasks):
+    from .models import Task
+
+    return dict(Task.objects.filter(pk__in=[task.pk for task in tasks]).values_list('pk', 'path'))
+
+
+def check_parent(task, parent):
+    """Refuse making a task its own ancestor"""
+    if parent is None:
+        return
+    # Stored paths: the instances may predate an earlier move
+    paths = stored_paths(task, parent)
+    parent.path = paths[parent.pk]
+    if parent.path.startswith(paths[task.pk]):
+        raise ValidationError('A task cannot become a subtask of itself or of its own subtasks.')
+
+
+def repath(task, old_path):
+    """Rewrite the paths of `task`'s whole subtree with one UPDATE"""
+    from .models import Task
+
+    new_path = path_for(task)
+    if new_path == old_path:
+        return 0
+    low, high = bounds(old_path)
+    task.path = new_path
+    return Task.objects.filter(path__gte=low, path__lt=high).update(
+        path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+    )
+
+
+def move(task, parent):
+    """Re-parent `task` (None makes it a root), carrying its subtree along"""
+    check_parent(task, parent)
+    task.parent = parent
+    task.save(update_fields=['parent'])
+
+
+def with_progress(queryset):
+    """Annotate subtask_total / subtask_done with two correlated index-range counts"""
+    from .models import Task
+
+    outer = OuterRef('path')
+    below = Task.objects.filter(
+        path__gt=outer,
+        path__lt=Concat(Substr(outer, 1, Length(outer) - 1), Value('0')),
+    ).order_by().values(dummy=Value(1))
+
+    def count(aggregate):
+        return Coalesce(Subquery(below.annotate(n=aggregate).values('n'), output_field=IntegerField()), 0)
+
+    # Both counts filter on the path range; a status filter would lure
+    # SQLite onto the status index instead
+    done = Sum(Case(When(status='done', then=1), default=0))
+    return queryset.annotate(subtask_total=count(Count('pk')), subtask_done=count(done))
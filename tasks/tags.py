@@ -0,0 +1,134 @@
+"""
+Task tags with an in-memory inverted index.
+
+TaskTag rows are postings, stored in (tag, task) order by their unique
+index. Tag.task_count is adjusted in the same transaction as every posting
+change, and Tag.version is bumped with it. Each process keeps one bitmap of
+task ids per recently used tag, reloaded from the index only when the
+tag's stored version has moved on, so an AND/OR over several tags is an
+integer & or | and only the matching ids reach SQL.
+"""
+
+import json
+from collections import defaultdict
+from functools import reduce
+from operator import and_, or_
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from . import shards
+from .models import Tag, TaskTag
+
+MAX_NAME_LENGTH = Tag._meta.get_field('name').max_length
+MAX_CACHED_TAGS = 1024
+
+# Bit positions set in each byte value, for decoding bitmaps
+_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+# (shard, tag id) -> (version, bitmap)
+_postings = {}
+
+
+def parse_names(text):
+    """Comma-separated tag names, stripped, lower-cased and de-duplicated in order"""
+    names = (name.strip().lower() for name in text.split(','))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def get_or_create(user, names):
+    """The user's tags with these names, creating missing ones in one INSERT"""
+    if not names:
+        return []
+    Tag.objects.bulk_create([Tag(name=name, created_by=user) for name in names], ignore_conflicts=True)
+    return list(Tag.objects.filter(created_by=user, name__in=names))
+
+
+def _adjust(deltas):
+    """Apply {tag id: change in task count} with one UPDATE per distinct change"""
+    by_delta = defaultdict(list)
+    for tag_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(tag_id)
+    for delta, tag_ids in by_delta.items():
+        Tag.objects.filter(pk__in=tag_ids).update(
+            task_count=F('task_count') + delta, version=F('version') + 1,
+        )
+
+
+def set_tags(task, user, tags):
+    """Make `tags` the user's tags on `task`; other users' tags are left alone"""
+    with transaction.atomic(using=shards.current()):
+        current = set(TaskTag.objects.filter(task=task, tag__created_by=user).values_list('tag_id', flat=True))
+        wanted = {tag.pk for tag in tags}
+        added, removed = wanted - current, current - wanted
+        TaskTag.objects.bulk_create([TaskTag(tag_id=tag_id, task=task) for tag_id in added])
+        TaskTag.objects.filter(task=task, tag_id__in=removed).delete()
+        _adjust({**{tag_id: 1 for tag_id in added}, **{tag_id: -1 for tag_id in removed}})
+
+
+def detach(task_ids):
+    """Drop every posting of these tasks, e.g. before deleting or archiving them"""
+    postings = TaskTag.objects.filter(task_id__in=list(task_ids))
+    with transaction.atomic(using=shards.current()):
+        counts = dict(postings.order_by().values_list('tag_id').annotate(n=Count('id')))
+        postings.delete()
+        _adjust({tag_id: -n for tag_id, n in counts.items()})
+
+
+def rebuild():
+    """Recount every tag from its postings; returns the number of tags"""
+    counts = TaskTag.objects.filter(tag=OuterRef('pk')).order_by().values('tag').annotate(n=Count('id')).values('n')
+    return Tag.objects.update(task_count=Coalesce(Subquery(counts), 0), version=F('version') + 1)
+
+
+def _bitmap(task_ids):
+    """Bitmap with one bit set per id; `task_ids` must be ascending"""
+    if not task_ids:
+        return 0
+    bits = bytearray(task_ids[-1] // 8 + 1)
+    for task_id in task_ids:
+        bits[task_id >> 3] |= 1 << (task_id & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def _ids(bitmap):
+    """Ascending ids of the bits set in `bitmap`"""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    return [offset * 8 + bit for offset, byte in enumerate(data) if byte for bit in _BITS[byte]]
+
+
+def bitmap(tag):
+    """The tag's task ids as a bitmap, from this process's cache if still current"""
+    key = (shards.current(), tag.pk)
+    cached = _postings.get(key)
+    if cached is not None and cached[0] == tag.version:
+        return cached[1]
+    # Covered by task_tag_unique: a range read of (tag, task) in task order
+    task_ids = list(TaskTag.objects.filter(tag=tag).order_by('task_id').values_list('task_id', flat=True))
+    result = _bitmap(task_ids)
+    # Stored under the version read before the postings: a concurrent change
+    # can only make the entry look older than it is, never newer
+    _postings.pop(key, None)
+    while len(_postings) >= MAX_CACHED_TAGS:
+        _postings.pop(next(iter(_postings)), None)
+    _postings[key] = (tag.version, result)
+    return result
+
+
+def matching_ids(tags, match='all'):
+    """Ids of tasks carrying all (or, with match='any', any) of `tags`"""
+    if not tags:
+        return []
+    return _ids(reduce(and_ if match == 'all' else or_, (bitmap(tag) for tag in tags)))
+
+
+def filter_tasks(queryset, tags, match='all'):
+    """
+    Narrow `queryset` to the tag match. The ids go to SQLite as one JSON
+    parameter, which has no variable limit, and are looked up by primary key
+    """
+    ids = json.dumps(matching_ids(tags, match))
+    return queryset.filter(pk__in=RawSQL('SELECT value FROM json_each(%s)', [ids]))
@@ -7,13 +7,57 @@ Tests cover:
 4. Regression Tests After Patches
 """
 
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core import mail
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.core.wsgi import get_wsgi_application
 from django.test import TestCase, TransactionTestCase, Client
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.contrib.auth.models import User
-from django.db import IntegrityError, transaction
-from django.db.models import ProtectedError
+from django.db import IntegrityError, OperationalError, connection, connections, transaction
+from django.db.models import Count, F, ProtectedError
+from django.template import engines
 from django.urls import reverse
-from .models import Task, Category, Project, Comment
+from django.utils import timezone
+from . import shards, tags, urls as task_urls, workspaces
+from .admin import BoundedRelatedFieldListFilter, set_status_action
+from .analytics import project_series
+from .archive import archive_done
+from .backfills import CommentCounts, checkpoint, run as run_backfill
+from .backups import MAX_PAUSE, BackupError, copy as copy_database, file_name, prune, snapshots, verify
+from .benchmarking import seed_dataset
+from .datagen import DatasetGenerator
+from .dependencies import add_dependency, blockers, remove_dependency, would_cycle
+from .loadtest import LoadTest, simulated_users
+from .outbox import (
+    MAX_ATTEMPTS, deliver_pending, enqueue, notify_assignment, notify_comment, parked_count, pending_count,
+)
+from .reminders import scan_reminders
+from .saved_filters import check
+from .metrics import MmapValues, collect, render_prometheus
+from .profiling import ProfileStore
+from .slowqueries import LogFileHandler, fingerprint, slow_query_report
+from .subtasks import descendants
+from .warmup import template_names, warm_up
+from .management.commands.benchmark import Command as BenchmarkCommand, compare_results, url_targets
+from .models import (
+    ArchivedComment, ArchivedTask, DependencyClosure, DependencyCycle, SavedFilter, Tag, Task,
+    TaskConflict, Category, Project, Comment, OutboxMessage, Workspace,
+)
+import gzip
 import json
+import logging
+import pstats
+import sqlite3
+import tempfile
+import threading
+import time
+from io import StringIO
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
 
 
 class ForeignKeyViolationTests(TransactionTestCase):
@@ -423,6 +467,8 @@ class RegressionTests(TestCase):
             'description': 'Updated description',
             'status': 'in_progress',
             'priority': 'urgent',
+            # Hidden field rendered by the edit form
+            'version': task.version,
         }
         
         response = self.client.post(
@@ -529,6 +575,1947 @@ class RegressionTests(TestCase):
         print("✓ PASS: All foreign key relationships working after patch")
 
 
+class SessionStorageTests(TestCase):
+    """
+    Test Suite for Session and Message Storage
+    Authenticated page views should not hit the django_session table
+    """
+
+    def setUp(self):
+        """Set up a logged-in client"""
+        self.client = Client()
+        self.user = User.objects.create_user(username='sessionuser', password='pass123')
+        self.client.login(username='sessionuser', password='pass123')
+
+    def session_queries(self, url, method='get', data=None):
+        """Return the django_session queries issued by a single request"""
+        with CaptureQueriesContext(connection) as queries:
+            getattr(self.client, method)(url, data or {})
+        return [q['sql'] for q in queries.captured_queries if 'django_session' in q['sql']]
+
+    def test_cached_session_skips_database(self):
+        """
+        Test cached_db sessions: repeat page views are served from the cache
+        """
+        print("\n=== Test 19: Cached Session Reads ===")
+
+        self.assertEqual(settings.SESSION_ENGINE, 'django.contrib.sessions.backends.cached_db')
+        self.client.get(reverse('task_list'))
+
+        self.assertEqual(self.session_queries(reverse('task_list')), [])
+        print("✓ PASS: Authenticated page view served without a session query")
+
+    def test_flash_message_uses_cookie(self):
+        """
+        Test fallback message storage: flash messages ride in a cookie
+        """
+        print("\n=== Test 20: Cookie Message Storage ===")
+
+        queries = self.session_queries(reverse('category_create'), 'post', {'name': 'Inbox'})
+        self.assertFalse([sql for sql in queries if sql.startswith(('INSERT', 'UPDATE'))])
+        self.assertIn('messages', self.client.cookies)
+
+        response = self.client.get(reverse('category_list'))
+        self.assertContains(response, 'Category created successfully!')
+        print("✓ PASS: Flash message stored in cookie, session not rewritten")
+
+
+class BenchmarkTests(TestCase):
+    """
+    Test Suite for the View Benchmark Command
+    Every URL must be exercised and regressions must be flagged
+    """
+
+    def test_every_url_is_benchmarked(self):
+        """
+        Test URL coverage: each named pattern in tasks/urls.py gets a target
+        """
+        print("\n=== Test 21: Benchmark URL Coverage ===")
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(override_settings(PROFILING_DIR=directory.name))
+        user = seed_dataset(users=2, tasks_per_user=3, comments_per_task=1)
+        User.objects.filter(pk=user.pk).update(is_staff=True)
+        user = User.objects.get(pk=user.pk)
+        names = {pattern.name for pattern in task_urls.urlpatterns if pattern.name}
+
+        # Without a recorded profile there is nothing to download; it is reported, not dropped
+        self.assertEqual(names - set(url_targets(user)), {'profile_download'})
+        command = BenchmarkCommand(stdout=StringIO())
+        self.assertEqual(command.run_views(user, 1)[1]['profile_download'], 'nothing to request')
+
+        self.client.force_login(user)
+        self.client.get(reverse('task_list'), {'_profile': '1'})
+        targets = url_targets(user)
+        self.assertEqual(set(targets), names)
+        self.assertEqual(targets['board_column'], reverse('board_column', kwargs={'status': 'todo'}))
+        blocked, blocker = Task.objects.filter(created_by=user).order_by('pk')[:2]
+        self.assertEqual(targets['task_dependency_remove'],
+                         reverse('task_dependency_remove', kwargs={'pk': blocked.pk, 'blocker_pk': blocker.pk}))
+
+        # POST-only actions are skipped; everything timed must succeed
+        results, skipped = command.run_views(user, 1)
+        self.assertEqual(skipped['task_complete'], 'POST only')
+        self.assertIn('saved_filter_delete', skipped)
+        self.assertIn('task_dependency_remove', skipped)
+        self.assertEqual(set(results) | set(skipped), names)
+        for name in ('calendar_feed', 'profile_list', 'profile_download', 'board_column'):
+            self.assertEqual(results[name]['status'], 200)
+        self.assertFalse([name for name, row in results.items() if row['status'] >= 400])
+        print(f"✓ PASS: {len(targets)} views resolved to concrete URLs, {len(skipped)} POST-only skipped")
+
+    def test_regression_detection(self):
+        """
+        Test compare mode: slower p95 and extra queries are regressions
+        """
+        print("\n=== Test 22: Benchmark Regression Detection ===")
+
+        baseline = {'task_list': {'queries': 5, 'p95_ms': 10.0}}
+        self.assertEqual(compare_results(baseline, {'task_list': {'queries': 5, 'p95_ms': 11.0}}, 0.2), [])
+
+        regressions = compare_results(baseline, {'task_list': {'queries': 7, 'p95_ms': 13.0}}, 0.2)
+        self.assertEqual(len(regressions), 2)
+        # An error page is not compared against the view's real timings
+        failed = {'task_list': {'status': 404, 'queries': 1, 'p95_ms': 50.0}}
+        self.assertEqual(compare_results(baseline, failed, 0.2), [])
+        print(f"✓ PASS: Detected {len(regressions)} regressions")
+
+
+class DataGenerationTests(TestCase):
+    """
+    Test Suite for the Synthetic Data Generator
+    Generated rows must be valid and follow the requested distributions
+    """
+
+    def test_generated_dataset_is_consistent(self):
+        """
+        Test generate_data: row counts, valid foreign keys and status mix
+        """
+        print("\n=== Test 23: Synthetic Data Generation ===")
+
+        counts = DatasetGenerator(
+            users=20, tasks=2000, comments=4000, seed=7,
+            status_mix={'todo': 1, 'done': 3}, batch_size=500,
+        ).run()
+
+        self.assertEqual(counts['User'], 20)
+        self.assertEqual(Task.objects.count(), 2000)
+        self.assertAlmostEqual(Comment.objects.count() / 4000, 1, delta=0.15)
+        done = Task.objects.filter(status='done')
+        self.assertAlmostEqual(done.count() / 2000, 0.75, delta=0.05)
+        self.assertFalse(done.filter(completed_at__isnull=True).exists())
+        # Categories and projects always belong to the task owner
+        self.assertFalse(Task.objects.exclude(category__created_by=F('created_by')).exists())
+        self.assertFalse(Task.objects.exclude(project__owner=F('created_by')).exists())
+        # Skewed ownership: the top user owns far more than an even share
+        top = Task.objects.values('created_by').annotate(n=Count('id')).order_by('-n').first()
+        self.assertGreater(top['n'], 2000 / 20 * 3)
+        self.assertTrue(self.client.login(username=User.objects.last().username, password='loadtest-pass-123'))
+        print(f"✓ PASS: Generated {sum(counts.values())} consistent rows")
+
+
+class LoadTestTests(TransactionTestCase):
+    """
+    Test Suite for the In-Process Load Generator
+    Simulated users must be authenticated and pass CSRF checks
+    """
+
+    def test_load_test_runs_without_errors(self):
+        """
+        Test loadtest: every scenario succeeds against the WSGI application
+        """
+        print("\n=== Test 24: In-Process Load Test ===")
+
+        user = seed_dataset(users=2, tasks_per_user=3, comments_per_task=1)
+        report = LoadTest(
+            get_wsgi_application(), simulated_users([user]),
+            concurrency=1, duration=1.0, seed=1,
+        ).run()
+
+        self.assertGreater(report['requests'], 0)
+        self.assertEqual(report['error_rate'], 0)
+        self.assertLessEqual(set(report['statuses']), {200, 302})
+        self.assertEqual(sum(report['histogram'].values()), report['requests'])
+        self.assertTrue(Comment.objects.filter(content='Load test comment').exists()
+                        or 'comment' not in report['scenarios'])
+        print(f"✓ PASS: {report['requests']} requests at {report['throughput_rps']} req/s, no errors")
+
+
+class StaticAssetTests(TestCase):
+    """
+    Test Suite for the Static Asset Pipeline
+    Hashed, precompressed assets and compressed HTML responses
+    """
+
+    def setUp(self):
+        """Set up a logged-in client"""
+        self.client = Client()
+        self.user = User.objects.create_user(username='staticuser', password='pass123')
+        self.client.login(username='staticuser', password='pass123')
+
+    def test_collected_assets_are_hashed_and_precompressed(self):
+        """
+        Test collectstatic output served with far-future cache headers
+        """
+        print("\n=== Test 25: Hashed Precompressed Static Assets ===")
+
+        with tempfile.TemporaryDirectory() as root, override_settings(STATIC_ROOT=root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            url = staticfiles_storage.url('tasks/css/app.css')
+            self.assertRegex(url, r'app\.[0-9a-f]{12}\.css$')
+
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('immutable', response['Cache-Control'])
+            css = gzip.decompress(b''.join(response.streaming_content))
+            self.assertIn(b'.task-card', css)
+
+            # Traversal out of STATIC_ROOT falls through to URL routing
+            self.assertEqual(self.client.get('/static/../manage.py').status_code, 404)
+            # A file collected without a manifest entry is hashed on demand
+            storage = staticfiles_storage._wrapped
+            del storage.hashed_files[storage.hash_key('tasks/css/app.css')]
+            self.assertEqual(staticfiles_storage.url('tasks/css/app.css'), url)
+        print(f"✓ PASS: {url} served gzip-precompressed and immutable")
+
+    def test_large_html_is_compressed(self):
+        """
+        Test dynamic compression of HTML above the size threshold only
+        """
+        print("\n=== Test 26: Dynamic HTML Compression ===")
+
+        response = self.client.get(reverse('task_list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotIn(b'<style>', gzip.decompress(response.content))
+
+        with override_settings(HTML_COMPRESSION_MIN_SIZE=10 ** 6):
+            response = self.client.get(reverse('task_list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        print("✓ PASS: HTML compressed only above the threshold")
+
+
+class WarmUpTests(TestCase):
+    """
+    Test Suite for Template Caching and Process Warm-up
+    """
+
+    def test_warm_up_compiles_every_template(self):
+        """
+        Test warm_up: all app templates end up in the cached loader
+        """
+        print("\n=== Test 27: Startup Warm-up ===")
+
+        loader = engines['django'].engine.template_loaders[0]
+        loader.reset()
+
+        timings = warm_up(force=True)
+
+        self.assertEqual(set(timings), {'templates', 'urls', 'forms'})
+        cached = {template.origin.template_name for template in loader.get_template_cache.values()}
+        self.assertLessEqual(set(template_names()), cached)
+        self.assertIn('tasks/task_list.html', cached)
+        print(f"✓ PASS: {len(template_names())} templates precompiled in {timings['templates'] * 1000:.1f}ms")
+
+
+class ProfilingTests(TestCase):
+    """
+    Test Suite for Per-Request Profiling
+    Opt-in profiles are stored on disk and visible to staff only
+    """
+
+    def setUp(self):
+        """Set up a staff client, a regular client and a profile directory"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.override = override_settings(PROFILING_DIR=self.directory.name, PROFILING_MAX_PROFILES=3)
+        self.override.enable()
+        self.staff = User.objects.create_user(username='staff', password='pass123', is_staff=True)
+        self.user = User.objects.create_user(username='regular', password='pass123')
+        self.client.login(username='staff', password='pass123')
+
+    def tearDown(self):
+        self.override.disable()
+        self.directory.cleanup()
+
+    def test_staff_flag_records_profile_with_sql(self):
+        """
+        Test opt-in profiling: ?_profile stores a cProfile dump and the SQL
+        """
+        print("\n=== Test 28: Per-Request Profiling ===")
+
+        response = self.client.get(reverse('task_list'), {'_profile': '1'})
+        profile_id = response['X-Profile-Id']
+        profile = ProfileStore().get(profile_id)
+        self.assertEqual(profile['url_name'], 'task_list')
+        self.assertGreater(profile['query_count'], 0)
+        self.assertIn('tasks_task', ' '.join(q['sql'] for q in profile['queries']))
+
+        download = self.client.get(reverse('profile_download', kwargs={'profile_id': profile_id}))
+        stats = pstats.Stats(str(ProfileStore().path(profile_id)))
+        self.assertEqual(download.status_code, 200)
+        self.assertGreater(stats.total_calls, 0)
+        self.assertContains(self.client.get(reverse('profile_list')), profile_id)
+        print(f"✓ PASS: Profile {profile_id} captured {profile['query_count']} queries")
+
+    def test_profiling_is_staff_only_and_bounded(self):
+        """
+        Test access control and retention of stored profiles
+        """
+        print("\n=== Test 29: Profiling Access and Retention ===")
+
+        for _ in range(5):
+            self.client.get(reverse('task_list'), HTTP_X_PROFILE='1')
+        self.assertEqual(len(ProfileStore().list()), 3)
+
+        self.client.login(username='regular', password='pass123')
+        response = self.client.get(reverse('task_list'), {'_profile': '1'})
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(self.client.get(reverse('profile_list')).status_code, 302)
+        print("✓ PASS: Non-staff requests not profiled, retention capped at 3")
+
+
+class SlowQueryLogTests(TestCase):
+    """
+    Test Suite for the Slow-Query Log
+    """
+
+    def setUp(self):
+        """Set up a staff client"""
+        self.staff = User.objects.create_user(username='dba', password='pass123', is_staff=True)
+        self.client.login(username='dba', password='pass123')
+
+    def test_fingerprint_ignores_literals(self):
+        """
+        Test SQL normalization: same shape, different values, same fingerprint
+        """
+        print("\n=== Test 30: Slow Query Fingerprints ===")
+
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'a'"),
+            fingerprint("SELECT  * FROM t WHERE id IN (%s, %s) AND name = %s"),
+        )
+        self.assertNotEqual(fingerprint('SELECT a FROM t'), fingerprint('SELECT b FROM t'))
+        print("✓ PASS: Literals and parameter lists normalized")
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_queries_logged_with_plan_and_view(self):
+        """
+        Test slow-query capture: parameters, view, stack and EXPLAIN plan
+        """
+        print("\n=== Test 31: Slow Query Capture ===")
+
+        Task.objects.create(title='Slow', created_by=self.staff)
+        with self.assertLogs('tasks.slow_queries', 'WARNING') as logs:
+            self.client.get(reverse('task_list'), {'search': 'Slow'})
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+
+        task_queries = [e for e in entries if 'FROM "tasks_task"' in e['sql']]
+        self.assertTrue(task_queries)
+        entry = task_queries[0]
+        self.assertEqual(entry['view'], 'task_list')
+        self.assertIn("'%Slow%'", entry['params'])
+        self.assertTrue(any('tasks/views.py' in frame for frame in entry['stack']))
+        self.assertTrue(entry['plan'])
+
+        report = slow_query_report(entries)
+        self.assertEqual(sum(group['count'] for group in report), len(entries))
+        self.assertEqual(len({group['fingerprint'] for group in report}), len(report))
+        print(f"✓ PASS: {len(entries)} queries logged in {len(report)} fingerprint groups")
+
+    def test_report_page_reads_rotated_logs(self):
+        """
+        Test the staff report over the current and rotated log files
+        """
+        print("\n=== Test 32: Slow Query Report Page ===")
+
+        entry = {'fingerprint': 'abc123def456', 'time': 0, 'duration_ms': 150.0,
+                 'sql': 'SELECT 1', 'params': [], 'view': 'task_list', 'stack': [], 'plan': ['SCAN t']}
+        with tempfile.TemporaryDirectory() as directory:
+            log = Path(directory) / 'slow.log'
+            log.write_text(json.dumps(entry) + '\n')
+            Path(f'{log}.1').write_text(json.dumps(dict(entry, duration_ms=50.0)) + '\n')
+            with override_settings(SLOW_QUERY_LOG=log):
+                response = self.client.get(reverse('slow_query_list'))
+
+            # The log handler creates its directory on the first write only
+            nested = Path(directory) / 'logs' / 'slow.log'
+            handler = LogFileHandler(nested, delay=True)
+            self.assertFalse(nested.parent.exists())
+            handler.emit(logging.makeLogRecord({'msg': 'slow'}))
+            handler.close()
+            self.assertEqual(nested.read_text(), 'slow\n')
+
+        self.assertEqual(response.context['report'][0]['count'], 2)
+        self.assertContains(response, 'SCAN t')
+        print("✓ PASS: Report aggregates current and rotated logs")
+
+
+class MetricsTests(TestCase):
+    """
+    Test Suite for the Metrics Subsystem
+    Values from all worker stores are summed into one Prometheus exposition
+    """
+
+    def setUp(self):
+        """Point the metrics store at a temporary directory"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.override = override_settings(METRICS_DIR=self.directory.name)
+        self.override.enable()
+        self.user = User.objects.create_user(username='metricsuser', password='pass123')
+        self.client.login(username='metricsuser', password='pass123')
+
+    def tearDown(self):
+        self.override.disable()
+        self.directory.cleanup()
+
+    def test_worker_stores_are_aggregated(self):
+        """
+        Test mmap stores: per-process files grow on demand and are summed
+        """
+        print("\n=== Test 33: Multi-Process Metric Aggregation ===")
+
+        directory = Path(self.directory.name) / 'workers'
+        directory.mkdir()
+        worker_a = MmapValues(directory / '1.db', initial_size=64)
+        worker_b = MmapValues(directory / '2.db', initial_size=64)
+        for index in range(50):
+            worker_a.increment(f'key-{index}')
+        worker_b.increment('key-0', 2.5)
+
+        totals = collect(directory)
+        self.assertEqual(len(totals), 50)
+        self.assertEqual(totals['key-0'], 3.5)
+        # Re-opening a file keeps its values (e.g. a recycled pid)
+        self.assertEqual(MmapValues(directory / '1.db').offsets.keys(), worker_a.offsets.keys())
+        print(f"✓ PASS: {len(totals)} series summed across 2 worker files")
+
+    def test_prometheus_endpoint(self):
+        """
+        Test /metrics: request, query, template and cache series are exposed
+        """
+        print("\n=== Test 34: Prometheus Metrics Endpoint ===")
+
+        self.client.get(reverse('task_list'))
+        body = self.client.get(reverse('metrics')).content.decode()
+
+        self.assertIn('taskmanager_http_requests_total{method="GET",status="200",view="task_list"} 1', body)
+        self.assertIn('taskmanager_http_request_duration_seconds_bucket{view="task_list",le="+Inf"} 1', body)
+        self.assertIn('taskmanager_db_queries_per_request_count{view="task_list"} 1', body)
+        self.assertIn('taskmanager_template_render_duration_seconds_count{template="tasks/task_list.html"}', body)
+        self.assertIn('taskmanager_cache_requests_total{cache="sessions",result="hit"}', body)
+
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.8')
+        self.assertEqual(response.status_code, 403)
+
+        # With a token, a local address (e.g. a reverse proxy) is not enough
+        with override_settings(METRICS_TOKEN='scrape-secret'):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+            response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret')
+            self.assertEqual(response.status_code, 200)
+        print("✓ PASS: Metrics exposed to local scrapers and token holders only")
+
+
+class AdminScalabilityTests(TestCase):
+    """
+    Test Suite for the Django Admin at Scale
+    Changelist cost must not grow with the number of rows
+    """
+
+    def setUp(self):
+        """Set up a superuser and a few tasks"""
+        self.admin = User.objects.create_superuser(username='admin', password='pass123')
+        self.client.login(username='admin', password='pass123')
+        self.url = reverse('admin:tasks_task_changelist')
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_constant(self):
+        """
+        Test related columns: query count independent of listed rows
+        """
+        print("\n=== Test 35: Admin Changelist Query Count ===")
+
+        other = User.objects.create_user(username='other', password='pass123')
+        Task.objects.create(title='First', created_by=self.admin, assigned_to=other)
+        few = self.changelist_queries()
+        for index in range(30):
+            Task.objects.create(title=f'Task {index}', created_by=other, assigned_to=self.admin)
+        self.assertEqual(self.changelist_queries(), few)
+        print(f"✓ PASS: {few} queries for 1 and 31 tasks")
+
+    def test_bounded_filters_and_indexed_search(self):
+        """
+        Test sidebar filters are capped and title search uses an index
+        """
+        print("\n=== Test 36: Bounded Filters and Indexed Search ===")
+
+        Category.objects.bulk_create([
+            Category(name=f'Category {index:03}', created_by=self.admin) for index in range(80)
+        ])
+        response = self.client.get(self.url)
+        category_filter = next(
+            spec for spec in response.context['cl'].filter_specs if spec.field_path == 'category'
+        )
+        self.assertEqual(len(category_filter.lookup_choices), BoundedRelatedFieldListFilter.MAX_CHOICES)
+
+        plan = Task.objects.filter(title__istartswith='abc').explain()
+        self.assertIn('task_title_nocase_idx', plan)
+        print("✓ PASS: Filter capped, prefix search uses task_title_nocase_idx")
+
+    def test_status_action_is_set_based(self):
+        """
+        Test admin action: one UPDATE for any number of selected tasks
+        """
+        print("\n=== Test 37: Set-Based Admin Action ===")
+
+        tasks = [Task.objects.create(title=f'Task {index}', created_by=self.admin) for index in range(10)]
+        finished = timezone.now() - timedelta(days=30)
+        Task.objects.filter(pk=tasks[0].pk).update(status='done', completed_at=finished)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, {
+                'action': 'mark_done',
+                '_selected_action': [task.pk for task in tasks],
+            })
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Task.objects.filter(status='done', completed_at__isnull=False).count(), 10)
+        # Already done: its completion time (and archive timer) is left alone
+        self.assertEqual(Task.objects.values_list('completed_at', 'version').get(pk=tasks[0].pk), (finished, 1))
+        print("✓ PASS: 9 tasks marked done with a single UPDATE; the done one kept its completion time")
+
+
+class ReminderTests(TestCase):
+    """
+    Test Suite for Due-Date Reminders and the Outbox Worker
+    """
+
+    def setUp(self):
+        """Set up users and tasks around the reminder window"""
+        self.now = timezone.now()
+        self.owner = User.objects.create_user(username='owner', password='pass123', email='owner@example.com')
+        self.assignee = User.objects.create_user(username='assignee', password='pass123', email='a@example.com')
+
+    def task(self, title, hours, status='todo', **fields):
+        return Task.objects.create(
+            title=title, created_by=self.owner, status=status,
+            due_date=self.now + timedelta(hours=hours), **fields,
+        )
+
+    def test_scan_is_incremental(self):
+        """
+        Test reminder scan: due-soon and overdue found once each
+        """
+        print("\n=== Test 38: Incremental Reminder Scan ===")
+
+        soon = self.task('Soon', 2, assigned_to=self.assignee)
+        late = self.task('Late', -2)
+        self.task('Finished', -2, status='done')
+        self.task('Far away', 72)
+
+        self.assertEqual(scan_reminders(now=self.now), {'due_soon': 1, 'overdue': 1})
+        self.assertEqual(OutboxMessage.objects.get(kind='due_soon').recipient, self.assignee)
+        self.assertEqual(OutboxMessage.objects.get(kind='overdue').task, late)
+
+        # Nothing new an hour later; once `soon` is past due it becomes overdue
+        self.assertEqual(scan_reminders(now=self.now + timedelta(hours=1)), {'due_soon': 0, 'overdue': 0})
+        self.assertEqual(scan_reminders(now=self.now + timedelta(hours=3)), {'due_soon': 0, 'overdue': 1})
+        self.assertTrue(OutboxMessage.objects.filter(kind='overdue', task=soon).exists())
+
+        # Tasks written after a scan, due inside a range it already covered
+        later = self.now + timedelta(hours=3)
+        self.task('New and soon', 4)
+        moved = Task.objects.get(title='Far away')
+        moved.due_date = self.now - timedelta(days=3)
+        moved.save()
+        self.assertEqual(scan_reminders(now=later), {'due_soon': 1, 'overdue': 1})
+        self.assertTrue(OutboxMessage.objects.filter(kind='overdue', task=moved).exists())
+        self.assertEqual(scan_reminders(now=later), {'due_soon': 0, 'overdue': 0})
+
+        # Each batch commits with its mark; an interrupted scan resumes after it
+        for index in range(3):
+            self.task(f'Backlog {index}', -100 - index)
+        batches = []
+
+        def flaky_enqueue(messages):
+            if any(message.subject.startswith('Task overdue: Backlog') for message in messages):
+                batches.append(messages)
+                if len(batches) == 2:
+                    raise RuntimeError('worker killed')
+            return enqueue(messages)
+
+        with mock.patch('tasks.reminders.enqueue', side_effect=flaky_enqueue), self.assertRaises(RuntimeError):
+            scan_reminders(batch_size=1, now=later)
+        self.assertEqual(OutboxMessage.objects.filter(task__title__startswith='Backlog').count(), 1)
+        self.assertEqual(scan_reminders(batch_size=1, now=later), {'due_soon': 0, 'overdue': 2})
+
+        plan = Task.objects.filter(status='todo', due_date__lte=self.now).order_by('due_date', 'id').explain()
+        self.assertIn('task_status_due_idx', plan)
+        plan = Task.objects.filter(updated_at__gte=self.now).order_by('updated_at', 'id').explain()
+        self.assertIn('task_updated_idx', plan)
+        print("✓ PASS: Threshold crossings and late edits each enqueued exactly once")
+
+    def test_outbox_delivery_and_retry(self):
+        """
+        Test outbox worker: delivery, and exponential backoff on failure
+        """
+        print("\n=== Test 39: Outbox Delivery and Retry ===")
+
+        self.task('Late', -1)
+        scan_reminders(now=self.now)
+        now = timezone.now()
+
+        with mock.patch('tasks.outbox.EmailMessage.send', side_effect=OSError('mail server down')):
+            self.assertEqual(deliver_pending(now=now), (0, 0, 1))
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.attempts, 1)
+        self.assertGreater(message.available_at, now)
+        self.assertEqual(deliver_pending(now=now), (0, 0, 0))
+        self.assertEqual((pending_count(), parked_count()), (1, 0))
+
+        # The last failed attempt parks the message; it no longer counts as pending
+        OutboxMessage.objects.update(attempts=MAX_ATTEMPTS - 1)
+        with mock.patch('tasks.outbox.EmailMessage.send', side_effect=OSError('mail server down')):
+            deliver_pending(now=message.available_at)
+        self.assertEqual((pending_count(), parked_count()), (0, 1))
+        OutboxMessage.objects.update(attempts=1, available_at=message.available_at)
+
+        self.assertEqual(deliver_pending(now=message.available_at), (1, 0, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Late', mail.outbox[0].subject)
+        self.assertEqual(mail.outbox[0].to, ['owner@example.com'])
+
+        # Users registered without an email are skipped, and the worker keeps going past them
+        silent = User.objects.create_user(username='silent', password='pass123')
+        for hours in (-3, -2):
+            self.task(f'Silent {hours}', hours, assigned_to=silent)
+        self.task('Loud', -4, assigned_to=self.assignee)
+        due = timezone.now() - timedelta(seconds=1)
+        enqueue([
+            OutboxMessage(recipient=task.assigned_to, kind='assigned', task=task, subject=task.title, available_at=due)
+            for task in Task.objects.filter(title__startswith='Silent')
+        ])
+        enqueue([OutboxMessage(recipient=self.assignee, kind='assigned', task=Task.objects.get(title='Loud'),
+                               subject='Loud', available_at=timezone.now())])
+        out = StringIO()
+        call_command('send_outbox', '--batch-size', '2', stdout=out)
+        self.assertIn('Sent 1 message(s), 2 skipped', out.getvalue())
+        self.assertFalse(OutboxMessage.objects.filter(sent_at__isnull=True).exists())
+        self.assertEqual(OutboxMessage.objects.filter(recipient=silent).values_list('last_error', flat=True).first(),
+                         'Recipient has no email address')
+        print("✓ PASS: Failed delivery retried after backoff, then sent; no-email recipients skipped")
+
+
+class ActivityNotificationTests(TestCase):
+    """
+    Test Suite for Assignment and Comment Notifications
+    """
+
+    def setUp(self):
+        """Set up an author and an assignee"""
+        self.author = User.objects.create_user(username='author', password='pass123', email='author@example.com')
+        self.assignee = User.objects.create_user(username='helper', password='pass123', email='helper@example.com')
+        self.client.login(username='author', password='pass123')
+
+    def outbox_inserts(self, method, url, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data)
+        self.assertEqual(response.status_code, 302)
+        return [q for q in queries.captured_queries if 'INTO "tasks_outboxmessage"' in q['sql']]
+
+    def test_writes_enqueue_with_single_insert(self):
+        """
+        Test write path: assignment and comment cost one outbox INSERT each
+        """
+        print("\n=== Test 40: Notifications Enqueued on Write ===")
+
+        inserts = self.outbox_inserts('post', reverse('task_create'), {
+            'title': 'Write docs', 'status': 'todo', 'priority': 'low', 'assigned_to': self.assignee.pk,
+        })
+        self.assertEqual(len(inserts), 1)
+        task = Task.objects.get(title='Write docs')
+
+        self.client.login(username='helper', password='pass123')
+        inserts = self.outbox_inserts('post', reverse('task_detail', kwargs={'pk': task.pk}), {'content': 'On it'})
+        self.assertEqual(len(inserts), 1)
+
+        kinds = list(OutboxMessage.objects.values_list('kind', 'recipient__username'))
+        self.assertEqual(kinds, [('assigned', 'helper'), ('comment', 'author')])
+        print("✓ PASS: Assignment and comment each enqueued with one INSERT")
+
+    def test_messages_coalesced_into_digest(self):
+        """
+        Test outbox worker: several events for one recipient, one email
+        """
+        print("\n=== Test 41: Notification Digests ===")
+
+        task = Task.objects.create(title='Busy task', created_by=self.author, assigned_to=self.assignee)
+        for index in range(3):
+            comment = Comment.objects.create(task=task, user=self.assignee, content=f'Update {index}')
+            notify_comment(comment, self.assignee)
+        notify_assignment(task, self.assignee)  # self-assignment: nothing to send
+
+        later = timezone.now() + timedelta(seconds=settings.OUTBOX_DIGEST_DELAY + 1)
+        self.assertEqual(deliver_pending(now=later), (3, 0, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, '3 new TaskMaster notifications')
+        self.assertIn('Update 2', mail.outbox[0].body)
+        print("✓ PASS: 3 comment notifications delivered as 1 digest")
+
+
+class ProjectAnalyticsTests(TestCase):
+    """
+    Test Suite for Incremental Project Rollups and the Analytics View
+    """
+
+    def setUp(self):
+        """Set up a user with two projects"""
+        self.user = User.objects.create_user(username='analyst', password='pass123')
+        self.alpha = Project.objects.create(name='Alpha', owner=self.user)
+        self.beta = Project.objects.create(name='Beta', owner=self.user)
+
+    def actual_breakdown(self, project):
+        counts = dict(project.tasks.values_list('status').annotate(n=Count('id')))
+        return {status: counts.get(status, 0) for status, _ in Task.STATUS_CHOICES}
+
+    def test_incremental_rollups_match_backfill(self):
+        """
+        Test rollups: saves, moves, deletes and bulk updates stay in step
+        """
+        print("\n=== Test 42: Incremental Rollups Match Backfill ===")
+
+        tasks = [Task.objects.create(title=f'T{i}', created_by=self.user, project=self.alpha) for i in range(6)]
+        tasks[0].mark_as_done()
+        tasks[1].status = 'in_progress'
+        tasks[1].save()
+        tasks[2].project = self.beta
+        tasks[2].status = 'review'
+        tasks[2].save()
+        tasks[3].save()  # no transition: no rollup write
+        tasks[4].delete()
+        action = set_status_action('done', 'Done')
+        action(mock.Mock(), None, Task.objects.filter(pk__in=[tasks[1].pk, tasks[5].pk]))
+        Task.objects.get(pk=tasks[0].pk).mark_as_done()  # already done: counted once
+
+        for project in (self.alpha, self.beta):
+            _, breakdown = project_series(project, days=30)
+            self.assertEqual(breakdown, self.actual_breakdown(project))
+        series, _ = project_series(self.alpha, days=30)
+        self.assertEqual(series[-1]['completed'], 3)
+        self.assertEqual(series[-1]['open'], 1)
+
+        incremental = {p.pk: project_series(p, days=30)[1] for p in (self.alpha, self.beta)}
+        call_command('backfill_rollups', stdout=mock.Mock())
+        for project in (self.alpha, self.beta):
+            self.assertEqual(project_series(project, days=30)[1], incremental[project.pk])
+
+        # Archived tasks still count as done after a rebuild
+        self.assertEqual(archive_done(days=0, now=timezone.now() + timedelta(days=1))['tasks'], 3)
+        self.assertFalse(self.alpha.tasks.filter(status='done').exists())
+        call_command('backfill_rollups', stdout=mock.Mock())
+        series, breakdown = project_series(self.alpha, days=30)
+        self.assertEqual(breakdown, incremental[self.alpha.pk])
+        self.assertEqual(series[-1]['completed'], 3)
+        print(f"✓ PASS: Rollups match task and archive rows: {incremental[self.alpha.pk]}")
+
+    def test_analytics_view_reads_rollups_only(self):
+        """
+        Test analytics view: a year of history without touching task rows
+        """
+        print("\n=== Test 43: Analytics View Reads Rollups Only ===")
+
+        DatasetGenerator(users=1, tasks=2000, comments=0, projects_per_user=1, seed=7).run()
+        project = Project.objects.exclude(pk__in=[self.alpha.pk, self.beta.pk]).get()
+        project.owner = self.user
+        project.save()
+        expected = self.actual_breakdown(project)
+
+        self.client.login(username='analyst', password='pass123')
+        url = reverse('project_analytics', kwargs={'pk': project.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'days': 365})
+        self.assertEqual(response.status_code, 200)
+        query_count = len(queries.captured_queries)
+        task_queries = [q['sql'] for q in queries.captured_queries if '"tasks_task"' in q['sql']]
+        self.assertEqual(task_queries, [])
+        self.assertLessEqual(query_count, 6)
+        self.assertEqual(dict(response.context['breakdown']),
+                         {label: expected[status] for status, label in Task.STATUS_CHOICES})
+        self.assertContains(response, '<polyline')
+
+        User.objects.create_user(username='outsider', password='pass123')
+        self.client.login(username='outsider', password='pass123')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        print(f"✓ PASS: 365 days rendered in {query_count} queries, none on tasks_task")
+
+
+class BoardTests(TestCase):
+    """
+    Test Suite for the Kanban Board
+    """
+
+    def setUp(self):
+        """Set up a user with created and assigned tasks"""
+        self.user = User.objects.create_user(username='boarder', password='pass123')
+        self.other = User.objects.create_user(username='teammate', password='pass123')
+        Task.objects.bulk_create(
+            [Task(title=f'Mine {i}', created_by=self.user, status='todo') for i in range(40)]
+            + [Task(title=f'Assigned {i}', created_by=self.other, assigned_to=self.user, status='todo') for i in range(20)]
+            + [Task(title=f'Hidden {i}', created_by=self.other, status='todo') for i in range(5)]
+            + [Task(title='Reviewing', created_by=self.user, status='review')]
+        )
+        self.client.login(username='boarder', password='pass123')
+
+    def test_board_counts_and_column_pages(self):
+        """
+        Test board: one grouped count query, cursor pages cover a column exactly once
+        """
+        print("\n=== Test 44: Board Counts and Column Pages ===")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('board'))
+        count_queries = [q for q in queries.captured_queries if 'GROUP BY' in q['sql']]
+        self.assertEqual(len(count_queries), 1)
+        counts = {column['status']: column['count'] for column in response.context['columns']}
+        self.assertEqual(counts, {'todo': 60, 'in_progress': 0, 'review': 1, 'done': 0})
+
+        seen, url, pages = [], reverse('board_column', kwargs={'status': 'todo'}), 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [task.pk for task in response.context['tasks']]
+            cursor = response.context['next_cursor']
+            url = f"{reverse('board_column', kwargs={'status': 'todo'})}?cursor={cursor}" if cursor else None
+            pages += 1
+        expected = Task.objects.filter(status='todo').exclude(title__startswith='Hidden')
+        self.assertEqual(seen, list(expected.order_by('-id').values_list('id', flat=True)))
+        self.assertEqual(pages, 3)
+        self.assertEqual(self.client.get(reverse('board_column', kwargs={'status': 'bogus'})).status_code, 404)
+        print(f"✓ PASS: 60 cards over {pages} keyset pages, counts from 1 grouped query")
+
+    def test_move_is_single_row_update(self):
+        """
+        Test card move: one UPDATE, card fragment returned, rollups kept in step
+        """
+        print("\n=== Test 45: Board Move Single-Row Update ===")
+
+        project = Project.objects.create(name='Board', owner=self.user)
+        task = Task.objects.create(title='Drag me', created_by=self.user, project=project)
+        url = reverse('task_move', kwargs={'pk': task.pk})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'status': 'done'})
+        self.assertEqual(response.status_code, 200)
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"tasks_task"."id" = ', updates[0])
+        self.assertContains(response, 'data-status="done"')
+        self.assertNotContains(response, '<html')
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'done')
+        self.assertIsNotNone(task.completed_at)
+        self.assertEqual(project_series(project, days=7)[1]['done'], 1)
+
+        hidden = Task.objects.get(title='Hidden 0')
+        self.assertEqual(self.client.post(reverse('task_move', kwargs={'pk': hidden.pk}), {'status': 'done'}).status_code, 404)
+        self.assertEqual(self.client.post(url, {'status': 'bogus'}).status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 405)
+        print("✓ PASS: Move issued 1 single-row UPDATE and returned the card fragment")
+
+
+@override_settings(CACHES={
+    **settings.CACHES,
+    'calendar': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'calendar-tests'},
+})
+class CalendarTests(TestCase):
+    """
+    Test Suite for the Due-Date Calendar Feed
+    """
+
+    def setUp(self):
+        """Set up tasks due inside and outside a week"""
+        caches['calendar'].clear()
+        self.user = User.objects.create_user(username='planner', password='pass123')
+        self.other = User.objects.create_user(username='colleague', password='pass123')
+        self.monday = timezone.localdate() - timedelta(days=timezone.localdate().weekday())
+
+        def at(days):
+            return timezone.make_aware(datetime.combine(self.monday + timedelta(days=days), datetime.min.time()))
+
+        self.inside = Task.objects.create(title='Inside', description='x' * 500, created_by=self.user, due_date=at(2))
+        Task.objects.create(title='Assigned', created_by=self.other, assigned_to=self.user, due_date=at(6))
+        Task.objects.create(title='Next week', created_by=self.user, due_date=at(7))
+        Task.objects.create(title="Someone else's", created_by=self.other, due_date=at(3))
+        self.client.login(username='planner', password='pass123')
+        self.params = {'start': self.monday.isoformat(), 'end': (self.monday + timedelta(days=7)).isoformat()}
+
+    def feed(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('calendar_feed'), self.params)
+        self.assertEqual(response.status_code, 200)
+        task_queries = [q['sql'] for q in queries.captured_queries if '"tasks_task"' in q['sql']]
+        return [event['title'] for event in response.json()['events']], task_queries
+
+    def test_feed_reads_range_once(self):
+        """
+        Test calendar feed: one narrow range query, then served from cache
+        """
+        print("\n=== Test 46: Calendar Feed Range Query ===")
+
+        titles, task_queries = self.feed()
+        self.assertEqual(titles, ['Inside', 'Assigned'])
+        self.assertEqual(len(task_queries), 1)
+        self.assertIn('"tasks_task"."due_date" >= ', task_queries[0])
+        self.assertNotIn('"description"', task_queries[0])
+
+        titles, task_queries = self.feed()
+        self.assertEqual(titles, ['Inside', 'Assigned'])
+        self.assertEqual(task_queries, [])
+
+        bad = self.client.get(reverse('calendar_feed'), {'start': self.params['start'], 'end': '2099-01-01'})
+        self.assertEqual(bad.status_code, 400)
+        self.assertEqual(self.client.get(reverse('calendar_feed'), {'start': 'soon'}).status_code, 400)
+        print("✓ PASS: Week fetched with 1 range query, repeat served from cache")
+
+    def test_task_changes_invalidate_cached_ranges(self):
+        """
+        Test calendar cache: saves, reassignments and board moves invalidate
+        """
+        print("\n=== Test 47: Calendar Cache Invalidation ===")
+
+        self.feed()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.inside.title = 'Renamed'
+            self.inside.save()
+        self.assertEqual(self.feed()[0], ['Renamed', 'Assigned'])
+
+        assigned = Task.objects.get(title='Assigned')
+        with self.captureOnCommitCallbacks(execute=True):
+            assigned.assigned_to = self.other
+            assigned.save()
+        self.assertEqual(self.feed()[0], ['Renamed'])
+
+        self.client.post(reverse('task_move', kwargs={'pk': self.inside.pk}), {'status': 'done'})
+        response = self.client.get(reverse('calendar_feed'), self.params)
+        self.assertEqual(response.json()['events'][0]['status'], 'done')
+        print("✓ PASS: Cached ranges refreshed after save, reassignment and move")
+
+
+class ArchiveTests(TestCase):
+    """
+    Test Suite for the Done-Task Archive Tier
+    """
+
+    def setUp(self):
+        """Set up old and recent done tasks with comments"""
+        self.user = User.objects.create_user(username='archivist', password='pass123')
+        self.project = Project.objects.create(name='History', owner=self.user)
+        old = timezone.now() - timedelta(days=settings.ARCHIVE_AFTER_DAYS + 10)
+        self.old_tasks = []
+        for index in range(5):
+            task = Task.objects.create(title=f'Shipped {index}', created_by=self.user, project=self.project)
+            task.mark_as_done()
+            Task.objects.filter(pk=task.pk).update(completed_at=old)
+            Comment.objects.create(task=task, user=self.user, content=f'Released {index}')
+            self.old_tasks.append(task)
+        self.recent = Task.objects.create(title='Just finished', created_by=self.user, project=self.project)
+        self.recent.mark_as_done()
+        self.open = Task.objects.create(title='Still open', created_by=self.user, project=self.project)
+        OutboxMessage.objects.create(recipient=self.user, kind='comment', task=self.old_tasks[0], subject='Sent')
+        self.client.login(username='archivist', password='pass123')
+
+    def test_archive_moves_old_done_tasks_in_batches(self):
+        """
+        Test archiving: old done tasks and comments move, everything else stays
+        """
+        print("\n=== Test 48: Archive Old Done Tasks ===")
+
+        before = project_series(self.project, days=7)[1]
+        with CaptureQueriesContext(connection) as queries:
+            counts = archive_done(batch_size=2)
+        self.assertEqual(counts, {'tasks': 5, 'comments': 5})
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "tasks_archivedtask"')]
+        self.assertEqual(len(inserts), 3)
+
+        self.assertEqual(set(Task.objects.values_list('title', flat=True)), {'Just finished', 'Still open'})
+        self.assertEqual(Comment.objects.count(), 0)
+        self.assertEqual(ArchivedComment.objects.count(), 5)
+        self.assertIsNone(OutboxMessage.objects.get().task_id)
+        self.assertEqual(project_series(self.project, days=7)[1], before)
+
+        url = reverse('task_detail', kwargs={'pk': self.old_tasks[0].pk})
+        response = self.client.get(url)
+        self.assertContains(response, 'Archived')
+        self.assertContains(response, 'Released 0')
+        self.assertNotContains(response, 'Add Comment')
+        self.assertEqual(self.client.post(url, {'content': 'Late note'}).status_code, 403)
+
+        response = self.client.get(reverse('archive_list'), {'search': 'Shipped 3'})
+        self.assertEqual([task.title for task in response.context['page']], ['Shipped 3'])
+        print("✓ PASS: 5 tasks archived in 3 batches, still viewable and searchable")
+
+    def test_restore_brings_task_and_comments_back(self):
+        """
+        Test restore: the task returns with its id and comments
+        """
+        print("\n=== Test 49: Restore Archived Task ===")
+
+        breakdown = project_series(self.project, days=30)[1]
+        archive_done()
+        # Archived tasks stay counted as done, also in rebuilt rollups
+        call_command('backfill_rollups', stdout=StringIO())
+        self.assertEqual(project_series(self.project, days=30)[1], breakdown)
+        task_id = self.old_tasks[1].pk
+        self.assertEqual(self.client.post(reverse('task_restore', kwargs={'pk': task_id})).status_code, 302)
+        self.assertEqual(project_series(self.project, days=30)[1], breakdown)
+
+        task = Task.objects.get(pk=task_id)
+        self.assertEqual(task.title, 'Shipped 1')
+        self.assertEqual(list(task.comments.values_list('content', flat=True)), ['Released 1'])
+        self.assertFalse(ArchivedTask.objects.filter(pk=task_id).exists())
+        self.assertContains(self.client.get(reverse('task_detail', kwargs={'pk': task_id})), 'Add Comment')
+
+        output = StringIO()
+        call_command('archive_tasks', '--restore', str(self.old_tasks[2].pk), stdout=output)
+        self.assertTrue(Task.objects.filter(pk=self.old_tasks[2].pk).exists())
+        print("✓ PASS: Restored tasks are live again with their comments")
+
+
+class OptimisticConcurrencyTests(TestCase):
+    """
+    Test Suite for Versioned Compare-and-Set Task Updates
+    """
+
+    def setUp(self):
+        """Set up a task owned by the editor"""
+        self.user = User.objects.create_user(username='editor', password='pass123')
+        self.task = Task.objects.create(title='Draft', description='Original', created_by=self.user)
+        self.client.login(username='editor', password='pass123')
+        self.url = reverse('task_update', kwargs={'pk': self.task.pk})
+
+    def form_data(self, **changes):
+        data = {'title': 'Draft', 'description': 'Original', 'status': 'todo', 'priority': 'medium', 'version': 1}
+        data.update(changes)
+        return data
+
+    def test_stale_edit_gets_conflict_diff(self):
+        """
+        Test task_update: changed fields only, stale versions get a 409 diff
+        """
+        print("\n=== Test 50: Task Update Conflict Detection ===")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, self.form_data(title='Final'))
+        self.assertEqual(response.status_code, 302)
+        update = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(update), 1)
+        self.assertIn('"title"', update[0])
+        self.assertNotIn('"description"', update[0])
+        self.assertIn('"version" = 1', update[0].split('WHERE')[1])
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.title, self.task.version), ('Final', 2))
+
+        # A second editor still holding version 1
+        response = self.client.post(self.url, self.form_data(description='Mine', status='review'))
+        self.assertEqual(response.status_code, 409)
+        diff = {row['field']: (row['yours'], row['theirs']) for row in response.context['conflicts']}
+        self.assertEqual(diff, {
+            'Title': ('Draft', 'Final'), 'Description': ('Mine', 'Original'), 'Status': ('In Review', 'To Do'),
+        })
+        self.assertContains(response, 'name="version" value="2"', status_code=409)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.description, 'Original')
+
+        response = self.client.post(self.url, self.form_data(title='Final', description='Mine', version=2))
+        self.assertEqual(response.status_code, 302)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.description, self.task.version), ('Mine', 3))
+
+        # A submission without its version is a conflict, not a blind overwrite
+        response = self.client.post(self.url, self.form_data(title='Blind', version=''))
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, 'name="version" value="3"', status_code=409)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'Final')
+        print("✓ PASS: Stale and unversioned edits rejected with a diff, resubmission applied")
+
+
+class ConcurrentUpdateTests(TransactionTestCase):
+    """
+    Test Suite for Compare-and-Set Under Concurrent Writers
+    """
+
+    def test_only_one_concurrent_writer_wins(self):
+        """
+        Test threads: writers holding the same version, exactly one succeeds
+        """
+        print("\n=== Test 51: Concurrent Compare-and-Set ===")
+
+        user = User.objects.create_user(username='racer', password='pass123')
+        task_id = Task.objects.create(title='Contended', created_by=user).pk
+        writers = 6
+        barrier = threading.Barrier(writers)
+        outcomes = []
+
+        def write(index, task):
+            # The in-memory test database shares one cache between threads and
+            # reports table locks at once instead of waiting like a file database
+            while True:
+                try:
+                    if index == 0:
+                        return task.mark_as_done()
+                    task.title = f'Writer {index}'
+                    return task.save_changes(['title'], task.version)
+                except OperationalError as exc:
+                    if 'locked' not in str(exc):
+                        raise
+                    time.sleep(0.001)
+
+        def writer(index):
+            try:
+                task = Task.objects.get(pk=task_id)
+                barrier.wait()
+                write(index, task)
+                outcomes.append('won')
+            except TaskConflict:
+                outcomes.append('conflict')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer, args=(index,)) for index in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ['conflict'] * (writers - 1) + ['won'])
+        self.assertEqual(Task.objects.get(pk=task_id).version, 2)
+        print(f"✓ PASS: 1 of {writers} concurrent writers won, {writers - 1} got a conflict")
+
+
+class DependencyTests(TestCase):
+    """
+    Test Suite for Task Dependencies and the Closure Table
+    """
+
+    def setUp(self):
+        """Set up a user with a handful of tasks"""
+        self.user = User.objects.create_user(username='planner2', password='pass123')
+        self.tasks = Task.objects.bulk_create([Task(title=f'Step {i}', created_by=self.user) for i in range(6)])
+        self.client.login(username='planner2', password='pass123')
+
+    def closure(self):
+        return set(DependencyClosure.objects.values_list('ancestor_id', 'descendant_id', 'paths'))
+
+    def test_closure_tracks_edges_and_rejects_cycles(self):
+        """
+        Test closure: chains, diamonds, removals and deletes stay consistent
+        """
+        print("\n=== Test 52: Dependency Closure Maintenance ===")
+
+        a, b, c, d, e, _ = self.tasks
+        add_dependency(b, a)
+        add_dependency(c, b)
+        add_dependency(d, a)
+        add_dependency(c, d)  # diamond: a -> b -> c and a -> d -> c
+        self.assertEqual(DependencyClosure.objects.get(ancestor=a, descendant=c).paths, 2)
+        self.assertEqual(set(blockers(c).values_list('title', flat=True)), {'Step 0', 'Step 1', 'Step 3'})
+
+        response = self.client.post(reverse('task_dependency_add', kwargs={'pk': a.pk}), {'blocked_by': c.pk}, follow=True)
+        self.assertContains(response, 'would be a cycle')
+        with self.assertRaises(DependencyCycle):
+            add_dependency(a, a)
+
+        remove_dependency(c.pk, b.pk)
+        self.assertEqual(DependencyClosure.objects.get(ancestor=a, descendant=c).paths, 1)
+        add_dependency(e, c)
+        d.delete()  # a no longer reaches c or e
+        self.assertFalse(blockers(e).filter(pk=a.pk).exists())
+
+        # Cascades bypass Task.delete: deleting a project takes its middle link out of the chain
+        project = Project.objects.create(name='Launch', owner=self.user)
+        head = Task.objects.create(title='Head', created_by=self.user)
+        middle = Task.objects.create(title='Middle', created_by=self.user, project=project)
+        tail = Task.objects.create(title='Tail', created_by=self.user)
+        add_dependency(middle, head)
+        add_dependency(tail, middle)
+        self.assertTrue(blockers(tail).filter(pk=head.pk).exists())
+        self.client.post(reverse('project_delete', kwargs={'pk': project.pk}))
+        self.assertFalse(Task.objects.filter(pk=middle.pk).exists())
+        self.assertFalse(blockers(tail).exists())
+        ready = self.client.get(reverse('task_list'), {'readiness': 'ready'}).context['tasks']
+        self.assertIn(tail, list(ready))
+
+        incremental = self.closure()
+        call_command('rebuild_dependencies', stdout=StringIO())
+        self.assertEqual(self.closure(), incremental)
+        print(f"✓ PASS: Closure of {len(incremental)} pairs matches a full rebuild")
+
+    def test_deep_chain_lookups_are_single_queries(self):
+        """
+        Test deep chain: blockers, cycle check and ready filter in one query each
+        """
+        print("\n=== Test 53: Deep Dependency Chain Queries ===")
+
+        chain = Task.objects.bulk_create([Task(title=f'Link {i}', created_by=self.user) for i in range(300)])
+        for blocker, task in zip(chain, chain[1:]):
+            add_dependency(task, blocker)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(blockers(chain[-1]).count(), 299)
+        with self.assertNumQueries(1):
+            self.assertTrue(would_cycle(chain[0].pk, chain[-1].pk))
+
+        chain[0].mark_as_done()
+        response = self.client.get(reverse('task_list'), {'readiness': 'ready'})
+        ready = {task.title for task in response.context['tasks']}
+        self.assertIn('Link 1', ready)
+        self.assertNotIn('Link 2', ready)
+        self.assertEqual(len(ready), 1 + len(self.tasks))
+        blocked = self.client.get(reverse('task_list'), {'readiness': 'blocked'}).context['tasks']
+        self.assertEqual(len(blocked), 298)
+        print("✓ PASS: 300-deep chain answered with single indexed queries")
+
+
+class SubtaskTests(TestCase):
+    """
+    Test Suite for Materialized-Path Subtasks
+    """
+
+    def setUp(self):
+        """Set up a three-level task tree"""
+        self.user = User.objects.create_user(username='breaker', password='pass123')
+        self.project = Project.objects.create(name='Tree', owner=self.user)
+        make = lambda title, parent=None, status='todo': Task.objects.create(
+            title=title, created_by=self.user, parent=parent, status=status, project=self.project,
+        )
+        self.root = make('Launch')
+        self.design = make('Design', self.root)
+        self.mockups = make('Mockups', self.design, 'done')
+        self.review = make('Review', self.design)
+        self.build = make('Build', self.root, 'done')
+        self.other = make('Other')
+        self.client.login(username='breaker', password='pass123')
+
+    def test_subtree_fetch_and_move(self):
+        """
+        Test hierarchy: subtree is one range query, moves are one UPDATE
+        """
+        print("\n=== Test 54: Subtree Fetch and Move ===")
+
+        with self.assertNumQueries(1):
+            titles = [task.title for task in descendants(self.root)]
+        self.assertEqual(titles, ['Design', 'Mockups', 'Review', 'Build'])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('task_reparent', kwargs={'pk': self.design.pk}), {'parent': self.other.pk})
+        self.assertEqual(response.status_code, 302)
+        path_updates = [q['sql'] for q in queries.captured_queries if 'SET "path"' in q['sql']]
+        self.assertEqual(len(path_updates), 1)
+        self.assertEqual([task.title for task in descendants(self.other)], ['Design', 'Mockups', 'Review'])
+        self.assertEqual([task.title for task in descendants(self.root)], ['Build'])
+        self.assertTrue(Task.objects.get(pk=self.review.pk).path.startswith(Task.objects.get(pk=self.other.pk).path))
+
+        response = self.client.post(reverse('task_reparent', kwargs={'pk': self.other.pk}), {'parent': self.mockups.pk}, follow=True)
+        self.assertContains(response, 'cannot become a subtask')
+
+        self.client.post(reverse('task_delete', kwargs={'pk': self.other.pk}))
+        self.assertEqual(set(Task.objects.values_list('title', flat=True)), {'Launch', 'Build'})
+        self.assertEqual(project_series(self.project, days=7)[1], {'todo': 1, 'in_progress': 0, 'review': 0, 'done': 1})
+        print("✓ PASS: Subtree moved with 1 UPDATE, cycles refused, deletes roll up")
+
+    def test_task_list_progress_without_per_task_queries(self):
+        """
+        Test task_list: rolled-up progress costs no extra queries per card
+        """
+        print("\n=== Test 55: Rolled-Up Subtask Progress ===")
+
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('task_list'))
+            return response, len(queries.captured_queries)
+
+        response, before = list_queries()
+        progress = {task.title: (task.subtask_done, task.subtask_total) for task in response.context['tasks']}
+        self.assertEqual(progress['Launch'], (2, 4))
+        self.assertEqual(progress['Design'], (1, 2))
+        self.assertEqual(progress['Other'], (0, 0))
+        self.assertContains(response, '2/4 subtasks done')
+
+        for index in range(10):
+            Task.objects.create(title=f'Extra {index}', created_by=self.user, parent=self.review)
+        response, after = list_queries()
+        self.assertEqual(after, before)
+        print(f"✓ PASS: {len(response.context['tasks'])} cards with progress in {after} queries")
+
+
+class TagTests(TestCase):
+    """
+    Test Suite for Tags and the Inverted Index
+    """
+
+    def setUp(self):
+        """Set up a user with a few tasks"""
+        # Rolled-back tests hand out the same tag ids again
+        tags._postings.clear()
+        self.user = User.objects.create_user(username='tagger', password='pass123')
+        self.client.login(username='tagger', password='pass123')
+        self.tasks = {
+            title: Task.objects.create(title=title, created_by=self.user)
+            for title in ['Login page', 'Signup page', 'Payment bug', 'Docs']
+        }
+
+    def tag(self, title, names):
+        task = self.tasks[title]
+        data = {'title': task.title, 'status': task.status, 'priority': task.priority,
+                'version': Task.objects.get(pk=task.pk).version, 'tags': names}
+        return self.client.post(reverse('task_update', kwargs={'pk': task.pk}), data)
+
+    def counts(self):
+        return dict(Tag.objects.filter(created_by=self.user).values_list('name', 'task_count'))
+
+    def test_tag_counts_are_incremental(self):
+        """
+        Test tag counts: kept up to date on tag, untag and delete
+        """
+        print("\n=== Test 56: Incremental Tag Counts ===")
+
+        self.tag('Login page', 'Frontend, auth , frontend')
+        self.tag('Signup page', 'frontend, auth')
+        self.tag('Payment bug', 'bug, frontend')
+        self.assertEqual(self.counts(), {'frontend': 3, 'auth': 2, 'bug': 1})
+        self.assertEqual(Task.objects.get(pk=self.tasks['Login page'].pk).version, 1)
+
+        self.tag('Signup page', 'frontend')
+        self.tasks['Payment bug'].delete()
+        self.assertEqual(self.counts(), {'frontend': 2, 'auth': 1, 'bug': 0})
+
+        # Cascaded deletes (here: the task's project) bypass Task.delete
+        project = Project.objects.create(name='Redesign', owner=self.user)
+        palette = Task.objects.create(title='Palette', created_by=self.user, project=project)
+        tags.set_tags(palette, self.user, tags.get_or_create(self.user, ['red', 'frontend']))
+        self.assertEqual(self.counts()['red'], 1)
+        project.delete()
+        self.assertEqual(self.counts(), {'frontend': 2, 'auth': 1, 'bug': 0, 'red': 0})
+
+        # Other users' tags on the same task are untouched by our edits
+        other = User.objects.create_user(username='other', password='pass123')
+        tags.set_tags(self.tasks['Docs'], other, tags.get_or_create(other, ['later']))
+        self.tag('Docs', 'auth')
+        self.assertEqual(Tag.objects.get(created_by=other).task_count, 1)
+
+        Tag.objects.update(task_count=99)
+        call_command('rebuild_tag_counts', stdout=StringIO())
+        self.assertEqual(self.counts(), {'frontend': 2, 'auth': 2, 'bug': 0, 'red': 0})
+        print(f"✓ PASS: Counts {self.counts()} match the postings")
+
+    def test_multi_tag_filter(self):
+        """
+        Test tag filter: AND/OR over cached per-tag bitmaps
+        """
+        print("\n=== Test 57: Multi-Tag Filtering ===")
+
+        self.tag('Login page', 'frontend, auth')
+        self.tag('Signup page', 'frontend, auth, p1')
+        self.tag('Payment bug', 'frontend, p1')
+        by_name = {tag.name: tag.pk for tag in Tag.objects.all()}
+
+        def titles(names, match='all'):
+            response = self.client.get(reverse('task_list'), {'tag': [by_name[n] for n in names], 'tag_match': match})
+            return {task.title for task in response.context['tasks']}
+
+        self.assertEqual(titles(['frontend', 'auth', 'p1']), {'Signup page'})
+        self.assertEqual(titles(['auth', 'p1'], 'any'), {'Login page', 'Signup page', 'Payment bug'})
+        self.assertEqual(titles(['frontend']), {'Login page', 'Signup page', 'Payment bug'})
+
+        # Repeat filters reuse the in-memory postings: no TaskTag reads
+        with CaptureQueriesContext(connection) as queries:
+            titles(['frontend', 'auth', 'p1'])
+        self.assertFalse([q for q in queries.captured_queries if 'tasks_tasktag' in q['sql'] and 'tag_id" =' in q['sql']])
+
+        # A tagging change bumps the tag version and refreshes its bitmap
+        self.tag('Login page', 'frontend, auth, p1')
+        self.assertEqual(titles(['frontend', 'auth', 'p1']), {'Login page', 'Signup page'})
+
+        # Million-task bitmaps: a three-tag AND is integer arithmetic
+        bitmaps = [tags._bitmap(list(range(0, 1_000_000, step))) for step in (2, 3, 5)]
+        start = time.perf_counter()
+        matched = tags._ids(bitmaps[0] & bitmaps[1] & bitmaps[2])
+        elapsed = time.perf_counter() - start
+        self.assertEqual(len(matched), 33334)
+        self.assertLess(elapsed, 0.5)
+        print(f"✓ PASS: AND of 3 tags over 1M ids in {elapsed * 1000:.1f}ms")
+
+
+class SavedFilterTests(TestCase):
+    """
+    Test Suite for Saved Filters with Maintained Results
+    """
+
+    def setUp(self):
+        """Set up a user with a saved 'open reports' filter"""
+        self.user = User.objects.create_user(username='saver', password='pass123')
+        self.other = User.objects.create_user(username='someone', password='pass123')
+        self.client.login(username='saver', password='pass123')
+        Task.objects.create(title='Quarterly REPORT', created_by=self.user)
+        Task.objects.create(title='Report for someone else', created_by=self.other)
+        Task.objects.create(title='Unrelated', description='mentions a report', created_by=self.user, status='done')
+        response = self.client.post(reverse('saved_filter_create'), {'name': 'Open reports', 'search': 'report', 'status': 'todo'})
+        self.saved = SavedFilter.objects.get(user=self.user, name='Open reports')
+        self.assertRedirects(response, f"{reverse('task_list')}?view={self.saved.pk}")
+
+    def assertConsistent(self):
+        self.saved.refresh_from_db()
+        self.assertFalse(self.saved.stale)
+        self.assertEqual(check(self.saved), [])
+
+    def test_results_maintained_incrementally(self):
+        """
+        Test saved filters: task changes patch the cached results
+        """
+        print("\n=== Test 58: Incrementally Maintained Saved Filter ===")
+
+        self.assertEqual(self.saved.stats()['total'], 1)
+        task = Task.objects.create(title='Weekly report', created_by=self.other, assigned_to=self.user)
+        self.assertConsistent()
+        self.assertEqual(self.saved.stats()['todo'], 2)
+
+        task.status = 'in_progress'
+        task.save()
+        self.assertConsistent()
+        task.status, task.title = 'todo', 'Weekly summary'
+        task.save()
+        self.assertConsistent()
+        task.title = 'Weekly report'
+        task.save_changes(['title'], task.version)
+        self.assertConsistent()
+        task.assigned_to = None
+        task.save()
+        self.assertConsistent()
+
+        mine = Task.objects.get(title='Quarterly REPORT')
+        self.client.post(reverse('task_move', kwargs={'pk': mine.pk}), {'status': 'review'})
+        self.assertConsistent()
+        self.client.post(reverse('task_move', kwargs={'pk': mine.pk}), {'status': 'todo'})
+        child = Task.objects.create(title='Report appendix', created_by=self.user, parent=mine)
+        self.assertEqual(self.saved.results.count(), 2)
+        mine.delete()
+        self.assertConsistent()
+        self.assertEqual(self.saved.stats()['total'], 0)
+        self.assertFalse(Task.objects.filter(pk=child.pk).exists())
+
+        # Cascaded deletes (here: the task's project) bypass Task.delete
+        project = Project.objects.create(name='Reporting', owner=self.user)
+        Task.objects.create(title='Report template', created_by=self.user, project=project)
+        self.saved.refresh_from_db()
+        self.assertEqual(self.saved.stats()['total'], 1)
+        project.delete()
+        self.assertConsistent()
+        self.assertEqual(self.saved.stats()['total'], 0)
+
+        # Opening the saved filter reads results and counts without COUNT queries
+        Task.objects.create(title='Report draft', created_by=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('task_list'), {'view': self.saved.pk})
+        self.assertEqual([task.title for task in response.context['tasks']], ['Report draft'])
+        self.assertEqual(response.context['stats']['total'], 1)
+        self.assertFalse([q for q in queries.captured_queries if '"__count"' in q['sql']])
+        print(f"✓ PASS: Results stayed consistent through 10 changes; view used {len(queries.captured_queries)} queries")
+
+    def test_stale_fallback_and_consistency_check(self):
+        """
+        Test bulk writes: filters go stale and recompute; the check command repairs drift
+        """
+        print("\n=== Test 59: Saved Filter Fallback and Consistency Check ===")
+
+        action = set_status_action('todo', 'To Do')
+        action(mock.Mock(), None, Task.objects.filter(title='Unrelated'))
+        self.saved.refresh_from_db()
+        self.assertTrue(self.saved.stale)
+        response = self.client.get(reverse('task_list'), {'view': self.saved.pk})
+        self.assertEqual(response.context['stats']['todo'], 2)
+        self.assertConsistent()
+
+        # Drift from a raw write the incremental path never saw
+        Task.objects.filter(title='Quarterly REPORT').update(status='done')
+        with self.assertRaises(CommandError):
+            call_command('check_saved_filters', stdout=StringIO())
+        out = StringIO()
+        call_command('check_saved_filters', '--fix', stdout=out)
+        self.assertIn('1 outdated results', out.getvalue())
+        self.assertConsistent()
+        self.assertEqual(self.saved.stats()['total'], 1)
+        print("✓ PASS: Stale filter recomputed on read; drift found and fixed")
+
+
+class FragmentTests(TestCase):
+    """
+    Test Suite for HTML Fragment Endpoints
+    """
+
+    def setUp(self):
+        """Set up a user with a mix of tasks and comments"""
+        self.user = User.objects.create_user(username='swapper', password='pass123')
+        self.commenter = User.objects.create_user(username='commenter', password='pass123')
+        self.client.login(username='swapper', password='pass123')
+        for index in range(6):
+            Task.objects.create(title=f'Chore {index}', created_by=self.user, priority='high' if index % 2 else 'low')
+        self.task = Task.objects.create(title='Write report', created_by=self.user)
+        for index in range(5):
+            Comment.objects.create(task=self.task, user=self.commenter if index % 2 else self.user, content=f'Note {index}')
+
+    def get(self, name, params=None, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name, kwargs=kwargs), params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries.captured_queries)
+
+    def test_list_fragments(self):
+        """
+        Test grid and stats fragments: same content as the page, fewer bytes and queries
+        """
+        print("\n=== Test 60: Task List Fragments ===")
+
+        filters = {'priority': 'high'}
+        page, page_queries = self.get('task_list', filters)
+        grid, grid_queries = self.get('task_grid', filters)
+        stats, stats_queries = self.get('task_stats', filters)
+
+        self.assertEqual([t.title for t in grid.context['tasks']], [t.title for t in page.context['tasks']])
+        self.assertEqual(stats.context['stats'], page.context['stats'])
+        self.assertEqual(stats.context['stats']['total'], 3)
+        self.assertNotContains(grid, '<nav')
+        self.assertNotContains(grid, 'Chore 0')
+        self.assertContains(grid, 'Chore 1')
+        self.assertLess(len(grid.content) + len(stats.content), len(page.content))
+        self.assertLess(grid_queries + stats_queries, page_queries)
+
+        card, card_queries = self.get('task_card', pk=self.task.pk)
+        self.assertContains(card, 'Write report')
+        self.assertContains(card, 'task-slot')
+        self.assertLessEqual(card_queries, 4)
+        print(f"✓ PASS: page {len(page.content)}B/{page_queries}q, grid+stats "
+              f"{len(grid.content) + len(stats.content)}B/{grid_queries + stats_queries}q")
+
+    def test_complete_and_comment_fragments(self):
+        """
+        Test Done and comment actions: fragment responses, plain-POST fallback
+        """
+        print("\n=== Test 61: Action Fragments ===")
+
+        url = reverse('task_complete', kwargs={'pk': self.task.pk})
+        response = self.client.post(url, HTTP_X_FRAGMENT='1')
+        self.assertContains(response, 'status-done')
+        self.assertNotContains(response, 'task-complete-form')
+        self.assertNotContains(response, '<nav')
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, 'done')
+
+        chore = Task.objects.get(title='Chore 0')
+        response = self.client.post(reverse('task_complete', kwargs={'pk': chore.pk}), {'next': '/tasks/?priority=low'})
+        self.assertRedirects(response, '/tasks/?priority=low')
+        response = self.client.post(reverse('task_complete', kwargs={'pk': chore.pk}), {'next': 'https://evil.example/'})
+        self.assertRedirects(response, reverse('task_list'))
+
+        detail = reverse('task_detail', kwargs={'pk': self.task.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(detail, {'content': 'Swapped in place'}, HTTP_X_FRAGMENT='1')
+        self.assertContains(response, 'data-count="6"')
+        self.assertContains(response, 'Swapped in place')
+        self.assertNotContains(response, '<nav')
+        self.assertEqual(self.client.post(detail, {'content': ''}, HTTP_X_FRAGMENT='1').status_code, 400)
+        self.assertRedirects(self.client.post(detail, {'content': 'Plain post'}), detail)
+
+        comments, comment_queries = self.get('task_comments', pk=self.task.pk)
+        self.assertContains(comments, 'commenter')
+        self.assertContains(comments, 'data-count="7"')
+        self.assertLessEqual(comment_queries, 4)
+        print(f"✓ PASS: Card and comment list swapped ({len(queries.captured_queries)} queries to comment)")
+
+
+class WorkspaceTests(TransactionTestCase):
+    """
+    Test Suite for Workspaces on Per-Tenant Shards
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.override = override_settings(SHARD_DIR=Path(cls.directory.name))
+        cls.override.enable()
+        # Shards are configured at runtime, after the runner set up its databases;
+        # they are real files in the temporary directory, flushed after each test
+        cls.databases = {'default', *(shards.configure(alias) for alias in ('acme', 'acme_2'))}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.clear_shards()
+        cls.override.disable()
+        cls.directory.cleanup()
+
+    @classmethod
+    def clear_shards(cls):
+        for alias in ('acme', 'acme_2'):
+            connections[alias].close()
+        for shard in Path(cls.directory.name).iterdir():
+            shard.unlink()
+
+    def setUp(self):
+        """Set up an empty shard directory, a default-workspace user and an Acme workspace"""
+        self.clear_shards()
+        self.bob = User.objects.create_user(username='bob', password='pass123')
+        Task.objects.create(title='Default workspace task', created_by=self.bob)
+        self.acme = workspaces.create('acme', name='Acme')
+        self.alice = workspaces.add_user(self.acme, 'alice', 'pass123')
+        with shards.use('acme'):
+            Task.objects.create(title='Acme task', created_by=self.alice)
+
+    def test_routing_and_login(self):
+        """
+        Test tenant rows stay in their shard and logins land in the right workspace
+        """
+        print("\n=== Test 62: Workspace Routing and Login ===")
+
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['Default workspace task'])
+        with shards.use('acme'):
+            self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['Acme task'])
+            self.assertEqual(User.objects.get().username, 'alice')
+            # The registry stays in the main database whichever shard is active
+            self.assertEqual(Workspace.objects.get(slug='acme').shard, 'acme')
+        shard_tables = connections['acme'].introspection.table_names()
+        self.assertIn('tasks_task', shard_tables)
+        self.assertNotIn('tasks_workspace', shard_tables)
+        self.assertNotIn('django_session', shard_tables)
+
+        # Usernames are global
+        with self.assertRaises(CommandError):
+            workspaces.add_user(self.acme, 'bob', 'pass123')
+        response = self.client.post(reverse('register'), {
+            'username': 'alice', 'password1': 'Xq9!long-pass', 'password2': 'Xq9!long-pass',
+        })
+        self.assertContains(response, 'A user with that username already exists.')
+
+        self.assertRedirects(self.client.post(reverse('login'), {'username': 'alice', 'password': 'pass123'}),
+                             reverse('task_list'))
+        with CaptureQueriesContext(connection) as central, CaptureQueriesContext(connections['acme']) as tenant:
+            response = self.client.get(reverse('task_list'))
+        self.assertContains(response, 'Acme task')
+        self.assertNotContains(response, 'Default workspace task')
+        self.assertTrue(tenant.captured_queries)
+        self.assertFalse([q for q in central.captured_queries if 'tasks_task' in q['sql']])
+        query_counts = f'{len(central.captured_queries)} central, {len(tenant.captured_queries)} shard'
+
+        self.client.post(reverse('task_create'), {'title': 'Created in Acme', 'priority': 'medium', 'status': 'todo'})
+        self.assertFalse(Task.objects.filter(title='Created in Acme').exists())
+        with shards.use('acme'):
+            self.assertTrue(Task.objects.filter(title='Created in Acme').exists())
+
+        # The outbox gauge adds up every workspace's outbox, whichever shard is active
+        enqueue([OutboxMessage(recipient=self.bob, kind='assigned', subject='Hello', available_at=timezone.now())])
+        with shards.use('acme'):
+            enqueue([OutboxMessage(recipient=self.alice, kind='assigned', subject='Hello', available_at=timezone.now())])
+        self.assertIn('taskmanager_outbox_pending 2\n', render_prometheus({}))
+
+        self.client.logout()
+        self.client.login(username='bob', password='pass123')
+        self.assertContains(self.client.get(reverse('task_list')), 'Default workspace task')
+        print(f"✓ PASS: Tenant rows isolated; {query_counts} queries per page")
+
+    def test_move_workspace(self):
+        """
+        Test moving a workspace to a new shard keeps its data and sessions and fences the old file
+        """
+        print("\n=== Test 63: Move Workspace Between Shards ===")
+
+        self.client.post(reverse('login'), {'username': 'alice', 'password': 'pass123'})
+        with connections['acme'].cursor() as cursor:
+            cursor.execute('CREATE TABLE heartbeat (id INTEGER PRIMARY KEY)')
+        committed, refused, stop = [], [], threading.Event()
+
+        def keep_writing():
+            # A second connection writing all through the move, until the fence refuses it
+            heartbeat = sqlite3.connect(shards.path('acme'), timeout=30)
+            try:
+                while not stop.is_set():
+                    heartbeat.execute('INSERT INTO heartbeat DEFAULT VALUES')
+                    heartbeat.commit()
+                    committed.append(1)
+                    time.sleep(0.001)
+            except sqlite3.IntegrityError as error:
+                refused.append(str(error))
+            finally:
+                heartbeat.close()
+
+        writer = threading.Thread(target=keep_writing)
+        output = StringIO()
+        # One page per step, so the writes keep restarting the online copy until it gives up
+        stepped = lambda source, target, log=None: copy_database(source, target, pages=1, max_restarts=2, log=log)
+        with mock.patch('tasks.backups.copy', side_effect=stepped):
+            writer.start()
+            try:
+                call_command('move_workspace', 'acme', 'acme_2', stdout=output, verbosity=2)
+            finally:
+                stop.set()
+                writer.join()
+        self.assertIn('gave up', output.getvalue())
+        self.assertIn('Recopied under the write lock', output.getvalue())
+        self.assertIn('from shard acme to acme_2', output.getvalue())
+        self.assertEqual(refused, ['workspace acme moved to shard acme_2'])
+        moved = sqlite3.connect(shards.path('acme_2'))
+        self.assertEqual(moved.execute('SELECT count(*) FROM heartbeat').fetchone()[0], len(committed))
+        moved.close()
+        self.assertEqual(Workspace.objects.get(slug='acme').shard, 'acme_2')
+        self.assertFalse(shards.path('acme').exists())
+        self.assertEqual(shards.known(), ['acme_2'])
+
+        # Writers still holding the old file are refused instead of losing their rows
+        old = sqlite3.connect(shards.path('acme').with_name('acme.sqlite3.moved'))
+        with self.assertRaises(sqlite3.DatabaseError):
+            old.execute("UPDATE tasks_task SET title = 'lost'")
+        old.close()
+
+        # The session follows the workspace, not the shard
+        response = self.client.get(reverse('task_list'))
+        self.assertContains(response, 'Acme task')
+        with shards.use('acme_2'):
+            self.assertEqual(User.objects.get().username, 'alice')
+
+        with self.assertRaises(CommandError):
+            call_command('move_workspace', 'default', 'elsewhere', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('move_workspace', 'acme', 'acme', stdout=StringIO())
+        output = StringIO()
+        call_command('migrate_shards', stdout=output)
+        self.assertIn('Migrated 1 shards', output.getvalue())
+        print(f"✓ PASS: Workspace moved online past {len(committed)} concurrent writes; old shard fenced")
+
+
+class BackfillTests(TestCase):
+    """
+    Test Suite for Resumable Batched Data Migrations
+    """
+
+    def setUp(self):
+        """Set up 25 tasks with a known number of comments each"""
+        self.user = User.objects.create_user(username='migrator', password='pass123')
+        self.tasks = [Task.objects.create(title=f'Row {index}', created_by=self.user) for index in range(25)]
+        for index, task in enumerate(self.tasks):
+            for _ in range(index % 4):
+                Comment.objects.create(task=task, user=self.user, content='Counted')
+        self.expected = {task.pk: index % 4 for index, task in enumerate(self.tasks)}
+
+    def counts(self):
+        return dict(Task.objects.values_list('pk', 'comment_count'))
+
+    def test_backfill_resumes_from_checkpoint(self):
+        """
+        Test a keyset-batched backfill commits per batch and resumes after an interruption
+        """
+        print("\n=== Test 64: Resumable Batched Backfill ===")
+
+        self.assertEqual(self.counts(), self.expected)
+        Task.objects.update(comment_count=0)
+
+        class Interrupted(CommentCounts):
+            calls = 0
+
+            def apply(self, batch):
+                Interrupted.calls += 1
+                if Interrupted.calls == 3:
+                    raise RuntimeError('worker killed')
+                super().apply(batch)
+
+        with mock.patch('tasks.backfills.time.sleep') as sleep, self.assertRaises(RuntimeError):
+            # Migration 0015 already ran it on the empty table
+            run_backfill(Interrupted(), batch_size=5, restart=True)
+        state = checkpoint(CommentCounts())
+        self.assertEqual((state.rows, state.last_pk), (10, self.tasks[9].pk))
+        self.assertIsNone(state.finished_at)
+        counts = self.counts()
+        self.assertEqual([counts[task.pk] for task in self.tasks[:10]], [i % 4 for i in range(10)])
+        self.assertFalse(any(counts[task.pk] for task in self.tasks[10:]))
+        # Throttled: a pause after each committed batch
+        self.assertEqual(sleep.call_count, 2)
+
+        lines = []
+        with mock.patch('tasks.backfills.time.sleep'), CaptureQueriesContext(connection) as queries:
+            state = run_backfill(CommentCounts(), batch_size=5, log=lines.append)
+        self.assertEqual(self.counts(), self.expected)
+        self.assertEqual(state.rows, 25)
+        self.assertIsNotNone(state.finished_at)
+        self.assertEqual(len(lines), 3)
+        self.assertIn(f'key {self.tasks[-1].pk}/{self.tasks[-1].pk} (100%)', lines[-1])
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(updates), 3)
+
+        with self.assertNumQueries(1):
+            run_backfill(CommentCounts())
+        print(f"✓ PASS: Resumed at row 10, finished in 3 more batches; {lines[-1]}")
+
+    def test_comment_counts_maintained_and_repaired(self):
+        """
+        Test Task.comment_count follows comment writes and run_backfill repairs drift
+        """
+        print("\n=== Test 65: Denormalized Comment Counts ===")
+
+        task, other = self.tasks[0], self.tasks[1]
+        stale = Task.objects.get(pk=task.pk)
+        comment = Comment.objects.create(task=task, user=self.user, content='New')
+        # Saving a copy loaded before the comment keeps the count
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertEqual(stale.comment_count, 1)
+        comment.task = other
+        comment.save()
+        self.assertEqual(self.counts()[task.pk], 0)
+        self.assertEqual(self.counts()[other.pk], 2)
+        comment.delete()
+        self.assertEqual(self.counts(), self.expected)
+
+        # Cascades count too: deleting the commenting user takes their comments along
+        commenter = User.objects.create_user(username='commenter', password='pass123')
+        Comment.objects.create(task=task, user=commenter, content='Drive-by')
+        self.assertEqual(self.counts()[task.pk], 1)
+        commenter.delete()
+        self.assertEqual(self.counts(), self.expected)
+        Comment.objects.filter(task__in=self.tasks[:8]).delete()
+        self.assertEqual(self.counts(), {**self.expected, **{t.pk: 0 for t in self.tasks[:8]}})
+
+        # Raw writes bypass the model; a restarted backfill repairs them
+        Task.objects.filter(pk__in=[t.pk for t in self.tasks[:8]]).update(comment_count=7)
+        out = StringIO()
+        call_command('run_backfill', 'task_comment_counts', '--restart', '--batch-size', '5', '--max-batches', '1',
+                     stdout=out)
+        self.assertIn('paused after 5 rows', out.getvalue())
+        call_command('run_backfill', 'task_comment_counts', '--batch-size', '5', '--duty-cycle', '1', stdout=out)
+        self.assertIn('task_comment_counts: done, 25 rows', out.getvalue())
+        self.assertEqual(self.counts(), {**self.expected, **{t.pk: 0 for t in self.tasks[:8]}})
+        call_command('run_backfill', '--status', stdout=out)
+        self.assertIn('archived_task_comment_counts: finished', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('run_backfill', 'no_such_backfill', stdout=StringIO())
+        print("✓ PASS: Counts follow comment writes; drift repaired in resumable batches")
+
+
+class BackupTests(TransactionTestCase):
+    """
+    Test Suite for Online Backups
+    """
+
+    def setUp(self):
+        """Set up a few tasks and a temporary backup directory"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.backup_dir = Path(self.directory.name)
+        self.user = User.objects.create_user(username='archivist', password='pass123')
+        for index in range(12):
+            Task.objects.create(title=f'Backed up {index}', created_by=self.user)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_snapshot_command_verifies_compresses_and_prunes(self):
+        """
+        Test backup_db writes verified, gzipped snapshots and keeps only the newest --keep
+        """
+        print("\n=== Test 66: Online Snapshot with Retention ===")
+
+        times = [timezone.now() + timedelta(minutes=minute) for minute in range(3)]
+        out = StringIO()
+        clock = iter(times)
+        with mock.patch('tasks.backups.file_name', side_effect=lambda alias, now: file_name(alias, next(clock))):
+            for _ in times:
+                call_command('backup_db', '--dir', str(self.backup_dir), '--gzip', '--keep', '2',
+                             '--pages', '4', '--pause', '0', stdout=out)
+        kept = snapshots('default', self.backup_dir)
+        self.assertEqual([path.name for path in kept], [f'default-{when:%Y%m%d-%H%M%S}.sqlite3.gz' for when in times[1:]])
+        self.assertIn('MB/s', out.getvalue())
+        self.assertIn(f'deleted default-{times[0]:%Y%m%d-%H%M%S}.sqlite3.gz', out.getvalue())
+        self.assertFalse(list(self.backup_dir.glob('*.partial')))
+
+        restored = self.backup_dir / 'restored.sqlite3'
+        with gzip.open(kept[-1]) as source, open(restored, 'wb') as target:
+            target.write(source.read())
+        verify(restored)
+        db = sqlite3.connect(restored)
+        try:
+            titles = {title for title, in db.execute('SELECT title FROM tasks_task')}
+        finally:
+            db.close()
+        self.assertEqual(titles, {f'Backed up {index}' for index in range(12)})
+        self.assertEqual(prune('default', 0, self.backup_dir), [])
+
+        # A failed run is logged and the loop carries on to the next interval
+        err = StringIO()
+        failure = BackupError('Concurrent writes restarted the copy 5 times; try again later')
+        with mock.patch('tasks.backups.snapshot', side_effect=failure), \
+                mock.patch('tasks.management.commands.backup_db.time.sleep', side_effect=[None, KeyboardInterrupt]) as sleep:
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('backup_db', '--dir', str(self.backup_dir), '--loop', '--interval', '60', stdout=out, stderr=err)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(err.getvalue().count('try again later'), 2)
+        with mock.patch('tasks.backups.snapshot', side_effect=failure), self.assertRaises(CommandError):
+            call_command('backup_db', '--dir', str(self.backup_dir), stdout=out)
+        print(f"✓ PASS: {len(titles)} tasks restored from {kept[-1].name}; oldest snapshot pruned")
+
+    def test_copy_yields_to_writers(self):
+        """
+        Test the stepped copy lets writers commit between steps and still ends consistent
+        """
+        print("\n=== Test 67: Backup Yields to Writers ===")
+
+        path = self.backup_dir / 'busy.sqlite3'
+        source = sqlite3.connect(path)
+        source.execute('CREATE TABLE rows (id INTEGER PRIMARY KEY, payload TEXT)')
+        source.executemany('INSERT INTO rows (payload) VALUES (?)', [('x' * 500,)] * 400)
+        source.commit()
+        writer = sqlite3.connect(path, timeout=0)
+        writes = 3
+
+        def write(seconds):
+            # Fails with "database is locked" if a step held the lock across the pause
+            if writes > len(pauses):
+                writer.execute("INSERT INTO rows (payload) VALUES ('late')")
+                writer.commit()
+            pauses.append(seconds)
+
+        target = sqlite3.connect(':memory:')
+        try:
+            pauses = []
+            with mock.patch('tasks.backups.time.sleep', side_effect=write):
+                restarts = copy_database(source, target, pages=8, pause=0.01, max_restarts=5)
+            # Each restart doubled the pause; once writes stopped the copy finished
+            self.assertEqual(restarts, writes)
+            self.assertEqual(pauses[:writes + 1], [0.01, 0.02, 0.04, 0.08])
+            self.assertTrue(all(pause <= MAX_PAUSE for pause in pauses))
+            expected = source.execute('SELECT count(*) FROM rows').fetchone()[0]
+            self.assertEqual(target.execute('SELECT count(*) FROM rows').fetchone()[0], expected)
+
+            # Writers that never stop make it give up instead of locking them out
+            pauses, writes = [], 100
+            target.close()
+            target = sqlite3.connect(':memory:')
+            with mock.patch('tasks.backups.time.sleep', side_effect=write):
+                with self.assertRaises(BackupError):
+                    copy_database(source, target, pages=8, max_restarts=3)
+            self.assertEqual(len(pauses), 3)
+        finally:
+            target.close()
+            writer.close()
+            source.close()
+
+        damaged = self.backup_dir / 'damaged.sqlite3'
+        data = bytearray(path.read_bytes())
+        data[4096 * 2:4096 * 4] = b'\xff' * 8192
+        damaged.write_bytes(data)
+        with self.assertRaises(BackupError):
+            verify(damaged)
+        print(f"✓ PASS: Copy backed off through {restarts} restarts; endless writes and a damaged file rejected")
+
+
 # Test runner summary
 def run_all_tests():
     """
@@ -559,6 +2546,80 @@ def run_all_tests():
     print("   - Filter functionality")
     print("   - Authentication protection")
     print("   - Relationship integrity")
+    print("\n5. SESSION STORAGE TESTS (2 tests)")
+    print("   - Cached session reads")
+    print("   - Cookie message storage")
+    print("\n6. BENCHMARK TESTS (2 tests)")
+    print("   - Benchmark URL coverage")
+    print("   - Benchmark regression detection")
+    print("\n7. DATA GENERATION TESTS (1 test)")
+    print("   - Synthetic data generation")
+    print("\n8. LOAD TEST TESTS (1 test)")
+    print("   - In-process load test")
+    print("\n9. STATIC ASSET TESTS (2 tests)")
+    print("   - Hashed precompressed static assets")
+    print("   - Dynamic HTML compression")
+    print("\n10. WARM-UP TESTS (1 test)")
+    print("   - Startup warm-up")
+    print("\n11. PROFILING TESTS (2 tests)")
+    print("   - Per-request profiling")
+    print("   - Profiling access and retention")
+    print("\n12. SLOW QUERY LOG TESTS (3 tests)")
+    print("   - Slow query fingerprints")
+    print("   - Slow query capture")
+    print("   - Slow query report page")
+    print("\n13. METRICS TESTS (2 tests)")
+    print("   - Multi-process metric aggregation")
+    print("   - Prometheus metrics endpoint")
+    print("\n14. ADMIN SCALABILITY TESTS (3 tests)")
+    print("   - Admin changelist query count")
+    print("   - Bounded filters and indexed search")
+    print("   - Set-based admin action")
+    print("\n15. REMINDER TESTS (2 tests)")
+    print("   - Incremental reminder scan")
+    print("   - Outbox delivery and retry")
+    print("\n16. ACTIVITY NOTIFICATION TESTS (2 tests)")
+    print("   - Notifications enqueued on write")
+    print("   - Notification digests")
+    print("\n17. PROJECT ANALYTICS TESTS (2 tests)")
+    print("   - Incremental rollups match backfill")
+    print("   - Analytics view reads rollups only")
+    print("\n18. BOARD TESTS (2 tests)")
+    print("   - Board counts and column pages")
+    print("   - Board move single-row update")
+    print("\n19. CALENDAR TESTS (2 tests)")
+    print("   - Calendar feed range query")
+    print("   - Calendar cache invalidation")
+    print("\n20. ARCHIVE TESTS (2 tests)")
+    print("   - Archive old done tasks")
+    print("   - Restore archived task")
+    print("\n21. OPTIMISTIC CONCURRENCY TESTS (2 tests)")
+    print("   - Task update conflict detection")
+    print("   - Concurrent compare-and-set")
+    print("\n22. DEPENDENCY TESTS (2 tests)")
+    print("   - Dependency closure maintenance")
+    print("   - Deep dependency chain queries")
+    print("\n23. SUBTASK TESTS (2 tests)")
+    print("   - Subtree fetch and move")
+    print("   - Rolled-up subtask progress")
+    print("\n24. TAG TESTS (2 tests)")
+    print("   - Incremental tag counts")
+    print("   - Multi-tag filtering")
+    print("\n25. SAVED FILTER TESTS (2 tests)")
+    print("   - Incrementally maintained saved filter")
+    print("   - Saved filter fallback and consistency check")
+    print("\n26. FRAGMENT TESTS (2 tests)")
+    print("   - Task list fragments")
+    print("   - Action fragments")
+    print("\n27. WORKSPACE TESTS (2 tests)")
+    print("   - Workspace routing and login")
+    print("   - Move workspace between shards")
+    print("\n28. BACKFILL TESTS (2 tests)")
+    print("   - Resumable batched backfill")
+    print("   - Denormalized comment counts")
+    print("\n29. BACKUP TESTS (2 tests)")
+    print("   - Online snapshot with retention")
+    print("   - Backup yields to writers")
     print("\n" + "="*70)
-    print("TOTAL: 18 comprehensive tests")
+    print("TOTAL: 67 comprehensive tests")
     print("="*70 + "\n")
@@ -10,9 +10,31 @@ urlpatterns = [
     # Task URLs
     path('tasks/', views.task_list, name='task_list'),
     path('tasks/create/', views.task_create, name='task_create'),
+    path('tasks/fragments/grid/', views.task_grid, name='task_grid'),
+    path('tasks/fragments/stats/', views.task_stats, name='task_stats'),
     path('tasks/<int:pk>/', views.task_detail, name='task_detail'),
     path('tasks/<int:pk>/update/', views.task_update, name='task_update'),
     path('tasks/<int:pk>/delete/', views.task_delete, name='task_delete'),
+    path('tasks/<int:pk>/card/', views.task_card, name='task_card'),
+    path('tasks/<int:pk>/comments/', views.task_comments, name='task_comments'),
+    path('tasks/<int:pk>/complete/', views.task_complete, name='task_complete'),
+    path('tasks/<int:pk>/move/', views.task_move, name='task_move'),
+    path('tasks/<int:pk>/restore/', views.task_restore, name='task_restore'),
+    path('tasks/<int:pk>/parent/', views.task_reparent, name='task_reparent'),
+    path('tasks/<int:pk>/dependencies/', views.task_dependency_add, name='task_dependency_add'),
+    path('tasks/<int:pk>/dependencies/<int:blocker_pk>/remove/', views.task_dependency_remove,
+         name='task_dependency_remove'),
+    path('tasks/archive/', views.archive_list, name='archive_list'),
+    path('tasks/saved/', views.saved_filter_create, name='saved_filter_create'),
+    path('tasks/saved/<int:pk>/delete/', views.saved_filter_delete, name='saved_filter_delete'),
+    
+    # Board URLs
+    path('board/', views.board, name='board'),
+    path('board/<str:status>/', views.board_column, name='board_column'),
+    
+    # Calendar URLs
+    path('calendar/', views.calendar, name='calendar'),
+    path('calendar/events/', views.calendar_feed, name='calendar_feed'),
     
     # Category URLs
     path('categories/', views.category_list, name='category_list'),
@@ -22,5 +44,12 @@ urlpatterns = [
     # Project URLs
     path('projects/', views.project_list, name='project_list'),
     path('projects/create/', views.project_create, name='project_create'),
+    path('projects/<int:pk>/analytics/', views.project_analytics, name='project_analytics'),
     path('projects/<int:pk>/delete/', views.project_delete, name='project_delete'),
+    
+    # Diagnostics URLs (staff only)
+    path('profiles/', views.profile_list, name='profile_list'),
+    path('profiles/<str:profile_id>/download/', views.profile_download, name='profile_download'),
+    path('slow-queries/', views.slow_query_list, name='slow_query_list'),
+    path('metrics', views.metrics_view, name='metrics'),
 ]
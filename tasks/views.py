@@ -1,11 +1,35 @@
+from datetime import datetime, timezone
+from itertools import groupby
+
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib import messages
-from django.db.models import Q, Count
-from .models import Task, Category, Project, Comment
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Exists, F, Prefetch, Q
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse,
+)
+from django.urls import reverse
+from django.utils import timezone as tz
+from django.utils.crypto import constant_time_compare
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
+from . import (
+    analytics, archive, calendar_events, dependencies, metrics, outbox, saved_filters, shards, subtasks, tags, workspaces,
+)
+from .models import (
+    ArchivedTask, DependencyCycle, SavedFilter, Tag, Task, TaskConflict, Category, Project, Comment,
+)
 from .forms import TaskForm, CategoryForm, ProjectForm, CommentForm
+from .middleware import WORKSPACE_SESSION_KEY
+from .profiling import ProfileStore
+from .slowqueries import read_log, slow_query_report
 
 
 def home(request):
@@ -16,31 +40,43 @@ def home(request):
 
 
 def register(request):
-    """User registration view"""
+    """User registration view; new accounts join the default workspace"""
     if request.method == 'POST':
-        form = UserCreationForm(request.POST)
-        if form.is_valid():
-            user = form.save()
-            login(request, user)
-            messages.success(request, 'Account created successfully!')
-            return redirect('task_list')
+        with shards.use(DEFAULT_DB_ALIAS):
+            form = UserCreationForm(request.POST)
+            if form.is_valid():
+                # Usernames are unique across workspaces, which UserCreationForm cannot see
+                if workspaces.username_taken(form.cleaned_data['username']):
+                    form.add_error('username', 'A user with that username already exists.')
+                else:
+                    user = form.save()
+                    login(request, user)
+                    request.session.pop(WORKSPACE_SESSION_KEY, None)
+                    messages.success(request, 'Account created successfully!')
+                    return redirect('task_list')
     else:
         form = UserCreationForm()
     return render(request, 'tasks/register.html', {'form': form})
 
 
 def user_login(request):
-    """User login view"""
+    """User login view; the username decides which workspace's shard authenticates it"""
     if request.method == 'POST':
-        form = AuthenticationForm(request, data=request.POST)
-        if form.is_valid():
-            username = form.cleaned_data.get('username')
-            password = form.cleaned_data.get('password')
-            user = authenticate(username=username, password=password)
-            if user is not None:
-                login(request, user)
-                messages.success(request, f'Welcome back, {username}!')
-                return redirect('task_list')
+        workspace = workspaces.for_username(request.POST.get('username', ''))
+        with shards.use(workspace.shard if workspace else DEFAULT_DB_ALIAS):
+            form = AuthenticationForm(request, data=request.POST)
+            if form.is_valid():
+                username = form.cleaned_data.get('username')
+                password = form.cleaned_data.get('password')
+                user = authenticate(username=username, password=password)
+                if user is not None:
+                    login(request, user)
+                    if workspace is None:
+                        request.session.pop(WORKSPACE_SESSION_KEY, None)
+                    else:
+                        request.session[WORKSPACE_SESSION_KEY] = workspace.pk
+                    messages.success(request, f'Welcome back, {username}!')
+                    return redirect('task_list')
     else:
         form = AuthenticationForm()
     return render(request, 'tasks/login.html', {'form': form})
@@ -53,83 +89,275 @@ def user_logout(request):
     return redirect('home')
 
 
-@login_required
-def task_list(request):
-    """Display all tasks with filtering and searching"""
-    tasks = Task.objects.filter(
-        Q(created_by=request.user) | Q(assigned_to=request.user)
-    ).distinct()
-    
-    # Search functionality
-    search_query = request.GET.get('search', '')
-    if search_query:
-        # Using Django ORM (safe from SQL injection)
-        tasks = tasks.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
-    
-    # Filter by status
-    status_filter = request.GET.get('status', '')
-    if status_filter:
-        tasks = tasks.filter(status=status_filter)
-    
-    # Filter by priority
-    priority_filter = request.GET.get('priority', '')
-    if priority_filter:
-        tasks = tasks.filter(priority=priority_filter)
-    
-    # Filter by category
-    category_filter = request.GET.get('category', '')
-    if category_filter:
-        tasks = tasks.filter(category_id=category_filter)
+def wants_fragment(request):
+    """True for progressive-enhancement requests, which swap a fragment in place"""
+    return request.headers.get('X-Fragment') == '1'
+
+
+def task_cards(tasks, user):
+    """Decorate a task queryset with everything a task card shows"""
+    # Subtask progress comes from two correlated path-range counts in the same query
+    return subtasks.with_progress(tasks).select_related('category', 'project', 'assigned_to').prefetch_related(
+        Prefetch('tags', queryset=Tag.objects.filter(created_by=user), to_attr='my_tags')
+    )
+
+
+def filtered_tasks(request):
+    """The task_list query for the request's filters, shared by the page and its fragments"""
+    # A saved filter reads its maintained results instead of re-running its filters
+    view_id = request.GET.get('view', '')
+    saved_filter = SavedFilter.objects.filter(pk=view_id, user=request.user).first() if view_id.isdigit() else None
+    if saved_filter:
+        params = saved_filters.fresh(saved_filter).params
+        tasks = saved_filters.tasks(saved_filter)
+    else:
+        # Search, status, priority and category through the Django ORM (safe from SQL injection)
+        params = saved_filters.clean_params(request.GET)
+        tasks = Task.objects.filter(
+            Q(created_by=request.user) | Q(assigned_to=request.user)
+        ).distinct()
+        tasks = saved_filters.apply(tasks, params)
+    narrowed = False
     
-    # Statistics
-    stats = {
-        'total': tasks.count(),
-        'todo': tasks.filter(status='todo').count(),
-        'in_progress': tasks.filter(status='in_progress').count(),
-        'review': tasks.filter(status='review').count(),
-        'done': tasks.filter(status='done').count(),
-    }
+    # Ready to start / blocked: one indexed closure lookup per task
+    readiness_filter = request.GET.get('readiness', '')
+    if readiness_filter == 'ready':
+        tasks = tasks.exclude(status='done').filter(~Exists(dependencies.open_blockers()))
+        narrowed = True
+    elif readiness_filter == 'blocked':
+        tasks = tasks.filter(Exists(dependencies.open_blockers()))
+        narrowed = True
     
-    categories = Category.objects.filter(created_by=request.user)
+    # Tags: AND/OR of per-tag bitmaps cached in memory, then primary-key lookups
+    tag_filter = [tag_id for tag_id in request.GET.getlist('tag') if tag_id.isdigit()]
+    tag_match = 'any' if request.GET.get('tag_match') == 'any' else 'all'
+    selected_tags = list(Tag.objects.filter(created_by=request.user, pk__in=tag_filter)) if tag_filter else []
+    if selected_tags:
+        tasks = tags.filter_tasks(tasks, selected_tags, tag_match)
+        narrowed = True
     
-    context = {
+    return {
         'tasks': tasks,
-        'stats': stats,
-        'categories': categories,
-        'search_query': search_query,
-        'status_filter': status_filter,
-        'priority_filter': priority_filter,
+        # Where card actions return to without JavaScript
+        'list_url': f"{reverse('task_list')}?{request.GET.urlencode()}",
+        'saved_filter': saved_filter,
+        'narrowed': narrowed,
+        'search_query': params.get('search', ''),
+        'status_filter': params.get('status', ''),
+        'priority_filter': params.get('priority', ''),
+        'category_filter': params.get('category', ''),
+        'readiness_filter': readiness_filter,
+        'selected_tags': selected_tags,
+        'tag_match': tag_match,
     }
+
+
+def list_stats(tasks, saved_filter=None, narrowed=False):
+    """Status counts for the stats block; one aggregate query, none for a saved filter"""
+    if saved_filter and not narrowed:
+        return saved_filter.stats()
+    return tasks.aggregate(
+        total=Count('id'),
+        **{status: Count('id', filter=Q(status=status)) for status, _ in Task.STATUS_CHOICES},
+    )
+
+
+@login_required
+def task_list(request):
+    """Display all tasks with filtering and searching"""
+    context = filtered_tasks(request)
+    context['stats'] = list_stats(context['tasks'], context['saved_filter'], context['narrowed'])
+    context['tasks'] = task_cards(context['tasks'], request.user)
+    context['categories'] = Category.objects.filter(created_by=request.user)
+    context['user_tags'] = Tag.objects.filter(created_by=request.user)
+    context['saved_filters'] = SavedFilter.objects.filter(user=request.user)
     return render(request, 'tasks/task_list.html', context)
 
 
+@login_required
+def task_grid(request):
+    """Fragment: the task_list grid for the current filters"""
+    context = filtered_tasks(request)
+    context['tasks'] = task_cards(context['tasks'], request.user)
+    return render(request, 'tasks/partials/task_grid.html', context)
+
+
+@login_required
+def task_stats(request):
+    """Fragment: the task_list stats block for the current filters"""
+    context = filtered_tasks(request)
+    stats = list_stats(context['tasks'], context['saved_filter'], context['narrowed'])
+    return render(request, 'tasks/partials/task_stats.html', {'stats': stats})
+
+
+@login_required
+def task_card(request, pk):
+    """Fragment: a single task card"""
+    task = get_object_or_404(task_cards(visible_tasks(request.user), request.user), pk=pk)
+    return render(request, 'tasks/partials/task_card.html', {'task': task})
+
+
+@login_required
+@require_POST
+def task_complete(request, pk):
+    """Mark a task done; fragment requests get its updated card back"""
+    task = get_object_or_404(visible_tasks(request.user), pk=pk)
+    try:
+        task.mark_as_done()
+    except TaskConflict:
+        if wants_fragment(request):
+            return HttpResponse('The task changed since it was loaded; reload the page.', status=409)
+        messages.error(request, 'The task changed since it was loaded; please try again.')
+    else:
+        if wants_fragment(request):
+            return task_card(request, pk)
+        messages.success(request, 'Task marked as done!')
+    next_url = request.POST.get('next', '')
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = reverse('task_list')
+    return redirect(next_url)
+
+
+BOARD_PAGE_SIZE = 25
+
+
+def visible_tasks(user):
+    """Tasks a user created or is assigned to; OR on one table needs no DISTINCT"""
+    return Task.objects.filter(Q(created_by=user) | Q(assigned_to=user))
+
+
+@login_required
+def board(request):
+    """Kanban board: column counts come from one grouped query, cards load per column"""
+    counts = dict(
+        visible_tasks(request.user).order_by().values_list('status').annotate(n=Count('id'))
+    )
+    columns = [
+        {'status': status, 'label': label, 'count': counts.get(status, 0)}
+        for status, label in Task.STATUS_CHOICES
+    ]
+    return render(request, 'tasks/board.html', {'columns': columns})
+
+
+@login_required
+def board_column(request, status):
+    """One page of a board column, newest first, keyset-paginated on id"""
+    if status not in dict(Task.STATUS_CHOICES):
+        raise Http404('Unknown status')
+    tasks = (
+        Task.objects.filter(status=status)
+        .select_related('assigned_to')
+        .only('id', 'title', 'priority', 'status', 'due_date', 'assigned_to__username')
+        .order_by('-id')
+    )
+    cursor = request.GET.get('cursor', '')
+    if cursor:
+        if not cursor.isdigit():
+            return HttpResponseBadRequest('Invalid cursor')
+        tasks = tasks.filter(id__lt=int(cursor))
+    # Two index range reads merged here instead of one OR query, which
+    # SQLite answers by sorting every task in the column
+    created = tasks.filter(created_by=request.user)[:BOARD_PAGE_SIZE + 1]
+    assigned = tasks.filter(assigned_to=request.user).exclude(created_by=request.user)[:BOARD_PAGE_SIZE + 1]
+    page = sorted([*created, *assigned], key=lambda task: -task.pk)[:BOARD_PAGE_SIZE + 1]
+    next_cursor = page[BOARD_PAGE_SIZE - 1].pk if len(page) > BOARD_PAGE_SIZE else None
+    context = {'tasks': page[:BOARD_PAGE_SIZE], 'status': status, 'next_cursor': next_cursor}
+    return render(request, 'tasks/partials/board_column.html', context)
+
+
+@login_required
+@require_POST
+def task_move(request, pk):
+    """Move a card to another column with a single-row UPDATE and return the card"""
+    status = request.POST.get('status', '')
+    if status not in dict(Task.STATUS_CHOICES):
+        return HttpResponseBadRequest('Unknown status')
+    rows = visible_tasks(request.user).filter(pk=pk)
+    now = tz.now()
+    with transaction.atomic(using=shards.current()):
+        analytics.record_bulk_status_change(rows, status)
+        updated = rows.update(
+            status=status, updated_at=now, completed_at=now if status == 'done' else None,
+            version=F('version') + 1,
+        )
+        if not updated:
+            raise Http404('Task not found')
+        task = (
+            Task.objects.select_related('assigned_to')
+            .only('id', 'title', 'description', 'priority', 'status', 'due_date', 'category_id',
+                  'created_by_id', 'assigned_to__username')
+            .get(pk=pk)
+        )
+        saved_filters.task_changed(task, task.user_ids())
+    calendar_events.invalidate(task.user_ids())
+    return render(request, 'tasks/partials/board_card.html', {'task': task})
+
+
+@login_required
+def calendar(request):
+    """Month/week calendar of due dates; the page fetches its events as JSON"""
+    return render(request, 'tasks/calendar.html', {'today': tz.localdate()})
+
+
+@login_required
+def calendar_feed(request):
+    """Tasks due in ?start=YYYY-MM-DD&end=YYYY-MM-DD (end exclusive) as JSON"""
+    try:
+        start, end = calendar_events.parse_range(request.GET.get('start', ''), request.GET.get('end', ''))
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    events = calendar_events.cached_events(request.user, start, end)
+    response = JsonResponse({'start': start.isoformat(), 'end': end.isoformat(), 'events': events})
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 @login_required
 def task_create(request):
-    """Create a new task"""
+    """Create a new task, or a subtask with ?parent=<pk>"""
+    parent_id = request.GET.get('parent', '')
+    parent = get_object_or_404(Task, pk=parent_id, created_by=request.user) if parent_id.isdigit() else None
     if request.method == 'POST':
         form = TaskForm(request.POST, user=request.user)
         if form.is_valid():
             task = form.save(commit=False)
             task.created_by = request.user
-            task.save()
+            task.parent = parent
+            with transaction.atomic(using=shards.current()):
+                task.save()
+                tags.set_tags(task, request.user, tags.get_or_create(request.user, form.cleaned_data['tags']))
+                outbox.notify_assignment(task, request.user)
             messages.success(request, 'Task created successfully!')
-            return redirect('task_list')
+            return redirect('task_detail', pk=parent.pk) if parent else redirect('task_list')
     else:
         form = TaskForm(user=request.user)
-    return render(request, 'tasks/task_form.html', {'form': form, 'action': 'Create'})
+    context = {'form': form, 'action': 'Create', 'parent': parent}
+    return render(request, 'tasks/task_form.html', context)
 
 
 @login_required
 def task_update(request, pk):
-    """Update an existing task"""
+    """Update an existing task with a compare-and-set on its version"""
     task = get_object_or_404(Task, pk=pk, created_by=request.user)
     if request.method == 'POST':
         form = TaskForm(request.POST, instance=task, user=request.user)
         if form.is_valid():
-            form.save()
+            expected = form.cleaned_data['version']
+            changed = [name for name in form.changed_data if name in form._meta.fields]
+            try:
+                # Without the version it was loaded at, the edit cannot be checked: show the diff
+                if expected is None or expected != task.version:
+                    raise TaskConflict(task.pk, expected)
+                with transaction.atomic(using=shards.current()):
+                    if changed:
+                        form.save(commit=False).save_changes(changed, expected)
+                        if 'assigned_to' in changed:
+                            outbox.notify_assignment(task, request.user)
+                    if 'tags' in form.changed_data:
+                        names = form.cleaned_data['tags']
+                        tags.set_tags(task, request.user, tags.get_or_create(request.user, names))
+            except TaskConflict:
+                return task_conflict(request, form)
             messages.success(request, 'Task updated successfully!')
             return redirect('task_detail', pk=task.pk)
     else:
@@ -137,6 +365,19 @@ def task_update(request, pk):
     return render(request, 'tasks/task_form.html', {'form': form, 'action': 'Update'})
 
 
+def task_conflict(request, form):
+    """409 with a field-level diff; resubmitting the form overwrites the newer version"""
+    current = Task.objects.select_related('assigned_to', 'category', 'project').get(pk=form.instance.pk)
+    data = request.POST.copy()
+    data['version'] = current.version
+    context = {
+        'form': TaskForm(data, instance=current, user=request.user),
+        'action': 'Update',
+        'conflicts': form.conflicts(current),
+    }
+    return render(request, 'tasks/task_form.html', context, status=409)
+
+
 @login_required
 def task_delete(request, pk):
     """Delete a task"""
@@ -150,9 +391,11 @@ def task_delete(request, pk):
 
 @login_required
 def task_detail(request, pk):
-    """View task details"""
-    task = get_object_or_404(Task, pk=pk)
-    comments = task.comments.all()
+    """View task details; archived tasks are shown read-only"""
+    task = Task.objects.filter(pk=pk).first()
+    if task is None:
+        return archived_task_detail(request, pk)
+    comments = task.comments.select_related('user')
     
     if request.method == 'POST':
         comment_form = CommentForm(request.POST)
@@ -160,20 +403,153 @@ def task_detail(request, pk):
             comment = comment_form.save(commit=False)
             comment.task = task
             comment.user = request.user
-            comment.save()
+            with transaction.atomic(using=shards.current()):
+                comment.save()
+                outbox.notify_comment(comment, request.user)
+            if wants_fragment(request):
+                return render(request, 'tasks/partials/comment_list.html', {'comments': comments})
             messages.success(request, 'Comment added!')
             return redirect('task_detail', pk=task.pk)
+        if wants_fragment(request):
+            return HttpResponseBadRequest('Comments cannot be empty')
     else:
         comment_form = CommentForm()
     
+    # The whole subtree in one path-range query, depth-first
+    subtask_rows = list(subtasks.descendants(task).only('id', 'title', 'status', 'path'))
+    for row in subtask_rows:
+        row.indent = 1.5 * (subtasks.depth(row.path) - subtasks.depth(task.path) - 1)
+    
     context = {
         'task': task,
         'comments': comments,
         'comment_form': comment_form,
+        'tags': task.tags.filter(created_by=request.user),
+        'blocked_by': Task.objects.filter(dependents__task=task).only('id', 'title', 'status'),
+        'open_blockers': dependencies.blockers(task).exclude(status='done').only('id', 'title', 'status'),
+        'blocking': dependencies.blocking(task).only('id', 'title', 'status'),
+        'ancestors': Task.objects.filter(pk__in=subtasks.ancestor_ids(task)).only('id', 'title', 'path').order_by('path'),
+        'subtasks': subtask_rows,
+        'subtasks_done': sum(row.status == 'done' for row in subtask_rows),
     }
     return render(request, 'tasks/task_detail.html', context)
 
 
+@login_required
+def task_comments(request, pk):
+    """Fragment: a task's comment list"""
+    task = get_object_or_404(Task, pk=pk)
+    return render(request, 'tasks/partials/comment_list.html', {'comments': task.comments.select_related('user')})
+
+
+@login_required
+@require_POST
+def task_reparent(request, pk):
+    """Move a task and its whole subtree under another task, or make it a root"""
+    task = get_object_or_404(Task, pk=pk, created_by=request.user)
+    parent_id = request.POST.get('parent', '')
+    parent = get_object_or_404(Task, pk=parent_id, created_by=request.user) if parent_id else None
+    try:
+        subtasks.move(task, parent)
+        messages.success(request, f'Moved under "{parent.title}".' if parent else 'Task is now top-level.')
+    except ValidationError as exc:
+        messages.error(request, exc.messages[0])
+    return redirect('task_detail', pk=task.pk)
+
+
+@login_required
+@require_POST
+def task_dependency_add(request, pk):
+    """Mark a task as blocked by another task, refusing cycles"""
+    task = get_object_or_404(Task, pk=pk, created_by=request.user)
+    blocker_id = request.POST.get('blocked_by', '')
+    blocker = Task.objects.filter(pk=blocker_id).first() if blocker_id.isdigit() else None
+    if blocker is None:
+        messages.error(request, 'No task with that number.')
+    else:
+        try:
+            dependencies.add_dependency(task, blocker)
+            messages.success(request, f'Now blocked by "{blocker.title}".')
+        except DependencyCycle:
+            messages.error(request, f'"{blocker.title}" already waits on this task; that would be a cycle.')
+    return redirect('task_detail', pk=task.pk)
+
+
+@login_required
+@require_POST
+def task_dependency_remove(request, pk, blocker_pk):
+    """Remove a direct blocker"""
+    task = get_object_or_404(Task, pk=pk, created_by=request.user)
+    dependencies.remove_dependency(task.pk, blocker_pk)
+    messages.success(request, 'Dependency removed.')
+    return redirect('task_detail', pk=task.pk)
+
+
+def archived_task_detail(request, pk):
+    """Read-only detail page of an archived task (called by task_detail)"""
+    task = get_object_or_404(ArchivedTask.objects.select_related('created_by', 'assigned_to', 'category', 'project'), pk=pk)
+    if request.method == 'POST':
+        return HttpResponseForbidden('Archived tasks are read-only')
+    context = {
+        'task': task,
+        'comments': task.comments.select_related('user'),
+        'archived': True,
+    }
+    return render(request, 'tasks/task_detail.html', context)
+
+
+@login_required
+def archive_list(request):
+    """Search the user's archived tasks"""
+    tasks = ArchivedTask.objects.filter(
+        Q(created_by=request.user) | Q(assigned_to=request.user)
+    ).select_related('project')
+    search_query = request.GET.get('search', '')
+    if search_query:
+        tasks = tasks.filter(
+            Q(title__icontains=search_query) |
+            Q(description__icontains=search_query)
+        )
+    page = Paginator(tasks, 25).get_page(request.GET.get('page'))
+    return render(request, 'tasks/archive_list.html', {'page': page, 'search_query': search_query})
+
+
+@login_required
+@require_POST
+def task_restore(request, pk):
+    """Move an archived task back into the live tables"""
+    get_object_or_404(ArchivedTask, pk=pk, created_by=request.user)
+    archive.restore_task(pk)
+    messages.success(request, 'Task restored from the archive!')
+    return redirect('task_detail', pk=pk)
+
+
+@login_required
+@require_POST
+def saved_filter_create(request):
+    """Save the current search, status, priority and category filters under a name"""
+    name = request.POST.get('name', '').strip()
+    if not name or len(name) > SavedFilter._meta.get_field('name').max_length:
+        messages.error(request, 'Saved filters need a name of up to 100 characters.')
+        return redirect('task_list')
+    saved_filter, _ = SavedFilter.objects.update_or_create(
+        user=request.user, name=name,
+        defaults={'params': saved_filters.clean_params(request.POST), 'stale': True},
+    )
+    saved_filters.recompute(saved_filter)
+    messages.success(request, f'Saved filter "{name}" created!')
+    return redirect(f"{reverse('task_list')}?view={saved_filter.pk}")
+
+
+@login_required
+@require_POST
+def saved_filter_delete(request, pk):
+    """Delete a saved filter and its cached results"""
+    get_object_or_404(SavedFilter, pk=pk, user=request.user).delete()
+    messages.success(request, 'Saved filter deleted!')
+    return redirect('task_list')
+
+
 @login_required
 def category_list(request):
     """List all categories"""
@@ -222,6 +598,38 @@ def project_list(request):
     return render(request, 'tasks/project_list.html', {'projects': projects})
 
 
+@login_required
+def project_analytics(request, pk):
+    """Burndown, throughput and status breakdown read from the daily rollups"""
+    project = get_object_or_404(Project, pk=pk, owner=request.user)
+    try:
+        days = min(max(int(request.GET.get('days', 90)), 7), 365)
+    except ValueError:
+        days = 90
+    series, breakdown = analytics.project_series(project, days)
+    open_counts = [day['open'] for day in series]
+    completed = [day['completed'] for day in series]
+    peak = max(completed, default=0) or 1
+    context = {
+        'project': project,
+        'days': days,
+        'series': series,
+        'breakdown': [(label, breakdown.get(status, 0)) for status, label in Task.STATUS_CHOICES],
+        'open_now': open_counts[-1] if open_counts else 0,
+        'completed_total': sum(completed),
+        'created_total': sum(day['created'] for day in series),
+        'burndown_points': analytics.svg_points(open_counts, 700, 200),
+        'throughput_bars': [
+            {'x': round(i * 700 / days, 1), 'y': round(120 - count * 120 / peak, 1),
+             'height': round(count * 120 / peak, 1), 'date': day['date'], 'count': count}
+            for i, (day, count) in enumerate(zip(series, completed)) if count
+        ],
+        'bar_width': max(round(700 / days - 1, 1), 1),
+        'ranges': [30, 90, 365],
+    }
+    return render(request, 'tasks/project_analytics.html', context)
+
+
 @login_required
 def project_create(request):
     """Create a new project"""
@@ -248,3 +656,55 @@ def project_delete(request, pk):
         messages.success(request, f'Project and {task_count} related tasks deleted!')
         return redirect('project_list')
     return render(request, 'tasks/project_confirm_delete.html', {'project': project})
+
+
+@staff_member_required
+def profile_list(request):
+    """List stored request profiles grouped by URL name (staff only)"""
+    profiles = sorted(ProfileStore().list(), key=lambda p: (p['url_name'], -p['created']))
+    url_name = request.GET.get('url_name', '')
+    if url_name:
+        profiles = [p for p in profiles if p['url_name'] == url_name]
+    for profile in profiles:
+        profile['created_at'] = datetime.fromtimestamp(profile['created'], tz=timezone.utc)
+    groups = [(name, list(items)) for name, items in groupby(profiles, key=lambda p: p['url_name'])]
+    return render(request, 'tasks/profile_list.html', {'groups': groups, 'url_name': url_name})
+
+
+@staff_member_required
+def profile_download(request, profile_id):
+    """Download a cProfile dump for use with pstats or snakeviz (staff only)"""
+    path = ProfileStore().path(profile_id)
+    if path is None:
+        raise Http404('Profile not found')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=f'{profile_id}.prof')
+
+
+@staff_member_required
+def slow_query_list(request):
+    """Slow queries grouped by SQL fingerprint (staff only)"""
+    report = slow_query_report(read_log())
+    for group in report:
+        group['last_seen'] = datetime.fromtimestamp(group['last_time'], tz=timezone.utc)
+    context = {'report': report, 'threshold': settings.SLOW_QUERY_THRESHOLD_MS}
+    return render(request, 'tasks/slow_query_list.html', context)
+
+
+def metrics_allowed(request):
+    """Staff, or a scraper with the bearer token; without a token, local clients"""
+    if request.user.is_staff:
+        return True
+    if settings.METRICS_TOKEN:
+        return constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}')
+    # Only meaningful when clients connect directly: behind a local proxy every request is local
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    """Prometheus metrics for scrapers and staff users"""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,47 @@
+"""
+Process warm-up run once at WSGI/ASGI startup.
+
+Compiles every template under tasks/templates into the cached loader,
+populates the URL resolver and builds the form classes, so the first
+request served by a fresh worker does not pay for them.
+"""
+
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / 'templates'
+
+
+def template_names(root=TEMPLATE_DIR):
+    """Names of all templates below `root`, relative to it"""
+    return sorted(
+        path.relative_to(root).as_posix()
+        for path in root.rglob('*.html')
+    )
+
+
+def warm_up(force=False):
+    """Warm the process up and return the time spent per step in seconds"""
+    if not (force or settings.WARM_UP_ON_STARTUP):
+        return {}
+    timings = {}
+
+    start = time.perf_counter()
+    for name in template_names():
+        get_template(name)
+    timings['templates'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    get_resolver()._populate()
+    timings['urls'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    from . import forms
+    for form_class in (forms.TaskForm, forms.CategoryForm, forms.ProjectForm, forms.CommentForm):
+        form_class()
+    timings['forms'] = time.perf_counter() - start
+    return timings
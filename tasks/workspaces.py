@@ -0,0 +1,215 @@
+"""
+Workspace lifecycle: creating workspaces and their users, migrating the
+shards and moving a workspace to another shard while it stays online.
+
+Users, categories, projects and tasks of a workspace live in its shard
+(see tasks.shards); the main database only knows which shard that is and
+which workspace each username logs in to.
+"""
+
+import os
+import sqlite3
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from . import backups, shards
+from .models import Workspace, WorkspaceMember
+
+# Online copies attempted before copying under the write lock regardless
+COPY_ATTEMPTS = 3
+
+
+def for_username(username):
+    """Workspace a username logs in to; None for the default workspace"""
+    member = WorkspaceMember.objects.filter(username=username).select_related('workspace').first()
+    return member.workspace if member is not None else None
+
+
+def username_taken(username):
+    """True if the username is in use in any workspace; usernames are global"""
+    return (
+        WorkspaceMember.objects.filter(username=username).exists()
+        or User.objects.using(DEFAULT_DB_ALIAS).filter(username=username).exists()
+    )
+
+
+def default():
+    """The workspace kept in the main database, which always exists"""
+    return Workspace.objects.get_or_create(shard=DEFAULT_DB_ALIAS, defaults={'slug': 'default', 'name': 'Default'})[0]
+
+
+def selected(slugs=None):
+    """The workspaces with these slugs, or all of them, default first"""
+    default()
+    workspaces = Workspace.objects.order_by('pk')
+    if slugs:
+        workspaces = workspaces.filter(slug__in=slugs)
+        missing = set(slugs) - {workspace.slug for workspace in workspaces}
+        if missing:
+            raise CommandError(f'Unknown workspace: {", ".join(sorted(missing))}')
+    return list(workspaces)
+
+
+def each(slugs=None):
+    """Yield the selected workspaces, each with its shard active"""
+    for workspace in selected(slugs):
+        with shards.use(workspace.shard):
+            yield workspace
+
+
+def migrate(alias, verbosity=0):
+    """Bring a shard's schema up to date, creating the file if needed"""
+    shards.configure(alias)
+    call_command('migrate', database=alias, interactive=False, verbosity=verbosity)
+
+
+def _shard_available(alias):
+    if not shards.ALIAS_PATTERN.match(alias):
+        raise CommandError(f'Invalid shard name {alias!r}: use lower-case letters, digits and underscores')
+    if alias == DEFAULT_DB_ALIAS or Workspace.objects.filter(shard=alias).exists():
+        raise CommandError(f'Shard {alias!r} is already in use')
+    shard_path = shards.path(alias)
+    # A moved-away file keeps its name reserved, so caches keyed by shard never mix two workspaces
+    if shard_path.exists() or shard_path.with_name(f'{shard_path.name}.moved').exists():
+        raise CommandError(f'{shard_path} already exists')
+
+
+def create(slug, name=None, shard=None, verbosity=0):
+    """Create a workspace with a freshly migrated shard of its own"""
+    shard = shard or slug.replace('-', '_')
+    if Workspace.objects.filter(slug=slug).exists():
+        raise CommandError(f'Workspace {slug!r} already exists')
+    _shard_available(shard)
+    migrate(shard, verbosity)
+    return Workspace.objects.create(slug=slug, name=name or slug, shard=shard)
+
+
+def add_user(workspace, username, password, **fields):
+    """Create a user in the workspace's shard and list it in the directory"""
+    if username_taken(username):
+        raise CommandError(f'Username {username!r} is already taken')
+    # The directory row claims the username first; its unique index settles races
+    member = WorkspaceMember.objects.create(username=username, workspace=workspace)
+    try:
+        with shards.use(workspace.shard):
+            return User.objects.create_user(username, password=password, **fields)
+    except Exception:
+        member.delete()
+        raise
+
+
+def _data_version(db):
+    return db.execute('PRAGMA data_version').fetchone()[0]
+
+
+def _fence(db, reason):
+    """Make every table of the (locked) database reject writes, in the open transaction"""
+    tables = [name for name, in db.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    message = reason.replace("'", "''")
+    for table in tables:
+        for operation in ('INSERT', 'UPDATE', 'DELETE'):
+            db.execute(
+                f'CREATE TRIGGER "fence_{table}_{operation.lower()}" BEFORE {operation} ON "{table}" '
+                f"BEGIN SELECT RAISE(ABORT, '{message}'); END"
+            )
+
+
+def move(workspace, target, log=None):
+    """
+    Move a workspace to a new shard while it keeps serving requests.
+
+    The shard file is copied with SQLite's online backup, which lets writes
+    continue between steps and restarts when one lands (or gives up when
+    they keep landing). Then the source is write-locked; only if something
+    was committed since the last complete copy is it copied once more under
+    the lock. With the lock still held
+    the registry is pointed at the target and every source table is fenced
+    with triggers, so writers that were waiting for the lock fail instead
+    of writing to the old file. Reads are never blocked; writes pause for
+    the final steps only. The old file is kept as `<shard>.sqlite3.moved`
+    """
+    log = log or (lambda message: None)
+    if workspace.shard == DEFAULT_DB_ALIAS:
+        raise CommandError('The default workspace lives in the main database and cannot be moved')
+    _shard_available(target)
+    shards.configure(target)
+    source_path, target_path = shards.path(workspace.shard), shards.path(target)
+    partial = target_path.with_name(f'{target_path.name}.partial')
+    partial.unlink(missing_ok=True)
+
+    source = sqlite3.connect(source_path, isolation_level=None, timeout=30)
+    copy = sqlite3.connect(partial)
+    try:
+        for attempt in range(1, COPY_ATTEMPTS + 1):
+            version = _data_version(source)
+            try:
+                backups.copy(source, copy, log=log)
+            except backups.BackupError as error:
+                # The copy is incomplete; the recopy under the write lock finishes it
+                log(f'Copy {attempt} gave up: {error}')
+                version = None
+                continue
+            if _data_version(source) == version:
+                break
+            log(f'Copy {attempt} raced with writes')
+        log(f'Copied {source_path.stat().st_size} bytes online')
+
+        source.execute('BEGIN IMMEDIATE')
+        moved = False
+        try:
+            if version is None or _data_version(source) != version:
+                # SQLite refuses to back up from the connection holding the write lock,
+                # so read through a second one; the lock still keeps writers out
+                reader = sqlite3.connect(source_path)
+                try:
+                    reader.backup(copy)
+                finally:
+                    reader.close()
+                log('Recopied under the write lock')
+            copy.close()
+            os.replace(partial, target_path)
+            Workspace.objects.filter(pk=workspace.pk).update(shard=target)
+            moved = True
+            _fence(source, f'workspace {workspace.slug} moved to shard {target}')
+            source.execute('COMMIT')
+        except BaseException:
+            source.execute('ROLLBACK')
+            if not moved:
+                target_path.unlink(missing_ok=True)
+            raise
+    finally:
+        copy.close()
+        source.close()
+        partial.unlink(missing_ok=True)
+
+    connections[workspace.shard].close()
+    source_path.rename(source_path.with_name(f'{source_path.name}.moved'))
+    log(f'Workspace {workspace.slug} now lives in shard {target}')
+    workspace.shard = target
+    return workspace
+
+
+class WorkspaceCommand(BaseCommand):
+    """Management command whose handle_workspace() runs once per workspace, inside its shard"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workspace', action='append', dest='workspaces', metavar='SLUG',
+            help='Only this workspace (repeatable); default is every workspace',
+        )
+
+    def handle(self, *args, **options):
+        workspaces = selected(options['workspaces'])
+        for workspace in workspaces:
+            if len(workspaces) > 1 and options['verbosity'] > 0:
+                self.stdout.write(f'Workspace {workspace.slug}:')
+            with shards.use(workspace.shard):
+                self.handle_workspace(workspace, *args, **options)
+
+    def handle_workspace(self, workspace, *args, **options):
+        raise NotImplementedError('subclasses of WorkspaceCommand must provide a handle_workspace() method')